@@ -1,42 +1,242 @@
 import click
-import requests
 from datetime import datetime
-from src.clients.binance_main_client.binance_client import BinanceClient
-from src.clients.bitfinex_main_client.bitfinex_client import BitfinexClient
-from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
-from src.exchange_processors.bitfinex.bitfinex_exchange_processor import BitfinexExchangeProcessor
+from functools import partial
+from http import HTTPStatus
+from typing import Optional
 from enums import ExchangeTypes, ActionTypes
+from batch import DEFAULT_BATCH_CONCURRENCY
+from daemon_client import DEFAULT_SOCKET_PATH, DaemonClient, forward_batch
+
+
+def create_processor(
+    exchange: str, secret_key: str, account_ttl: Optional[float] = None, api_key: Optional[str] = None
+):
+    """
+    Processor of the selected exchange, with `account_ttl` reads of the account are cached where supported
+
+    `api_key` identifies the account where the exchange asks for it next to the signature.
+
+    Exchange modules are imported here rather than at the top of the module,
+    and they import asyncio, httpx and numpy only in the calls that use them,
+    so a run only loads the exchange it talks to and what its actions need.
+    `benchmarks/startup_benchmark.py` checks it.
+    """
+    match exchange:
+        case ExchangeTypes.BINANCE.value:
+            from src.clients.binance_main_client.binance_client import BinanceClient
+            from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+            from src.storage.candle_store import CandleStore
+            from src.storage.symbol_index import SymbolIndex
+
+            return BinanceExchangeProcessor(
+                BinanceClient(secret_key, api_key=api_key),
+                candle_store=CandleStore(),
+                account_ttl=account_ttl,
+                symbol_index=SymbolIndex(),
+            )
+        case ExchangeTypes.BITFINEX.value:
+            from src.clients.bitfinex_main_client.bitfinex_client import BitfinexClient
+            from src.exchange_processors.bitfinex.bitfinex_exchange_processor import BitfinexExchangeProcessor
+
+            from src.storage.symbol_index import SymbolIndex
+
+            return BitfinexExchangeProcessor(BitfinexClient(secret_key), symbol_index=SymbolIndex())
+
+
+def show_consolidated_balances(exchange, keys, concurrency, key_budget) -> int:
+    """Print the balances of every account of the key file and their sum, return the number of failed accounts"""
+    from src.accounts.aggregator import AccountAggregator, read_key_file
+
+    with AccountAggregator(create_processor, exchange, read_key_file(keys), concurrency, key_budget) as aggregator:
+        consolidated = aggregator.get_accounts()
+    for result in consolidated.results:
+        if result.error is None:
+            click.echo(click.style(f'{result.name}: {result.result.balances} ({result.latency * 1000:.1f}ms)', fg='green'))
+        else:
+            click.echo(click.style(f'{result.name}: {result.error}', fg='red'))
+    click.echo(click.style(f'Total of {len(consolidated.results) - consolidated.failed} accounts: {consolidated.balances}', fg='green'))
+    click.echo(
+        f'{len(consolidated.results)} accounts in {consolidated.wall:.2f}s, '
+        f'{consolidated.serial:.2f}s one after another, {consolidated.speedup:.1f}x faster',
+        err=True,
+    )
+    return consolidated.failed
+
+
+def show_popular_coins(popular_coins) -> None:
+    """Print the tickers of the latest snapshot and how old they are, without waiting for the exchange"""
+    from src.popular_coins.popular_coins import format_age
+
+    snapshot = popular_coins.snapshot()
+    if snapshot is None:
+        click.echo(click.style('Popular coins are being fetched, ask for popular_coins in a moment', fg='yellow'))
+        return
+    stale = popular_coins.is_stale(snapshot)
+    status = f'Popular coins, updated {format_age(snapshot.age)} ago'
+    if stale:
+        status += ', refreshing' if popular_coins.error is None else f', refresh failed: {popular_coins.error}'
+    click.echo(click.style(status, fg='yellow' if stale else 'green'))
+    for ticker in snapshot.tickers:
+        click.echo(click.style(
+            f'{ticker.symbol.upper():<12} {ticker.last_price:>14,.8g} {ticker.change_percent:+8.2f}%',
+            fg='green' if ticker.change_percent >= 0 else 'red',
+        ))
 
 
 @click.command()
 @click.option(
     '--exchange',
-    required=True,
     type=click.Choice(['binance', 'bitfinex']),
     help='Exchange platform'
 )
-@click.option('--secret_key', required=True, help='Secret key')
-def request_client(exchange, secret_key):
-    match exchange:
-        case ExchangeTypes.BINANCE.value:
-            exchange_processor: BinanceExchangeProcessor = BinanceExchangeProcessor(BinanceClient(secret_key))
-        case ExchangeTypes.BITFINEX.value:
-            exchange_processor: BitfinexExchangeProcessor = BitfinexExchangeProcessor(BitfinexClient(secret_key))
-    
-    if not exchange_processor.ping_client() == requests.codes.OK:
+@click.option('--secret_key', help='Secret key')
+@click.option('--api_key', help='API key, sent along the requests signed with --secret_key')
+@click.option(
+    '--batch',
+    type=click.File('r'),
+    help='Run the actions of a file, one per line, instead of prompting; - reads stdin'
+)
+@click.option(
+    '--concurrency',
+    default=DEFAULT_BATCH_CONCURRENCY,
+    show_default=True,
+    help='Number of batch actions, or --keys accounts, in flight at once'
+)
+@click.option('--batch_id', help='Reuse the id of a previous run so its orders are not placed twice')
+@click.option(
+    '--keys',
+    type=click.File('r'),
+    help='Key file, one `[name] secret_key [api_key]` per line; prints the balances of every account and their sum'
+)
+@click.option(
+    '--key_budget',
+    type=int,
+    help='Request weight each --keys account may spend per minute, on top of the budget of the exchange'
+)
+@click.option(
+    '--account_ttl',
+    type=float,
+    help='Seconds an account snapshot is reused by get_account, e.g. across batch actions; off by default'
+)
+@click.option(
+    '--daemon',
+    is_flag=True,
+    help='Keep clients, connections and caches warm and serve batch actions on --socket'
+)
+@click.option(
+    '--socket',
+    type=click.Path(dir_okay=False),
+    help=f'Socket of the daemon, forwards the --batch actions to it [daemon default: {DEFAULT_SOCKET_PATH}]'
+)
+def request_client(
+    exchange, secret_key, api_key, batch, concurrency, batch_id, keys, key_budget, account_ttl, daemon, socket
+):
+    if daemon:
+        from daemon import CryptoDaemon
+
+        click.echo(click.style(f'Serving on {socket or DEFAULT_SOCKET_PATH}', fg='green'), err=True)
+        create = partial(create_processor, account_ttl=account_ttl)
+        CryptoDaemon(create, socket or DEFAULT_SOCKET_PATH, concurrency).run()
+        return
+
+    if keys is not None:
+        if exchange is None:
+            raise click.UsageError('--exchange is required')
+        raise SystemExit(1 if show_consolidated_balances(exchange, keys, concurrency, key_budget) else 0)
+
+    if exchange is None or secret_key is None:
+        raise click.UsageError('--exchange and --secret_key are required')
+
+    if socket is not None:
+        if batch is None:
+            raise click.UsageError('--socket forwards the actions of --batch')
+        with DaemonClient(socket) as client:
+            failures = forward_batch(
+                client, exchange, secret_key, batch, click.get_text_stream('stdout'), batch_id, api_key
+            )
+        raise SystemExit(1 if failures else 0)
+
+    exchange_processor = create_processor(exchange, secret_key, account_ttl, api_key)
+
+    if not exchange_processor.ping_client() == HTTPStatus.OK:
         click.echo(click.style('Client is not authorized, please check secret key', fg='red'))
         return
 
+    if batch is not None:
+        from batch import run_batch
+
+        with exchange_processor.client:
+            failures = run_batch(exchange_processor, batch, click.get_text_stream('stdout'), concurrency, batch_id)
+        raise SystemExit(1 if failures else 0)
+
     click.echo(click.style('Successfully authorize the client', fg='green'))
-    while True:
-        action = click.prompt('Which action do you want to perform - [get_account | get_candle | place_order] ')
-        if action == ActionTypes.GET_ACCOUNT.value:
-            params = click.prompt('Please provide the data in following format: dd/mm/yyyy ')
-            date = datetime.strptime(params.rstrip(), '%d/%m/%Y').date()
-            result = exchange_processor.get_account(date)
-            click.echo(click.style(result, fg='green'))
-        if action == ActionTypes.PLACE_ORDER.value:
-            ...
+    from src.popular_coins.popular_coins import PopularCoins
+
+    popular_coins = PopularCoins(exchange_processor).start()
+    show_popular_coins(popular_coins)
+    with exchange_processor.client:
+        while True:
+            action = click.prompt(
+                'Which action do you want to perform - '
+                '[get_account | get_candle | place_order | export_candles | popular_coins] '
+            )
+            if action == ActionTypes.POPULAR_COINS.value:
+                show_popular_coins(popular_coins)
+            if action == ActionTypes.GET_ACCOUNT.value:
+                params = click.prompt('Please provide the data in following format: dd/mm/yyyy ')
+                date = datetime.strptime(params.rstrip(), '%d/%m/%Y').date()
+                result = exchange_processor.get_account(date)
+                click.echo(click.style(result, fg='green'))
+            if action == ActionTypes.GET_CANDLE.value:
+                from src.exchange_processors.models import ResponseDetails
+
+                params = click.prompt('Please provide the data in following format: symbol [interval] [N] ')
+                symbol, interval, limit = (params.split() + [None, None])[:3]
+                candles = exchange_processor.show_candles(symbol, interval, int(limit) if limit else None)
+                if isinstance(candles, ResponseDetails):
+                    click.echo(click.style(candles.details, fg='red'))
+                    continue
+                for candle in candles:
+                    click.echo(click.style(candle, fg='green'))
+            if action == ActionTypes.PLACE_ORDER.value:
+                from src.exchange_processors.models import OrderDetails, OrderRequest
+
+                params = click.prompt(
+                    'Please provide the orders in following format: symbol side type quantity [price], ... '
+                )
+                orders = [
+                    OrderRequest(**dict(zip(('symbol', 'side', 'type', 'quantity', 'price'), order.upper().split())))
+                    for order in params.split(',')
+                ]
+                for result in exchange_processor.place_orders(orders):
+                    color = 'green' if isinstance(result.result, OrderDetails) else 'red'
+                    click.echo(click.style(f'{result.order.client_order_id} {result.latency * 1000:.1f}ms {result.result}', fg=color))
+            if action == ActionTypes.EXPORT_CANDLES.value:
+                from src.export.exporters import create_exporter
+
+                params = click.prompt(
+                    'Please provide the data in following format: symbol interval dd/mm/yyyy [dd/mm/yyyy] file '
+                    '(.csv, .json or .parquet, text formats may end with .gz, .bz2 or .xz) '
+                )
+                symbol, interval, start, *end, path = params.split()
+                start_time = int(datetime.strptime(start, '%d/%m/%Y').timestamp() * 1000)
+                end_time = int(datetime.strptime(end[0], '%d/%m/%Y').timestamp() * 1000) if end else None
+                if hasattr(exchange_processor, 'iter_candle_pages'):
+                    pages = exchange_processor.iter_candle_pages(symbol, interval, start_time, end_time)
+                else:
+                    from src.exchange_processors.models import ResponseDetails
+
+                    series = exchange_processor.show_candles(symbol, interval, as_series=True)
+                    if isinstance(series, ResponseDetails):
+                        click.echo(click.style(series.details, fg='red'))
+                        continue
+                    pages = [series]
+                stats = create_exporter(path).write_all(pages)
+                peak_rss = f', peak RSS {stats.peak_rss / 2 ** 20:.1f} MB' if stats.peak_rss is not None else ''
+                click.echo(click.style(
+                    f'Exported {stats.rows} rows in {stats.seconds:.2f}s, {stats.rows_per_second:.0f} rows/s{peak_rss}',
+                    fg='green',
+                ))
 
 
 if __name__ == "__main__":
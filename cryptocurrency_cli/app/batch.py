@@ -0,0 +1,170 @@
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import IO, TYPE_CHECKING, Any, Dict, Optional, Tuple
+from enums import ActionTypes
+
+# The CLI reads `DEFAULT_BATCH_CONCURRENCY` at startup, asyncio and the processors load with the batch run
+if TYPE_CHECKING:
+    from src.exchange_processors.exchange_processor import AsyncCryptoExchangeProcessor
+
+
+DEFAULT_BATCH_CONCURRENCY = 32
+
+# Arguments of the plain text actions, in the order they are typed at the prompts
+ACTION_ARGUMENTS: Dict[str, tuple] = {
+    ActionTypes.GET_ACCOUNT.value: ("date",),
+    ActionTypes.GET_CANDLE.value: ("symbol", "interval", "limit"),
+    ActionTypes.PLACE_ORDER.value: ("symbol", "side", "type", "quantity", "price"),
+}
+
+
+def parse_action(line: str, number: int) -> Dict[str, Any]:
+    """
+    Action of one input line
+
+    A JSON object or the action name followed by its prompt values, e.g. `get_candle BTCUSDT 1h 10`.
+    """
+    line = line.strip()
+    if line.startswith("{"):
+        action = json.loads(line)
+    else:
+        name, *values = line.split()
+        action = {"action": name, **dict(zip(ACTION_ARGUMENTS.get(name, ()), values))}
+    action.setdefault("id", number)
+    return action
+
+
+async def execute_action(
+    processor: "AsyncCryptoExchangeProcessor",
+    action: Dict[str, Any],
+    batch_id: str,
+) -> Tuple[bool, Any]:
+    """Run one action through the processor, return whether it succeeded and its JSON serializable result"""
+    from src.exchange_processors.models import ResponseDetails
+
+    match action.get("action"):
+        case ActionTypes.GET_CANDLE.value:
+            limit = action.get("limit")
+            candles = await processor.show_candles_async(
+                action["symbol"],
+                action.get("interval"),
+                int(limit) if limit else None,
+            )
+            if isinstance(candles, ResponseDetails):
+                return False, candles.dict()
+            return True, [candle.dict() for candle in candles]
+        case ActionTypes.GET_ACCOUNT.value:
+            date = datetime.strptime(action["date"], '%d/%m/%Y').date() if action.get("date") else None
+            account = await processor.get_account_async(date)
+            return not isinstance(account, ResponseDetails), account.dict() if account is not None else None
+        case ActionTypes.PLACE_ORDER.value:
+            from src.exchange_processors.models import OrderRequest
+
+            order = OrderRequest(
+                symbol=action["symbol"].upper(),
+                side=action["side"].upper(),
+                type=action["type"].upper(),
+                quantity=action["quantity"],
+                price=action.get("price"),
+                client_order_id=action.get("client_order_id"),
+            )
+            # The id of the action keeps client order ids distinct within the batch
+            (result,) = await processor.place_orders_async([order], batch_id=f"{batch_id}:{action['id']}")
+            return not isinstance(result.result, ResponseDetails), result.dict()
+        case name:
+            raise ValueError(f"Unknown action {name}, expected one of {sorted(ACTION_ARGUMENTS)}")
+
+
+async def run_action(
+    processor: "AsyncCryptoExchangeProcessor",
+    line: str,
+    number: int,
+    batch_id: str,
+) -> Dict[str, Any]:
+    """Parse and execute one input line, return its result record, errors included"""
+    started_at = time.perf_counter()
+    record: Dict[str, Any] = {"id": number}
+    try:
+        action = parse_action(line, number)
+        record.update(id=action["id"], action=action.get("action"))
+        ok, result = await execute_action(processor, action, batch_id)
+        record.update(ok=ok, result=result)
+    except Exception as error:
+        record.update(ok=False, error=f"{type(error).__name__}: {error}")
+    record["latency"] = time.perf_counter() - started_at
+    return record
+
+
+async def run_batch_async(
+    processor: "AsyncCryptoExchangeProcessor",
+    actions: IO[str],
+    output: IO[str],
+    concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    batch_id: Optional[str] = None,
+) -> int:
+    """
+    Execute the actions of a file concurrently and stream their results as NDJSON
+
+    Results are written as they complete, the `id` of a record relates it to its line.
+
+    Parameters
+    ----------
+    `processor`
+        Processor executing the actions
+    `actions`
+        Input with one action per line
+    `output`
+        Stream the results are written to
+    `concurrency`
+        Number of actions in flight at once
+    `batch_id`
+        Id the client order ids of the orders derive from, pass the same
+        one to run a file again without placing its orders twice
+
+    Returns
+    ----------
+    int
+        Number of failed actions
+    """
+    import asyncio
+
+    batch_id = batch_id or uuid.uuid4().hex
+    slots = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async def run(line: str, number: int) -> None:
+        nonlocal failures
+        try:
+            record = await run_action(processor, line, number, batch_id)
+        finally:
+            slots.release()
+        failures += not record["ok"]
+        output.write(json.dumps(record, default=str) + "\n")
+        output.flush()
+
+    tasks = set()
+    number = 0
+    while line := await asyncio.to_thread(actions.readline):
+        number += 1
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        await slots.acquire()
+        task = asyncio.ensure_future(run(line, number))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.wait(tasks)
+    return failures
+
+
+def run_batch(
+    processor: "AsyncCryptoExchangeProcessor",
+    actions: IO[str],
+    output: IO[str],
+    concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    batch_id: Optional[str] = None,
+) -> int:
+    """Synchronous wrapper around `run_batch_async`"""
+    return processor.async_client.run(run_batch_async(processor, actions, output, concurrency, batch_id))
@@ -0,0 +1,167 @@
+import asyncio
+import os
+import signal
+import uuid
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+from batch import DEFAULT_BATCH_CONCURRENCY, run_action
+from daemon_client import DEFAULT_SOCKET_PATH, FRAME_HEADER, DaemonClient, FrameError, decode_frame_size, encode_frame
+from src.exchange_processors.fast_decode import decode_json
+
+if TYPE_CHECKING:
+    from src.exchange_processors.exchange_processor import AsyncCryptoExchangeProcessor
+
+# Called with the exchange, the secret key and the `api_key` keyword
+ProcessorFactory = Callable[..., "AsyncCryptoExchangeProcessor"]
+
+
+class CryptoDaemon:
+    """
+    Long-running `cryptocli` process serving batch actions over a Unix domain socket
+
+    Processors are built per (exchange, secret key, API key) and kept warm for the lifetime of the daemon.
+    """
+
+    def __init__(
+        self,
+        create_processor: ProcessorFactory,
+        path: str = DEFAULT_SOCKET_PATH,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    ):
+        """
+        Parameters
+        ----------
+        `create_processor`
+            Builds the processor of an exchange and secret key
+        `path`
+            Socket to listen on, only its owner is allowed to connect
+        `concurrency`
+            Number of actions of one connection in flight at once
+        """
+        self.create_processor = create_processor
+        self.path = path
+        self.concurrency = concurrency
+        self.processors: Dict[Tuple[str, str, Optional[str]], "AsyncCryptoExchangeProcessor"] = {}
+
+    def processor(
+        self, exchange: str, secret_key: str, api_key: Optional[str] = None
+    ) -> "AsyncCryptoExchangeProcessor":
+        """Warm processor of the exchange and keys, built and authorized on first use"""
+        key = (exchange, secret_key, api_key)
+        processor = self.processors.get(key)
+        if processor is None:
+            processor = self.create_processor(exchange, secret_key, api_key=api_key)
+            if not processor.ping_client() == HTTPStatus.OK:
+                raise PermissionError('Client is not authorized, please check secret key')
+            self.processors[key] = processor
+        return processor
+
+    async def execute(self, request: Dict[str, Any], batch_id: str) -> Dict[str, Any]:
+        """Result record of one request"""
+        try:
+            processor = self.processor(request["exchange"], request["secret_key"], request.get("api_key"))
+        except Exception as error:
+            return {"id": request.get("number"), "ok": False, "error": f"{type(error).__name__}: {error}"}
+        return await run_action(processor, request["line"], request.get("number", 1), request.get("batch_id") or batch_id)
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        batch_id = uuid.uuid4().hex
+        slots = asyncio.Semaphore(self.concurrency)
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def answer(record: Dict[str, Any]) -> None:
+            async with write_lock:
+                writer.write(encode_frame(record))
+                await writer.drain()
+
+        async def run(request: Dict[str, Any]) -> None:
+            try:
+                record = await self.execute(request, batch_id)
+            finally:
+                slots.release()
+            await answer(record)
+
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(FRAME_HEADER.size)
+                except asyncio.IncompleteReadError as error:
+                    if error.partial:
+                        raise FrameError("Connection closed in the middle of a frame header")
+                    break
+                body = await reader.readexactly(decode_frame_size(header))
+                try:
+                    request = decode_request(body)
+                except ValueError as error:
+                    # The frame was read whole, the connection is still in sync
+                    await answer({"id": None, "ok": False, "error": f"{type(error).__name__}: {error}"})
+                    continue
+                await slots.acquire()
+                task = asyncio.ensure_future(run(request))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+        except (FrameError, asyncio.IncompleteReadError, ConnectionError):
+            # The client is gone or out of sync, the results in flight can not reach it
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def serve(self) -> None:
+        """Listen on the socket until cancelled"""
+        self.remove_stale_socket()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Requests carry secret keys, so the socket is private to its owner from the start
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self.serve_connection, self.path)
+        finally:
+            os.umask(umask)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.close()
+
+    def remove_stale_socket(self) -> None:
+        """Remove the socket file left by a daemon that is gone, refuse to replace a running one"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            DaemonClient(self.path).close()
+        except OSError:
+            os.unlink(self.path)
+        else:
+            raise RuntimeError(f"A daemon is already listening on {self.path}")
+
+    async def close(self) -> None:
+        """Close the connections of every processor and remove the socket"""
+        for processor in self.processors.values():
+            processor.client.close()
+            await processor.async_client.aclose()
+        self.processors.clear()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def run(self) -> None:
+        """Serve until interrupted or terminated"""
+        async def serve_until_terminated() -> None:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+            await self.serve()
+
+        try:
+            asyncio.run(serve_until_terminated())
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            pass
+
+
+def decode_request(body: bytes) -> Dict[str, Any]:
+    """Request of a frame body, `ValueError` when it is not a JSON object"""
+    request = decode_json(body)
+    if not isinstance(request, dict):
+        raise ValueError(f"Expected a JSON object, got {type(request).__name__}")
+    return request
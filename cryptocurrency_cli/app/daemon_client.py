@@ -0,0 +1,154 @@
+import json
+import os
+import socket
+import struct
+import threading
+from typing import IO, Any, Dict, Optional
+
+
+DEFAULT_SOCKET_PATH = os.path.join(os.path.expanduser("~"), ".cryptocli", "daemon.sock")
+
+# Every message is a JSON object preceded by its length as a 4 byte big-endian integer
+FRAME_HEADER = struct.Struct("!I")
+MAX_FRAME_SIZE = 64 * 2 ** 20
+
+
+class FrameError(Exception):
+    """Frame that can not be read, the connection is out of sync and has to be closed"""
+
+
+def encode_frame(message: Dict[str, Any]) -> bytes:
+    """Length-prefixed JSON frame of the message"""
+    body = json.dumps(message, default=str, separators=(",", ":")).encode()
+    if len(body) > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame of {len(body)} bytes is over the {MAX_FRAME_SIZE} bytes limit")
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+def decode_frame_size(header: bytes) -> int:
+    """Length of the body announced by the header"""
+    (size,) = FRAME_HEADER.unpack(header)
+    if size > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame of {size} bytes is over the {MAX_FRAME_SIZE} bytes limit")
+    return size
+
+
+class DaemonClient:
+    """Thin client of the `cryptocli` daemon, sending batch lines over one Unix domain socket connection"""
+
+    def __init__(self, path: str = DEFAULT_SOCKET_PATH, timeout: Optional[float] = None):
+        """
+        Parameters
+        ----------
+        `path`
+            Socket the daemon listens on
+        `timeout`
+            Seconds a read or write of the socket may take
+        """
+        self.path = path
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.settimeout(timeout)
+        self.socket.connect(path)
+        self.reader = self.socket.makefile("rb")
+        self.write_lock = threading.Lock()
+
+    def send(
+        self,
+        exchange: str,
+        secret_key: str,
+        line: str,
+        number: int = 1,
+        batch_id: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> None:
+        """Send one action line, see `batch.parse_action` for its format"""
+        frame = encode_frame({
+            "exchange": exchange,
+            "secret_key": secret_key,
+            "api_key": api_key,
+            "line": line,
+            "number": number,
+            "batch_id": batch_id,
+        })
+        with self.write_lock:
+            self.socket.sendall(frame)
+
+    def receive(self) -> Optional[Dict[str, Any]]:
+        """Next result record, `None` once the daemon closed the connection"""
+        header = self.reader.read(FRAME_HEADER.size)
+        if not header:
+            return None
+        if len(header) < FRAME_HEADER.size:
+            raise FrameError("Connection closed in the middle of a frame header")
+        size = decode_frame_size(header)
+        body = self.reader.read(size)
+        if len(body) < size:
+            raise FrameError("Connection closed in the middle of a frame")
+        return json.loads(body)
+
+    def call(
+        self,
+        exchange: str,
+        secret_key: str,
+        line: str,
+        batch_id: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Execute one action and wait for its result record"""
+        self.send(exchange, secret_key, line, batch_id=batch_id, api_key=api_key)
+        record = self.receive()
+        if record is None:
+            raise FrameError("Daemon closed the connection without answering")
+        return record
+
+    def close(self) -> None:
+        self.reader.close()
+        self.socket.close()
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def forward_batch(
+    client: DaemonClient,
+    exchange: str,
+    secret_key: str,
+    actions: IO[str],
+    output: IO[str],
+    batch_id: Optional[str] = None,
+    api_key: Optional[str] = None,
+) -> int:
+    """
+    Run the actions of a file on the daemon and stream their results as NDJSON
+
+    Lines are sent from a background thread, the records come out in completion order.
+
+    Returns
+    ----------
+    int
+        Number of failed actions
+    """
+    def send_all() -> None:
+        number = 0
+        try:
+            while line := actions.readline():
+                number += 1
+                if not line.strip() or line.lstrip().startswith("#"):
+                    continue
+                client.send(exchange, secret_key, line, number, batch_id, api_key)
+        finally:
+            # Tells the daemon no more lines come, it closes the connection after the last result
+            client.socket.shutdown(socket.SHUT_WR)
+
+    sender = threading.Thread(target=send_all, daemon=True)
+    sender.start()
+    failures = 0
+    while (record := client.receive()) is not None:
+        failures += not record["ok"]
+        output.write(json.dumps(record, default=str) + "\n")
+        output.flush()
+    sender.join()
+    return failures
@@ -9,4 +9,6 @@ class ExchangeTypes(Enum):
 class ActionTypes(Enum):
     GET_ACCOUNT = 'get_account'
     GET_CANDLE = 'get_candle'
-    PLACE_ORDER = 'place_order'
\ No newline at end of file
+    PLACE_ORDER = 'place_order'
+    EXPORT_CANDLES = 'export_candles'
+    POPULAR_COINS = 'popular_coins'
\ No newline at end of file
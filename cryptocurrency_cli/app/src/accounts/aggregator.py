@@ -0,0 +1,237 @@
+import asyncio
+import time
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from pydantic import BaseModel
+from src.clients.rate_limiter import CombinedRateLimiter, RateLimiter
+from src.exchange_processors.exchange_processor import AsyncCryptoExchangeProcessor
+from src.exchange_processors.models import AccountDetails, ResponseDetails
+
+
+DEFAULT_AGGREGATOR_CONCURRENCY = 16
+
+# Called with the exchange, the secret key and the `api_key` keyword
+ProcessorFactory = Callable[..., AsyncCryptoExchangeProcessor]
+Operation = Callable[[AsyncCryptoExchangeProcessor], Awaitable[Any]]
+
+
+class AccountKey(BaseModel):
+    """
+    API key of one account of a key file
+
+    `name`: str
+        Name the results of the account are reported under
+    `secret_key`: str
+        Secret key of the account
+    `api_key`: Optional[str]
+        API key of the account, for exchanges asking for it next to the signature
+    """
+    name: str
+    secret_key: str
+    api_key: Optional[str] = None
+
+
+class KeyResult(BaseModel):
+    """
+    Outcome of an operation run with one key
+
+    `name`: str
+        Name of the key
+    `result`: Any
+        Result of the operation, `None` when it failed
+    `error`: Optional[str]
+        Why the operation failed, `None` when it succeeded
+    `latency`: float
+        Seconds the operation took, rate limiter waits included
+    """
+    name: str
+    result: Any = None
+    error: Optional[str] = None
+    latency: float = 0.0
+
+
+class AggregatedResults(BaseModel):
+    """
+    Results of an operation run across every key
+
+    `results`: List[KeyResult]
+        Outcome per key, in the order of the key file
+    `wall`: float
+        Seconds the whole run took
+    """
+    results: List[KeyResult]
+    wall: float
+
+    @property
+    def failed(self) -> int:
+        return sum(result.error is not None for result in self.results)
+
+    @property
+    def serial(self) -> float:
+        """Seconds the operations took added up, about what running them one key after another costs"""
+        return sum(result.latency for result in self.results)
+
+    @property
+    def speedup(self) -> float:
+        return self.serial / self.wall if self.wall else 1.0
+
+
+class ConsolidatedBalances(AggregatedResults):
+    """
+    Balances of every account and their sum
+
+    `balances`: Dict[str, float]
+        Amount of every asset summed over the accounts that answered
+    """
+    balances: Dict[str, float]
+
+
+def read_key_file(lines: Iterable[str]) -> List[AccountKey]:
+    """
+    Keys of a key file
+
+    Every line is a secret key, optionally preceded by its account name and followed by its API key,
+    e.g. `trading-1 <secret key> <api key>`.
+    """
+    keys: List[AccountKey] = []
+    names = set()
+    for number, line in enumerate(lines, 1):
+        fields = line.split()
+        if not fields or fields[0].startswith("#"):
+            continue
+        if len(fields) > 3:
+            raise ValueError(
+                f"Line {number} of the key file must be `[name] secret_key [api_key]`, got {len(fields)} fields"
+            )
+        if len(fields) == 1:
+            fields.insert(0, f"key{number}")
+        name, secret_key, api_key = (fields + [None])[:3]
+        if name in names:
+            raise ValueError(f"Line {number} of the key file repeats the name {name}")
+        names.add(name)
+        keys.append(AccountKey(name=name, secret_key=secret_key, api_key=api_key))
+    return keys
+
+
+class AccountAggregator:
+    """
+    Runs an operation with every key of a key file and merges the results
+
+    At most `concurrency` operations run at once, within the rate budget of the exchange and of each key.
+    """
+
+    def __init__(
+        self,
+        create_processor: ProcessorFactory,
+        exchange: str,
+        keys: Iterable[AccountKey],
+        concurrency: int = DEFAULT_AGGREGATOR_CONCURRENCY,
+        key_weight_budget: Optional[int] = None,
+        key_weight_interval: float = 60,
+    ):
+        """
+        Parameters
+        ----------
+        `create_processor`
+            Builds the processor of an exchange and secret key
+        `exchange`
+            Exchange of the accounts
+        `keys`
+            Keys of the accounts
+        `concurrency`
+            Number of operations in flight at once
+        `key_weight_budget`, `key_weight_interval`
+            Request weight each key may spend per interval in seconds, only
+            the shared budget of the exchange applies when not set
+        """
+        self.exchange = exchange
+        self.concurrency = concurrency
+        self.key_weight_budget = key_weight_budget
+        self.key_weight_interval = key_weight_interval
+        self.processors: Dict[str, AsyncCryptoExchangeProcessor] = {}
+        for key in keys:
+            processor = create_processor(exchange, key.secret_key, api_key=key.api_key)
+            if key_weight_budget is not None:
+                self.limit_key(key.name, processor)
+            self.processors[key.name] = processor
+
+    def limit_key(self, name: str, processor: AsyncCryptoExchangeProcessor) -> None:
+        """Charge the requests of the processor to a budget of its own key as well"""
+        shared = processor.client.rate_limiter
+        own = RateLimiter(
+            f"{self.exchange}:{name}",
+            self.key_weight_budget,
+            self.key_weight_interval,
+            weights=shared.weights if shared is not None else processor.request_weights,
+        )
+        limiter = CombinedRateLimiter(own, shared) if shared is not None else own
+        processor.client.rate_limiter = limiter
+        processor.async_client.rate_limiter = limiter
+
+    async def map_async(self, operation: Operation) -> AggregatedResults:
+        """
+        Run `operation` with the processor of every key
+
+        An operation raising or returning `ResponseDetails` fails for its key
+        only, the others still run.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(name: str, processor: AsyncCryptoExchangeProcessor) -> KeyResult:
+            async with semaphore:
+                started_at = time.perf_counter()
+                try:
+                    if not await processor.ping_client_async() == HTTPStatus.OK:
+                        raise PermissionError("Client is not authorized, please check secret key")
+                    result = await operation(processor)
+                except Exception as error:
+                    result = KeyResult(name=name, error=f"{type(error).__name__}: {error}")
+                else:
+                    if isinstance(result, ResponseDetails):
+                        result = KeyResult(name=name, error=f"{result.status_code}: {result.details}")
+                    else:
+                        result = KeyResult(name=name, result=result)
+                result.latency = time.perf_counter() - started_at
+                return result
+
+        started_at = time.perf_counter()
+        try:
+            results = await asyncio.gather(*(run(name, processor) for name, processor in self.processors.items()))
+        finally:
+            # Sessions are bound to the event loop of the run
+            for processor in self.processors.values():
+                await processor.async_client.aclose()
+        return AggregatedResults(results=list(results), wall=time.perf_counter() - started_at)
+
+    def map(self, operation: Operation) -> AggregatedResults:
+        """Synchronous wrapper around `map_async`"""
+        return asyncio.run(self.map_async(operation))
+
+    def get_accounts(self) -> ConsolidatedBalances:
+        """Balances of every account, summed per asset"""
+        aggregated = self.map(lambda processor: processor.get_account_async(None))
+        balances: Dict[str, float] = {}
+        for result in aggregated.results:
+            if isinstance(result.result, AccountDetails):
+                for asset, amount in result.result.balances.items():
+                    balances[asset] = balances.get(asset, 0.0) + float(amount)
+        return ConsolidatedBalances(
+            results=aggregated.results,
+            wall=aggregated.wall,
+            balances=dict(sorted(balances.items())),
+        )
+
+    def show_candles(self, symbol: str, interval: Optional[str], limit: Optional[int] = None) -> AggregatedResults:
+        """Candles of the symbol as every key sees them"""
+        return self.map(lambda processor: processor.show_candles_async(symbol, interval, limit))
+
+    def close(self) -> None:
+        """Close the connections of every processor"""
+        for processor in self.processors.values():
+            processor.client.close()
+
+    def __enter__(self) -> "AccountAggregator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,199 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, Optional, Tuple
+from pydantic import BaseModel
+from src.exchange_processors.candle_series import CandleSeries
+from src.exchange_processors.exchange_processor import AsyncCryptoExchangeProcessor
+from src.storage.candle_store import CandleStore
+
+
+DEFAULT_BACKFILL_CONCURRENCY = 8
+CHECKPOINT_FILE = "backfill.json"
+
+
+class BackfillCheckpoint(BaseModel):
+    """
+    Progress of a backfill, saved after every chunk written to the store
+
+    `start_time`: int
+        Open time the backfill started from, in milliseconds
+    `end_time`: int
+        Open time the backfill stops before, in milliseconds
+    `next_time`: int
+        Start of the first chunk not written yet, the job resumes from there
+    `rows`: int
+        Number of candles written so far
+    """
+    start_time: int
+    end_time: int
+    next_time: int
+    rows: int = 0
+
+    @property
+    def done(self) -> bool:
+        return self.next_time >= self.end_time
+
+
+class BackfillEngine:
+    """
+    Parallel, resumable download of candle history into a `CandleStore`
+
+    Chunks are fetched concurrently, appended in order and checkpointed, so an interrupted job resumes.
+    """
+
+    def __init__(
+        self,
+        processor: AsyncCryptoExchangeProcessor,
+        store: CandleStore,
+        concurrency: int = DEFAULT_BACKFILL_CONCURRENCY,
+    ):
+        """
+        Parameters
+        ----------
+        `processor`
+            Processor fetching the history pages
+        `store`
+            Store the candles are appended to
+        `concurrency`
+            Number of chunks fetched ahead of the one being written
+        """
+        self.processor = processor
+        self.store = store
+        self.concurrency = concurrency
+        self.exchange = processor.client.exchange
+
+    def checkpoint_path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.store.path(self.exchange, symbol, interval), CHECKPOINT_FILE)
+
+    def load_checkpoint(self, symbol: str, interval: str) -> Optional[BackfillCheckpoint]:
+        try:
+            return BackfillCheckpoint.parse_file(self.checkpoint_path(symbol, interval))
+        except FileNotFoundError:
+            return None
+
+    def save_checkpoint(self, symbol: str, interval: str, checkpoint: BackfillCheckpoint) -> None:
+        """Replace the checkpoint atomically, a crash never leaves a torn file"""
+        path = self.checkpoint_path(symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "w") as file:
+            file.write(checkpoint.json())
+        os.replace(f"{path}.tmp", path)
+
+    def plan(self, symbol: str, interval: str, start_time: int, end_time: Optional[int]) -> BackfillCheckpoint:
+        """
+        Checkpoint to run the backfill from
+
+        `end_time` defaults to the open time of the current candle, so only closed candles are stored.
+        """
+        step = self.processor.interval_milliseconds[interval]
+        now = int(time.time() * 1000)
+        end_time = min(end_time or now, now - now % step)
+        start_time -= start_time % step
+
+        checkpoint = self.load_checkpoint(symbol, interval)
+        covered = checkpoint is not None and checkpoint.start_time <= start_time
+        first_open_time = self.store.first_open_time(self.exchange, symbol, interval)
+        # A backfill covering the range found no candles before the first stored one
+        if first_open_time is not None and first_open_time > start_time and not covered:
+            raise ValueError(
+                f"{symbol} {interval} store starts at {first_open_time}, "
+                f"history before it can not be appended, start the backfill from there or use another store"
+            )
+        planned = BackfillCheckpoint(start_time=start_time, end_time=end_time, next_time=start_time)
+        if covered and start_time < checkpoint.next_time:
+            planned.next_time, planned.rows = checkpoint.next_time, checkpoint.rows
+        last_open_time = self.store.last_open_time(self.exchange, symbol, interval)
+        if last_open_time is not None:
+            planned.next_time = max(planned.next_time, last_open_time + step)
+        planned.next_time = min(planned.next_time, end_time)
+        return planned
+
+    def chunks(self, interval: str, checkpoint: BackfillCheckpoint) -> Iterable[Tuple[int, int]]:
+        """(first, last) open times of every chunk left, one history page each"""
+        step = self.processor.interval_milliseconds[interval]
+        span = self.processor.candle_page_limit * step
+        for chunk_start in range(checkpoint.next_time, checkpoint.end_time, span):
+            yield chunk_start, min(chunk_start + span, checkpoint.end_time) - 1
+
+    async def backfill_async(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: int,
+        end_time: Optional[int] = None,
+        on_progress: Optional[Callable[[BackfillCheckpoint], None]] = None,
+    ) -> BackfillCheckpoint:
+        """
+        Backfill one symbol/interval
+
+        Parameters
+        ----------
+        `symbol`, `interval`
+            Series to backfill
+        `start_time`, `end_time`
+            Open time range in milliseconds, `end_time` defaults to now
+        `on_progress`
+            Called with the checkpoint after every written chunk
+
+        Returns
+        ----------
+        BackfillCheckpoint
+            Final checkpoint of the job
+        """
+        checkpoint = self.plan(symbol, interval, start_time, end_time)
+        chunks = iter(self.chunks(interval, checkpoint))
+        in_flight: Deque[Tuple[int, asyncio.Task]] = deque()
+
+        def fetch_ahead() -> None:
+            while len(in_flight) < self.concurrency:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                task = asyncio.ensure_future(self.processor.fetch_candle_range_async(symbol, interval, *chunk))
+                in_flight.append((chunk[1] + 1, task))
+
+        try:
+            fetch_ahead()
+            while in_flight:
+                chunk_end, task = in_flight.popleft()
+                series: CandleSeries = await task
+                fetch_ahead()
+                if len(series):
+                    checkpoint.rows += self.store.append(
+                        self.exchange, symbol, interval, series.columns, series.price_decimals
+                    )
+                checkpoint.next_time = chunk_end
+                self.save_checkpoint(symbol, interval, checkpoint)
+                if on_progress is not None:
+                    on_progress(checkpoint)
+        finally:
+            for _, task in in_flight:
+                task.cancel()
+        self.save_checkpoint(symbol, interval, checkpoint)
+        return checkpoint
+
+    async def backfill_many_async(
+        self,
+        symbols: Iterable[str],
+        intervals: Iterable[str],
+        start_time: int,
+        end_time: Optional[int] = None,
+    ) -> Dict[Tuple[str, str], BackfillCheckpoint]:
+        """Backfill every symbol/interval pair concurrently, they share the rate budget of the client"""
+        keys = [(symbol, interval) for symbol in symbols for interval in intervals]
+        results = await asyncio.gather(
+            *(self.backfill_async(symbol, interval, start_time, end_time) for symbol, interval in keys)
+        )
+        return dict(zip(keys, results))
+
+    def backfill(
+        self,
+        symbols: Iterable[str],
+        intervals: Iterable[str],
+        start_time: int,
+        end_time: Optional[int] = None,
+    ) -> Dict[Tuple[str, str], BackfillCheckpoint]:
+        """Synchronous wrapper around `backfill_many_async`"""
+        return self.processor.async_client.run(self.backfill_many_async(symbols, intervals, start_time, end_time))
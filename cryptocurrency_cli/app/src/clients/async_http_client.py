@@ -0,0 +1,246 @@
+import asyncio
+import time
+from http.client import HTTPException
+from typing import Any, AsyncIterator, Awaitable, List, Optional, TypeVar
+import httpx
+from src.clients.coalescing import AsyncSingleFlight, CoalescingStats, request_key
+from src.clients.http_client import DEFAULT_POOL_MAXSIZE, RequestType, SignParams, default_ssl_context
+from src.clients.rate_limiter import RateLimiter
+from src.clients.retry import RetryPolicy, RetryStats
+from src.clients.transfer import ACCEPT_ENCODING, TransferStats
+
+
+DEFAULT_MAX_CONCURRENCY = 10
+
+Result = TypeVar('Result')
+
+
+class AsyncHTTPClient:
+    """
+    Asynchronous counterpart of `HTTPClient`
+
+    One session per event loop, closed with its loop unless `aclose()` was called before.
+    """
+
+    def __init__(
+        self,
+        headers: dict,
+        supported_codes: List[int],
+        base_path: str,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        keep_alive: bool = True,
+        timeout: Optional[float] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        coalesce: bool = True,
+        http2: bool = False,
+        compress: bool = True,
+    ):
+        """
+        Parameters
+        ----------
+        `headers`
+            Headers sent with every request
+        `supported_codes`
+            Status codes treated as a successful response
+        `base_path`
+            Exchange API base url, prepended to every request path
+        `max_concurrency`
+            Maximum number of requests in flight at the same time
+        `pool_maxsize`
+            Maximum number of connections opened to the exchange host
+        `keep_alive`
+            Reuse connections between requests
+        `timeout`
+            Timeout of a single request in seconds
+        `rate_limiter`
+            Request weight budget, requests are delayed until they fit in it
+        `retry_policy`
+            Retry policy of failed requests, `RetryPolicy()` by default
+        `coalesce`
+            Identical GET requests sent while one is in flight share its response
+        `http2`
+            Multiplex the requests as streams of one HTTP/2 connection, see `HTTPClient`
+        `compress`
+            Accept gzip and deflate compressed responses, otherwise ask for them uncompressed
+        """
+        self.headers = headers
+        self.supported_codes = supported_codes
+        self.base_path = base_path
+        self.max_concurrency = max_concurrency
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_stats = RetryStats()
+        self.coalesce = coalesce
+        self.http2 = http2
+        self.compress = compress
+        self.transfer_stats = TransferStats()
+        self.coalescing_stats = CoalescingStats()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Optional[httpx.AsyncClient] = None
+        self._closer: Optional[AsyncIterator[None]] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._single_flight: Optional[AsyncSingleFlight] = None
+
+    def create_session(self) -> httpx.AsyncClient:
+        """Create the pooled session used by the client"""
+        limits = httpx.Limits(
+            max_connections=self.pool_maxsize,
+            max_keepalive_connections=self.pool_maxsize if self.keep_alive else 0,
+        )
+        return httpx.AsyncClient(
+            limits=limits,
+            timeout=self.timeout,
+            verify=default_ssl_context(),
+            http1=not (self.http2 and self.base_path.startswith("http://")),
+            http2=self.http2,
+            headers={"Accept-Encoding": ACCEPT_ENCODING if self.compress else "identity"},
+        )
+
+    @property
+    def session(self) -> httpx.AsyncClient:
+        """Session bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._loop is not loop:
+            self._loop = loop
+            self._session = self.create_session()
+            # The loop closes its pending async generators when it shuts down, e.g. at the end of `asyncio.run`
+            self._closer = close_with_loop(self._session)
+            loop.create_task(self._closer.__anext__())
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._single_flight = AsyncSingleFlight(self.coalescing_stats)
+        return self._session
+
+    async def aclose(self) -> None:
+        """Close the session and every pooled connection"""
+        if self._closer is not None:
+            # Finishing the generator closes the session, a pending one would be finalized as the loop closes
+            await self._closer.aclose()
+        elif self._session is not None:
+            await self._session.aclose()
+        self._loop = self._session = self._closer = self._semaphore = self._single_flight = None
+
+    async def __aenter__(self) -> "AsyncHTTPClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def run(self, awaitable: Awaitable[Result]) -> Result:
+        """Run `awaitable` on a new event loop and close the session afterwards"""
+        async def run_and_close() -> Any:
+            async with self:
+                return await awaitable
+        return asyncio.run(run_and_close())
+
+    async def request(
+        self,
+        type: RequestType,
+        path: str,
+        params: Optional[dict] = None,
+        body: Optional[dict] = None,
+        data: Optional[dict] = None,
+        idempotent: bool = False,
+        sign: Optional[SignParams] = None,
+    ) -> httpx.Response:
+        """
+        Request processor
+
+        `idempotent` allows retrying a request whose method is not
+        idempotent, when repeating it can not apply it twice. With `coalesce`
+        a GET identical to one in flight waits for its response instead of
+        being sent. `sign` is applied to the params before every attempt, so
+        a retry carries a fresh timestamp rather than one the exchange
+        rejects as expired.
+        """
+        if not isinstance(type, RequestType):
+            raise HTTPException('Exception occurred during processing the request')
+
+        key = request_key(type.value, path, params) if self.coalesce and body is None and data is None else None
+        if key is None:
+            return await self.send(type, path, params, body, data, idempotent, sign)
+        weight = self.rate_limiter.weight_of(path) if self.rate_limiter is not None else 0
+        # The session property binds the single flight to the running loop
+        self.session
+        return await self._single_flight.run(
+            key, lambda: self.send(type, path, params, body, data, idempotent, sign), weight
+        )
+
+    async def send(
+        self,
+        type: RequestType,
+        path: str,
+        params: Optional[dict],
+        body: Optional[dict],
+        data: Optional[dict],
+        idempotent: bool,
+        sign: Optional[SignParams] = None,
+    ) -> httpx.Response:
+        """Send the request, retrying it as the policy allows"""
+        session = self.session
+        started_at = time.monotonic()
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire_async(path)
+                try:
+                    response = await session.request(
+                        type.value,
+                        self.base_path + path,
+                        headers=self.headers,
+                        params=params if sign is None else sign(dict(params or {})),
+                        data=data,
+                        json=body,
+                    )
+                except httpx.TransportError:
+                    delay = self.retry_policy.next_delay(
+                        type.value, attempt, time.monotonic() - started_at, idempotent=idempotent
+                    )
+                    if delay is None:
+                        self.record_failure(attempt)
+                        raise
+                else:
+                    self.transfer_stats.record(response.num_bytes_downloaded, len(response.content))
+                    if response.status_code in self.supported_codes:
+                        return response
+                    delay = self.retry_policy.next_delay(
+                        type.value,
+                        attempt,
+                        time.monotonic() - started_at,
+                        response.status_code,
+                        response.headers.get("Retry-After"),
+                        idempotent=idempotent,
+                    )
+                    if delay is None:
+                        self.record_failure(attempt)
+                        return self.handle_response(response)
+
+            self.retry_stats.record_retry(delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def record_failure(self, attempt: int) -> None:
+        """Count the request as exhausted if it was retried before failing"""
+        if attempt:
+            self.retry_stats.record_exhausted()
+
+    def handle_response(self, response: httpx.Response) -> httpx.Response:
+        """Handle the response"""
+        if response.status_code in self.supported_codes:
+            return response
+        error = HTTPException('Exception occurred during processing the request')
+        error.response = response
+        raise error
+
+
+async def close_with_loop(session: httpx.AsyncClient) -> AsyncIterator[None]:
+    """Suspended until its event loop shuts down, then closes `session` on that loop"""
+    try:
+        yield
+    finally:
+        await session.aclose()
@@ -1,23 +1,46 @@
-from typing import Any, List, Optional
+import hashlib
+import hmac
+from typing import Any, ClassVar, List, Optional
+from urllib.parse import urlencode
 from src.clients.http_client import HTTPClient
+from src.clients.rate_limiter import get_rate_limiter
 
 
 class BinanceClient(HTTPClient):
     """Binance client"""
 
+    exchange: ClassVar[str] = "binance"
+    request_weight_budget: ClassVar[int] = 1200
+    request_weight_interval: ClassVar[float] = 60
+
     def __init__(
         self,
         secretKey: str,
-        base_path: Optional[str] = '...',
-        supported_codes: Optional[List[int]] = [...],
+        base_path: Optional[str] = 'https://api.binance.com/api/v3',
+        supported_codes: Optional[List[int]] = [200],
+        api_key: Optional[str] = None,
+        **kwargs: Any,
     ):
+        """
+        Parameters
+        ----------
+        `secretKey`
+            Secret the signed requests are signed with, it is never sent
+        `api_key`
+            API key sent in the `X-MBX-APIKEY` header, needed by the signed requests
+        """
         self.secretKey = secretKey
+        kwargs.setdefault(
+            "rate_limiter",
+            get_rate_limiter(self.exchange, self.request_weight_budget, self.request_weight_interval),
+        )
         super().__init__(
-            headers={...},
+            headers={"X-MBX-APIKEY": api_key} if api_key else {},
             base_path=base_path,
             supported_codes=supported_codes,
+            **kwargs,
         )
 
     def get_signature(self, params: dict[str, Any]) -> str:
-        """Get signature"""
-        ...
+        """Get signature, HMAC SHA256 of the query string in the order the params are sent"""
+        return hmac.new(self.secretKey.encode(), urlencode(params).encode(), hashlib.sha256).hexdigest()
@@ -1,20 +1,31 @@
-from typing import List, Any, Optional
+from typing import List, Any, ClassVar, Optional
 from src.clients.http_client import HTTPClient
+from src.clients.rate_limiter import get_rate_limiter
 
 
 class BitfinexClient(HTTPClient):
 
+    exchange: ClassVar[str] = "bitfinex"
+    request_weight_budget: ClassVar[int] = 90
+    request_weight_interval: ClassVar[float] = 60
+
     def __init__(
         self,
         secretKey: str,
-        base_path: Optional[str] = '...',
-        supported_codes: Optional[List[int]] = [],
+        base_path: Optional[str] = 'https://api.bitfinex.com',
+        supported_codes: Optional[List[int]] = [200],
+        **kwargs: Any,
     ):
         self.secretKey = secretKey
+        kwargs.setdefault(
+            "rate_limiter",
+            get_rate_limiter(self.exchange, self.request_weight_budget, self.request_weight_interval),
+        )
         super().__init__(
-            headers={...},
+            headers={},
             base_path=base_path,
             supported_codes=supported_codes,
+            **kwargs,
         )
 
     def get_signature(self, params: dict[str, Any]) -> str:
@@ -0,0 +1,129 @@
+import threading
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+from pydantic import BaseModel, PrivateAttr
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+Result = TypeVar('Result')
+
+# Only reads are shared, whatever `idempotent` says about retrying a write
+COALESCED_METHODS = {"GET"}
+
+
+class CoalescingStats(BaseModel):
+    """
+    Counters of the requests sharing a call in flight
+
+    `sent`: int
+        Requests that went out on behalf of every identical one arriving meanwhile
+    `coalesced`: int
+        Requests answered with the response of an identical one in flight
+    `saved_weight`: int
+        Rate limit weight the coalesced requests did not spend
+    """
+    sent: int = 0
+    coalesced: int = 0
+    saved_weight: int = 0
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def record_sent(self) -> None:
+        with self._lock:
+            self.sent += 1
+
+    def record_coalesced(self, weight: int) -> None:
+        with self._lock:
+            self.coalesced += 1
+            self.saved_weight += weight
+
+
+def request_key(method: str, path: str, params: Optional[dict]) -> Optional[Hashable]:
+    """Key identical requests share, `None` for requests that are never coalesced"""
+    if method not in COALESCED_METHODS:
+        return None
+    try:
+        key = method, path, tuple(sorted((params or {}).items()))
+        hash(key)
+    except TypeError:
+        # Unhashable or unorderable params, e.g. lists of values, are simply sent
+        return None
+    return key
+
+
+class SingleFlight:
+    """
+    Calls in flight keyed by request, shared by the threads asking for the same one
+
+    Callers of a key in flight share its result or exception, nothing is cached afterwards.
+    """
+
+    def __init__(self, stats: CoalescingStats):
+        self.stats = stats
+        self.lock = threading.Lock()
+        self.in_flight: Dict[Hashable, Future] = {}
+
+    def run(self, key: Hashable, call: Callable[[], Result], weight: int = 0) -> Result:
+        """
+        Result of `call`, or of the call of the same key in flight
+
+        Parameters
+        ----------
+        `weight`
+            Rate limit weight saved when the call in flight is shared
+        """
+        with self.lock:
+            future = self.in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self.in_flight[key] = Future()
+        if not leader:
+            self.stats.record_coalesced(weight)
+            return future.result()
+
+        self.stats.record_sent()
+        try:
+            result = call()
+        except BaseException as error:
+            self.finish(key)
+            future.set_exception(error)
+            raise
+        self.finish(key)
+        future.set_result(result)
+        return result
+
+    def finish(self, key: Hashable) -> None:
+        """Let the next caller of the key start its own call"""
+        with self.lock:
+            del self.in_flight[key]
+
+
+class AsyncSingleFlight:
+    """`SingleFlight` of the tasks of one event loop"""
+
+    def __init__(self, stats: CoalescingStats):
+        self.stats = stats
+        self.in_flight: Dict[Hashable, "asyncio.Future"] = {}
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Result]], weight: int = 0) -> Result:
+        """Result of `call`, or of the call of the same key in flight"""
+        import asyncio
+
+        task = self.in_flight.get(key)
+        if task is not None:
+            self.stats.record_coalesced(weight)
+        else:
+            self.stats.record_sent()
+            task = self.in_flight[key] = asyncio.ensure_future(call())
+            task.add_done_callback(lambda done: self.finish(key, done))
+        # A cancelled caller must not cancel the call the others wait for
+        return await asyncio.shield(task)
+
+    def finish(self, key: Hashable, task: "asyncio.Future") -> None:
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved, every waiting caller already got it
+            task.exception()
@@ -1,31 +1,221 @@
+import threading
+import time
 from enum import Enum
-from typing import List, Optional
-import requests
-from requests.models import Response
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Iterator, List, Optional, Tuple, Type, Union
 from http.client import HTTPException
+from src.clients.coalescing import CoalescingStats, SingleFlight, request_key
+from src.clients.rate_limiter import RateLimiter
+from src.clients.retry import RetryPolicy, RetryStats
+from src.clients.transfer import ACCEPT_ENCODING, STREAM_CHUNK_SIZE, TransferStats, iter_json_rows
+
+# `requests` is imported with the first request, so the CLI starts without it
+if TYPE_CHECKING:
+    import ssl
+    import httpx
+    import requests
+    from requests.models import Response
+    from src.clients.async_http_client import AsyncHTTPClient
+    from src.clients.instrumentation import RequestInstrumentation
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+# Returns the params of one attempt of a request, given a copy of its params
+SignParams = Callable[[dict], dict]
+
+
+@lru_cache(maxsize=None)
+def default_ssl_context() -> "ssl.SSLContext":
+    """
+    SSL context shared by the httpx sessions
+
+    Loading the CA bundle takes tens of milliseconds, paid once instead of
+    by every session, e.g. of every account of an `AccountAggregator`.
+    """
+    import httpx
+
+    return httpx.create_ssl_context()
 
 
 class RequestType(Enum):
     GET = "GET"
     POST = "POST"
     PUT = "PUT"
-    PATCH = "DELETE"
-    DELETE = "PATCH"
+    PATCH = "PATCH"
+    DELETE = "DELETE"
 
 
 class HTTPClient:
-    """Base HTTP client"""
+    """
+    Base HTTP client
+
+    Requests share one pooled session, `httpx` with `http2` and `requests` otherwise, released by `close()`.
+    """
 
     def __init__(
         self,
         headers: dict,
         supported_codes: List[int],
         base_path: str,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        timeout: Optional[float] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        instrumentation: Optional["RequestInstrumentation"] = None,
+        coalesce: bool = True,
+        http2: bool = False,
+        compress: bool = True,
     ):
+        """
+        Parameters
+        ----------
+        `headers`
+            Headers sent with every request
+        `supported_codes`
+            Status codes treated as a successful response
+        `base_path`
+            Exchange API base url, prepended to every request path
+        `pool_connections`
+            Number of per-host connection pools to cache
+        `pool_maxsize`
+            Maximum number of connections kept alive per host
+        `pool_block`
+            Block when the pool is exhausted instead of opening extra connections
+        `keep_alive`
+            Reuse connections between requests, otherwise send `Connection: close`
+        `timeout`
+            Default timeout of a single request in seconds
+        `rate_limiter`
+            Request weight budget, requests are delayed until they fit in it
+        `retry_policy`
+            Retry policy of failed requests, `RetryPolicy()` by default
+        `instrumentation`
+            Records the phase timings of every request, set it before the first request
+        `coalesce`
+            Identical GET requests sent while one is in flight share its response
+        `http2`
+            Send the requests over HTTP/2 through `httpx`, negotiated with ALPN
+            on https, spoken with prior knowledge on plain http. Instrumented
+            requests do not split out `connect` and `tls` in this mode
+        `compress`
+            Accept gzip and deflate compressed responses, otherwise ask for them uncompressed
+        """
         self.headers = headers
         self.supported_codes = supported_codes
         self.base_path = base_path
-        self.args = {"headers": self.headers}
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_stats = RetryStats()
+        self.instrumentation = instrumentation
+        self.coalesce = coalesce
+        self.http2 = http2
+        self.compress = compress
+        self.transfer_stats = TransferStats()
+        self.coalescing_stats = CoalescingStats()
+        self.single_flight = SingleFlight(self.coalescing_stats)
+        self._session: Optional[Union["requests.Session", "httpx.Client"]] = None
+        self._session_lock = threading.Lock()
+
+    def create_session(self) -> Union["requests.Session", "httpx.Client"]:
+        """Create the pooled session used by the client"""
+        if self.http2:
+            return self.create_http2_session()
+
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+        )
+        if self.instrumentation is not None:
+            from src.clients.instrumentation import TIMED_POOL_CLASSES
+
+            adapter.poolmanager.pool_classes_by_scheme = TIMED_POOL_CLASSES
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        session.headers["Accept-Encoding"] = self.accept_encoding
+        return session
+
+    def create_http2_session(self) -> "httpx.Client":
+        """Session multiplexing the requests over HTTP/2, up to `pool_maxsize` connections if the streams run out"""
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=self.pool_maxsize,
+            max_keepalive_connections=self.pool_maxsize if self.keep_alive else 0,
+        )
+        return httpx.Client(
+            limits=limits,
+            timeout=self.timeout,
+            verify=default_ssl_context(),
+            http1=not self.base_path.startswith("http://"),
+            http2=True,
+            headers={"Accept-Encoding": self.accept_encoding},
+        )
+
+    @property
+    def accept_encoding(self) -> str:
+        """`Accept-Encoding` header of every request"""
+        return ACCEPT_ENCODING if self.compress else "identity"
+
+    @property
+    def session(self) -> Union["requests.Session", "httpx.Client"]:
+        """Pooled session, created on first use"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self.create_session()
+        return self._session
+
+    def close(self) -> None:
+        """Close the session and every pooled connection"""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+
+    def to_async(self, max_concurrency: Optional[int] = None) -> "AsyncHTTPClient":
+        """Build an `AsyncHTTPClient` with the same headers, codes and pool settings"""
+        from src.clients.async_http_client import DEFAULT_MAX_CONCURRENCY, AsyncHTTPClient
+
+        async_client = AsyncHTTPClient(
+            headers=self.headers,
+            supported_codes=self.supported_codes,
+            base_path=self.base_path,
+            max_concurrency=max_concurrency or DEFAULT_MAX_CONCURRENCY,
+            pool_maxsize=self.pool_maxsize,
+            keep_alive=self.keep_alive,
+            timeout=self.timeout,
+            rate_limiter=self.rate_limiter,
+            retry_policy=self.retry_policy,
+            coalesce=self.coalesce,
+            http2=self.http2,
+            compress=self.compress,
+        )
+        async_client.retry_stats = self.retry_stats
+        async_client.coalescing_stats = self.coalescing_stats
+        async_client.transfer_stats = self.transfer_stats
+        return async_client
+
+    def __enter__(self) -> "HTTPClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def request(
         self,
@@ -33,29 +223,223 @@ class HTTPClient:
         path: str,
         params: Optional[dict] = None,
         body: Optional[dict] = None,
-        data: Optional[dict] = None
-    ) -> Response:
-        """Request processor"""
-        self.args.update({"url": self.base_path + path})
-
-        match type:
-            case RequestType.GET:
-                response = requests.get(**dict(self.args, params=params))
-            case RequestType.POST:
-                response = requests.post(**dict(self.args, params=params, data=data))
-            case RequestType.PUT:
-                response = requests.put(**dict(self.args, params=params, body=body))
-            case RequestType.DELETE:
-                response = requests.delete(**self.args)
-            case RequestType.PATCH:
-                response = requests.patch(**dict(self.args, params=params, body=body))
-            case _:
-                raise HTTPException('Exception occurred during processing the request')
-
-        return self.handle_response(response)
-
-    def handle_response(self, response: Response) -> Response:
+        data: Optional[dict] = None,
+        idempotent: bool = False,
+        sign: Optional[SignParams] = None,
+    ) -> "Response":
+        """
+        Request processor
+
+        `idempotent` allows retrying any method, `sign` is applied to the params of every attempt.
+        """
+        if not isinstance(type, RequestType):
+            raise HTTPException('Exception occurred during processing the request')
+
+        key = request_key(type.value, path, params) if self.coalesce and body is None and data is None else None
+        if key is None:
+            return self.send(type, path, params, body, data, idempotent, sign=sign)
+        weight = self.rate_limiter.weight_of(path) if self.rate_limiter is not None else 0
+        return self.single_flight.run(
+            key, lambda: self.send(type, path, params, body, data, idempotent, sign=sign), weight
+        )
+
+    def send(
+        self,
+        type: RequestType,
+        path: str,
+        params: Optional[dict],
+        body: Optional[dict],
+        data: Optional[dict],
+        idempotent: bool,
+        stream: bool = False,
+        sign: Optional[SignParams] = None,
+    ) -> "Response":
+        """
+        Send the request, retrying it as the policy allows
+
+        With `stream` the body of a supported response is left unread, the
+        caller reads it and closes the response.
+        """
+        transport_errors = self.transport_errors()
+        session = self.session
+        instrumentation = self.instrumentation
+        started_at = time.monotonic()
+        attempt = 0
+        while True:
+            if instrumentation is not None:
+                from src.clients.instrumentation import reset_connection_phases
+
+                attempt_started_at = time.perf_counter()
+                reset_connection_phases()
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(path)
+            attempt_params = params if sign is None else sign(dict(params or {}))
+            if instrumentation is not None:
+                sent_at = time.perf_counter()
+            try:
+                if self.http2:
+                    request = session.build_request(
+                        type.value,
+                        self.base_path + path,
+                        headers=self.headers,
+                        params=attempt_params,
+                        data=data,
+                        json=body,
+                        timeout=self.timeout,
+                    )
+                    response = session.send(request, stream=stream)
+                else:
+                    response = session.request(
+                        type.value,
+                        self.base_path + path,
+                        headers=self.headers,
+                        params=attempt_params,
+                        data=data,
+                        json=body,
+                        timeout=self.timeout,
+                        stream=stream,
+                    )
+            except transport_errors:
+                if instrumentation is not None:
+                    self.record_timing(type, path, attempt, attempt_started_at, sent_at, None)
+                delay = self.retry_policy.next_delay(
+                    type.value, attempt, time.monotonic() - started_at, idempotent=idempotent
+                )
+                if delay is None:
+                    self.record_failure(attempt)
+                    raise
+            else:
+                if instrumentation is not None:
+                    self.record_timing(type, path, attempt, attempt_started_at, sent_at, response, stream)
+                if response.status_code in self.supported_codes:
+                    if not stream:
+                        self.record_transfer(response, len(response.content))
+                    return response
+                # Error bodies are small, read them so the connection goes back to the pool
+                body_size = len(response.read() if stream and self.http2 else response.content)
+                self.record_transfer(response, body_size)
+                delay = self.retry_policy.next_delay(
+                    type.value,
+                    attempt,
+                    time.monotonic() - started_at,
+                    response.status_code,
+                    response.headers.get("Retry-After"),
+                    idempotent=idempotent,
+                )
+                if delay is None:
+                    self.record_failure(attempt)
+                    return self.handle_response(response)
+
+            self.retry_stats.record_retry(delay)
+            time.sleep(delay)
+            attempt += 1
+
+    def stream_rows(
+        self,
+        type: RequestType,
+        path: str,
+        params: Optional[dict] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> Iterator[Any]:
+        """
+        Rows of a JSON array response, decoded while the body downloads
+
+        The request is sent on the first row asked for and never coalesced.
+        """
+        if not isinstance(type, RequestType):
+            raise HTTPException('Exception occurred during processing the request')
+
+        response = self.send(type, path, params, None, None, False, stream=True)
+        body_size = 0
+
+        def decompressed() -> Iterator[bytes]:
+            nonlocal body_size
+            chunks = response.iter_bytes(chunk_size) if self.http2 else response.iter_content(chunk_size)
+            for chunk in chunks:
+                body_size += len(chunk)
+                yield chunk
+
+        try:
+            yield from iter_json_rows(decompressed())
+        finally:
+            self.record_transfer(response, body_size)
+            response.close()
+
+    def record_transfer(self, response: "Response", body_size: int) -> None:
+        """Count the body of a response read in full, `body_size` bytes once decompressed"""
+        wire_size = response.num_bytes_downloaded if self.http2 else response.raw.tell()
+        self.transfer_stats.record(wire_size, body_size)
+
+    def transport_errors(self) -> Tuple[Type[Exception], ...]:
+        """Errors of the session raised when no response arrived"""
+        if self.http2:
+            import httpx
+
+            return (httpx.TransportError,)
+        import requests
+
+        return (requests.ConnectionError, requests.Timeout)
+
+    def record_timing(
+        self,
+        type: RequestType,
+        path: str,
+        attempt: int,
+        started_at: float,
+        sent_at: float,
+        response: Optional["Response"],
+        stream: bool = False,
+    ) -> None:
+        """
+        Pass the timings of an attempt to the instrumentation, the response keeps them as `timing`
+
+        The body of a `stream` response is not read yet, its size is the
+        `Content-Length` of the response and no `download` phase is recorded.
+        """
+        from src.clients.instrumentation import RequestTiming, connection_phases
+
+        finished_at = time.perf_counter()
+        phases = {"queue": sent_at - started_at, **connection_phases()}
+        if response is not None:
+            if stream and self.http2:
+                # httpx only sets `elapsed` once the body is read, `send` returned as the headers arrived
+                headers_after = finished_at - sent_at
+            else:
+                # `elapsed` runs from sending the request to parsing the response headers
+                headers_after = response.elapsed.total_seconds()
+            phases["server"] = max(0.0, headers_after - phases.get("connect", 0.0) - phases.get("tls", 0.0))
+            if not stream:
+                phases["download"] = max(0.0, finished_at - sent_at - headers_after)
+        timing = RequestTiming(
+            exchange=getattr(self, "exchange", ""),
+            method=type.value,
+            path=path,
+            attempt=attempt,
+            status=response.status_code if response is not None else None,
+            response_size=self.response_size(response, stream) if response is not None else 0,
+            phases=phases,
+            total=finished_at - started_at,
+        )
+        if response is not None:
+            response.timing = timing
+        self.instrumentation.record(timing)
+
+    @staticmethod
+    def response_size(response: "Response", stream: bool) -> int:
+        """Size of the body, the `Content-Length` it announced when it is not read yet"""
+        if stream:
+            return int(response.headers.get("Content-Length", 0))
+        return len(response.content)
+
+    def record_failure(self, attempt: int) -> None:
+        """Count the request as exhausted if it was retried before failing"""
+        if attempt:
+            self.retry_stats.record_exhausted()
+
+    def handle_response(self, response: "Response") -> "Response":
         """Handle the response"""
         if response.status_code in self.supported_codes:
             return response
-        raise HTTPException('Exception occurred during processing the request')
+        error = HTTPException('Exception occurred during processing the request')
+        error.response = response
+        raise error
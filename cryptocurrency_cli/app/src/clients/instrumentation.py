@@ -0,0 +1,273 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from pydantic import BaseModel
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+# Phases of a request, in the order they happen
+PHASES = ("queue", "connect", "tls", "server", "download", "decode")
+
+DEFAULT_TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class RequestTiming(BaseModel):
+    """
+    Timings of one attempt of a request, passed to the hooks
+
+    `exchange`: str
+        Exchange of the client, empty for a bare `HTTPClient`
+    `method`: str
+        Method of the request
+    `path`: str
+        Exchange path of the request, without the base url and params
+    `attempt`: int
+        Number of the attempt, starting from 0
+    `status`: Optional[int]
+        Status code, `None` when no response arrived
+    `response_size`: int
+        Bytes of the response body
+    `phases`: Dict[str, float]
+        Seconds spent in each phase of `PHASES` the attempt went through.
+        `connect` (DNS and TCP) and `tls` only appear when a new connection
+        was opened, `server` is the time from sending to the response headers
+    `total`: float
+        Seconds of the attempt, rate limiter wait included
+    """
+    exchange: str
+    method: str
+    path: str
+    attempt: int
+    status: Optional[int]
+    response_size: int
+    phases: Dict[str, float]
+    total: float
+
+
+RequestHook = Callable[[RequestTiming], None]
+
+
+class Histogram:
+    """Cumulative histogram in the Prometheus layout, not thread safe on its own"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """`le` label and cumulative count of every bucket, `+Inf` last"""
+        total, rows = 0, []
+        for bound, count in zip((*map(format_bound, self.buckets), "+Inf"), self.counts):
+            total += count
+            rows.append((bound, total))
+        return rows
+
+
+class RequestInstrumentation:
+    """Per-request timing events and their histograms, exported in the Prometheus text format"""
+
+    def __init__(
+        self,
+        time_buckets: Sequence[float] = DEFAULT_TIME_BUCKETS,
+        size_buckets: Sequence[float] = DEFAULT_SIZE_BUCKETS,
+    ):
+        """
+        Parameters
+        ----------
+        `time_buckets`
+            Upper bounds of the phase histogram buckets in seconds
+        `size_buckets`
+            Upper bounds of the response size histogram buckets in bytes
+        """
+        self.time_buckets = tuple(time_buckets)
+        self.size_buckets = tuple(size_buckets)
+        self.hooks: List[RequestHook] = []
+        self.phases: Dict[Tuple[str, str, str], Histogram] = {}
+        self.sizes: Dict[Tuple[str, str], Histogram] = {}
+        self.statuses: Dict[Tuple[str, str, str], int] = {}
+        self.hook_errors = 0
+        self.lock = threading.Lock()
+
+    def add_hook(self, hook: RequestHook) -> None:
+        """Call `hook` with the timings of every attempt"""
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: RequestHook) -> None:
+        self.hooks.remove(hook)
+
+    def record(self, timing: RequestTiming) -> None:
+        """Add the timings of an attempt to the histograms and pass them to the hooks"""
+        key = (timing.exchange, timing.path)
+        status = str(timing.status) if timing.status is not None else "error"
+        with self.lock:
+            for phase, seconds in timing.phases.items():
+                self.phase_histogram(timing.exchange, timing.path, phase).observe(seconds)
+            if key not in self.sizes:
+                self.sizes[key] = Histogram(self.size_buckets)
+            self.sizes[key].observe(timing.response_size)
+            self.statuses[(*key, status)] = self.statuses.get((*key, status), 0) + 1
+        for hook in self.hooks:
+            try:
+                hook(timing)
+            except Exception:
+                # A broken hook must not fail the request it observes
+                self.hook_errors += 1
+
+    def observe(self, exchange: str, path: str, phase: str, seconds: float) -> None:
+        """Add a phase measured after the request returned, e.g. `decode` by the processors"""
+        with self.lock:
+            self.phase_histogram(exchange, path, phase).observe(seconds)
+
+    def phase_histogram(self, exchange: str, path: str, phase: str) -> Histogram:
+        """Histogram of the phase, must be called under the lock"""
+        key = (exchange, path, phase)
+        histogram = self.phases.get(key)
+        if histogram is None:
+            histogram = self.phases[key] = Histogram(self.time_buckets)
+        return histogram
+
+    def to_prometheus(self) -> str:
+        """Histograms and status counters in the Prometheus text exposition format"""
+        lines = [
+            "# HELP cryptocli_request_phase_seconds Seconds spent in each phase of the exchange requests",
+            "# TYPE cryptocli_request_phase_seconds histogram",
+        ]
+        with self.lock:
+            for (exchange, path, phase), histogram in sorted(self.phases.items()):
+                labels = f'exchange="{escape(exchange)}",path="{escape(path)}",phase="{phase}"'
+                lines.extend(histogram_lines("cryptocli_request_phase_seconds", labels, histogram))
+            lines += [
+                "# HELP cryptocli_response_size_bytes Size of the exchange response bodies",
+                "# TYPE cryptocli_response_size_bytes histogram",
+            ]
+            for (exchange, path), histogram in sorted(self.sizes.items()):
+                labels = f'exchange="{escape(exchange)}",path="{escape(path)}"'
+                lines.extend(histogram_lines("cryptocli_response_size_bytes", labels, histogram))
+            lines += [
+                "# HELP cryptocli_requests_total Request attempts by status, error when no response arrived",
+                "# TYPE cryptocli_requests_total counter",
+            ]
+            for (exchange, path, status), count in sorted(self.statuses.items()):
+                lines.append(
+                    f'cryptocli_requests_total{{exchange="{escape(exchange)}",path="{escape(path)}",status="{status}"}} {count}'
+                )
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Write the metrics to a file, atomically so a collector never reads half of it"""
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as file:
+            file.write(self.to_prometheus())
+        os.replace(temporary, path)
+
+    def serve_prometheus(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serve the metrics on `http://host:port/metrics` from a daemon thread, `shutdown()` stops it"""
+        instrumentation = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = instrumentation.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                """Scrapes are not worth a log line"""
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def histogram_lines(name: str, labels: str, histogram: Histogram) -> List[str]:
+    lines = [f'{name}_bucket{{{labels},le="{bound}"}} {count}' for bound, count in histogram.cumulative()]
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum!r}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+def format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+def escape(value: str) -> str:
+    """Label value escaped for the Prometheus text format"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Seconds the current thread spent opening connections during its request, reset by the client
+_connection_phases = threading.local()
+
+
+def reset_connection_phases() -> None:
+    _connection_phases.connect = _connection_phases.tls = 0.0
+
+
+def connection_phases() -> Dict[str, float]:
+    """`connect` and `tls` seconds of the connections opened since the last reset"""
+    phases = {}
+    if getattr(_connection_phases, "connect", 0.0):
+        phases["connect"] = _connection_phases.connect
+    if getattr(_connection_phases, "tls", 0.0):
+        phases["tls"] = _connection_phases.tls
+    return phases
+
+
+class TimedConnection:
+    """Mixin of the urllib3 connections recording the time spent opening their socket, DNS resolution included"""
+
+    def _new_conn(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            _connection_phases.connect = getattr(_connection_phases, "connect", 0.0) + time.perf_counter() - started_at
+
+
+class TimedHTTPConnection(TimedConnection, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnection, HTTPSConnection):
+    """`TimedHTTPConnection` that also records the TLS handshake"""
+
+    def connect(self) -> None:
+        connect_before = getattr(_connection_phases, "connect", 0.0)
+        started_at = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            # `connect()` opens the socket through `_new_conn`, the rest of it is the handshake
+            opened = getattr(_connection_phases, "connect", 0.0) - connect_before
+            _connection_phases.tls = getattr(_connection_phases, "tls", 0.0) + time.perf_counter() - started_at - opened
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+TIMED_POOL_CLASSES = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
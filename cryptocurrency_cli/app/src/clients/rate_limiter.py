@@ -0,0 +1,206 @@
+import threading
+import time
+from typing import Dict, Optional
+from pydantic import BaseModel
+
+
+class RateLimitUsage(BaseModel):
+    """
+    Snapshot of the request weight budget
+
+    `name`: str
+        Name of the budget, usually the exchange
+    `capacity`: int
+        Weight available per `interval`
+    `interval`: float
+        Length of the budget window in seconds
+    `available`: float
+        Weight that can be spent right now without waiting
+    `used_ratio`: float
+        Part of the capacity currently spent, 0.0 - 1.0
+    `total_weight`: int
+        Weight spent since the limiter was created
+    `total_delay`: float
+        Seconds callers spent waiting for the budget
+    """
+    name: str
+    capacity: int
+    interval: float
+    available: float
+    used_ratio: float
+    total_weight: int
+    total_delay: float
+
+
+class TokenBucket:
+    """
+    Thread safe token bucket
+
+    Tokens are reserved before waiting, so concurrent callers (threads or
+    tasks) are served in arrival order and never fail, they are only delayed.
+    """
+
+    def __init__(self, capacity: int, interval: float):
+        """
+        Parameters
+        ----------
+        `capacity`
+            Maximum amount of tokens in the bucket
+        `interval`
+            Seconds needed to refill an empty bucket
+        """
+        self.capacity = capacity
+        self.interval = interval
+        self.refill_rate = capacity / interval
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def refill(self, now: float) -> None:
+        """Add tokens earned since the last update, must be called under the lock"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    def reserve(self, tokens: float) -> float:
+        """Take `tokens` from the bucket and return how long to wait before using them"""
+        with self.lock:
+            self.refill(time.monotonic())
+            self.tokens -= tokens
+            return max(0.0, -self.tokens / self.refill_rate)
+
+    def available(self) -> float:
+        """Tokens that can be taken without waiting"""
+        with self.lock:
+            self.refill(time.monotonic())
+            return max(0.0, self.tokens)
+
+
+class RateLimiter:
+    """
+    Weight aware client side rate limiter
+
+    Each request path costs its registered weight (`default_weight` otherwise)
+    from a budget of `capacity` weight per `interval` seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        capacity: int,
+        interval: float,
+        weights: Optional[Dict[str, int]] = None,
+        default_weight: int = 1,
+    ):
+        """
+        Parameters
+        ----------
+        `name`
+            Name of the budget, usually the exchange
+        `capacity`
+            Weight available per `interval`
+        `interval`
+            Length of the budget window in seconds
+        `weights`
+            Weight of each request path
+        `default_weight`
+            Weight of paths without a registered weight
+        """
+        self.name = name
+        self.bucket = TokenBucket(capacity, interval)
+        self.weights: Dict[str, int] = dict(weights or {})
+        self.default_weight = default_weight
+        self.total_weight = 0
+        self.total_delay = 0.0
+
+    def register_weights(self, weights: Dict[str, int]) -> None:
+        """Register weights of request paths"""
+        self.weights.update(weights)
+
+    def weight_of(self, path: str) -> int:
+        """Weight of the path, the longest registered prefix wins"""
+        if path in self.weights:
+            return self.weights[path]
+        matches = [prefix for prefix in self.weights if path.startswith(prefix)]
+        if not matches:
+            return self.default_weight
+        return self.weights[max(matches, key=len)]
+
+    def reserve(self, path: str) -> float:
+        """Spend the weight of the path and return the delay to respect"""
+        weight = self.weight_of(path)
+        delay = self.bucket.reserve(weight)
+        with self.bucket.lock:
+            self.total_weight += weight
+            self.total_delay += delay
+        return delay
+
+    def acquire(self, path: str) -> None:
+        """Block the thread until the request to the path fits in the budget"""
+        delay = self.reserve(path)
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self, path: str) -> None:
+        """Suspend the task until the request to the path fits in the budget"""
+        import asyncio
+
+        delay = self.reserve(path)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def usage(self) -> RateLimitUsage:
+        """Current usage of the budget"""
+        available = self.bucket.available()
+        return RateLimitUsage(
+            name=self.name,
+            capacity=self.bucket.capacity,
+            interval=self.bucket.interval,
+            available=available,
+            used_ratio=1 - available / self.bucket.capacity,
+            total_weight=self.total_weight,
+            total_delay=self.total_delay,
+        )
+
+
+class CombinedRateLimiter(RateLimiter):
+    """
+    Several budgets every request is charged to, e.g. the one of an account
+    and the one its exchange shares between every client of the process
+
+    A request waits for the budget furthest from having room for it.
+    """
+
+    def __init__(self, *limiters: RateLimiter):
+        self.limiters = limiters
+        self.name = "+".join(limiter.name for limiter in limiters)
+
+    def register_weights(self, weights: Dict[str, int]) -> None:
+        for limiter in self.limiters:
+            limiter.register_weights(weights)
+
+    def weight_of(self, path: str) -> int:
+        return max(limiter.weight_of(path) for limiter in self.limiters)
+
+    def reserve(self, path: str) -> float:
+        return max(limiter.reserve(path) for limiter in self.limiters)
+
+    def usage(self) -> RateLimitUsage:
+        """Usage of the most used budget"""
+        return max((limiter.usage() for limiter in self.limiters), key=lambda usage: usage.used_ratio)
+
+
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, capacity: int, interval: float) -> RateLimiter:
+    """
+    Get the process wide limiter of the budget, creating it on first use
+
+    Every client of the same exchange shares one limiter, so the budget is
+    respected across threads, tasks and client instances.
+    """
+    with _rate_limiters_lock:
+        if name not in _rate_limiters:
+            _rate_limiters[name] = RateLimiter(name, capacity, interval)
+        return _rate_limiters[name]
@@ -0,0 +1,135 @@
+import random
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Set
+from pydantic import BaseModel, PrivateAttr
+
+
+IDEMPOTENT_METHODS = {"GET", "PUT", "DELETE"}
+RETRY_STATUS_CODES = {418, 429, 500, 502, 503, 504}
+
+
+class RetryPolicy(BaseModel):
+    """
+    Retry policy of the HTTP clients
+
+    `max_attempts`: int
+        Attempts per request including the first one, 1 disables retries
+    `methods`: Set[str]
+        Methods allowed to be retried, idempotent ones by default
+    `status_codes`: Set[int]
+        Response codes worth a retry
+    `retry_connection_errors`: bool
+        Retry when the connection fails before a response arrives
+    `backoff_base`: float
+        Backoff of the first retry in seconds, doubled on every next one
+    `backoff_max`: float
+        Upper bound of a single backoff in seconds
+    `max_elapsed`: float
+        Give up when the next retry would start later than that, in seconds
+    `respect_retry_after`: bool
+        Wait at least as long as the `Retry-After` header asks for
+    """
+    max_attempts: int = 4
+    methods: Set[str] = IDEMPOTENT_METHODS
+    status_codes: Set[int] = RETRY_STATUS_CODES
+    retry_connection_errors: bool = True
+    backoff_base: float = 0.2
+    backoff_max: float = 10.0
+    max_elapsed: float = 30.0
+    respect_retry_after: bool = True
+
+    class Config:
+        allow_mutation = False
+
+    def next_delay(
+        self,
+        method: str,
+        attempt: int,
+        elapsed: float,
+        status_code: Optional[int] = None,
+        retry_after: Optional[str] = None,
+        idempotent: bool = False,
+    ) -> Optional[float]:
+        """
+        Delay before the next attempt
+
+        Parameters
+        ----------
+        `method`
+            Method of the request
+        `attempt`
+            Number of the attempt that just failed, starting from 0
+        `elapsed`
+            Seconds since the first attempt started
+        `status_code`
+            Code of the failed response, `None` for a connection error
+        `retry_after`
+            Value of the `Retry-After` response header
+        `idempotent`
+            The request is safe to repeat whatever its method, e.g. an order with a client order id
+
+        Returns
+        ----------
+        Optional[float]
+            Seconds to wait, `None` if the request must not be retried
+        """
+        if (method not in self.methods and not idempotent) or attempt + 1 >= self.max_attempts:
+            return None
+        if status_code is None and not self.retry_connection_errors:
+            return None
+        if status_code is not None and status_code not in self.status_codes:
+            return None
+
+        # Full jitter: uniformly spread retries over the exponential window
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if self.respect_retry_after and retry_after:
+            delay = max(delay, parse_retry_after(retry_after))
+        if elapsed + delay > self.max_elapsed:
+            return None
+        return delay
+
+
+class RetryStats(BaseModel):
+    """
+    Counters of the retries performed by a client
+
+    `retries`: int
+        Number of retried attempts
+    `backoff_time`: float
+        Seconds spent waiting between attempts
+    `exhausted`: int
+        Requests that failed after the policy gave up retrying
+    """
+    retries: int = 0
+    backoff_time: float = 0.0
+    exhausted: int = 0
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def record_retry(self, delay: float) -> None:
+        """Count a retry and the time spent backing off before it"""
+        with self._lock:
+            self.retries += 1
+            self.backoff_time += delay
+
+    def record_exhausted(self) -> None:
+        """Count a request the policy gave up on"""
+        with self._lock:
+            self.exhausted += 1
+
+
+def parse_retry_after(value: str) -> float:
+    """Seconds to wait from a `Retry-After` header, either delta-seconds or an HTTP date"""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
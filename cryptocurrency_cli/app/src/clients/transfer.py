@@ -0,0 +1,98 @@
+import codecs
+import json
+import re
+import threading
+from itertools import chain
+from typing import Any, Iterable, Iterator
+from pydantic import BaseModel, PrivateAttr
+
+
+# Encodings both `requests` and `httpx` decode without optional packages
+ACCEPT_ENCODING = "gzip, deflate"
+# Size of the body chunks read from a streamed response
+STREAM_CHUNK_SIZE = 64 * 1024
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class TransferStats(BaseModel):
+    """
+    Sizes of the response bodies received by a client
+
+    `responses`: int
+        Responses whose body was read
+    `wire_bytes`: int
+        Body bytes received from the exchange, compressed when it compressed them
+    `body_bytes`: int
+        Body bytes once decompressed
+    """
+    responses: int = 0
+    wire_bytes: int = 0
+    body_bytes: int = 0
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def saved_bytes(self) -> int:
+        """Bytes compression kept off the wire"""
+        return self.body_bytes - self.wire_bytes
+
+    def record(self, wire_bytes: int, body_bytes: int) -> None:
+        with self._lock:
+            self.responses += 1
+            self.wire_bytes += wire_bytes
+            self.body_bytes += body_bytes
+
+
+def iter_json_rows(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """
+    Rows of a JSON array decoded from the chunks of its body as they arrive
+
+    Raises `json.JSONDecodeError` when the body is not a complete JSON array.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    # What comes next: the opening `[`, a row or the closing `]`, a delimiter, only whitespace once closed
+    buffer, position, expected = "", 0, "array"
+    # `None` marks the end of the body
+    for chunk in chain(chunks, (None,)):
+        final = chunk is None
+        buffer = buffer[position:] + text.decode(b"" if final else chunk, final=final)
+        position = 0
+        while True:
+            position = WHITESPACE.match(buffer, position).end()
+            if position == len(buffer):
+                break
+            character = buffer[position]
+            if expected == "array":
+                if character != "[":
+                    raise json.JSONDecodeError("Expecting a JSON array", buffer, position)
+                expected = "first row"
+                position += 1
+            elif expected == "end":
+                raise json.JSONDecodeError("Extra data", buffer, position)
+            elif character == "]" and expected != "row":
+                expected = "end"
+                position += 1
+            elif expected == "delimiter":
+                if character != ",":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buffer, position)
+                expected = "row"
+                position += 1
+            else:
+                try:
+                    row, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    # The rest of the row is in the next chunks
+                    break
+                # A row is complete once its delimiter arrived, e.g. `1` may be the start of `1e-5`
+                following = WHITESPACE.match(buffer, end).end()
+                if not final and (following == len(buffer) or buffer[following] not in ",]"):
+                    break
+                yield row
+                position = end
+                expected = "delimiter"
+    if expected != "end":
+        raise json.JSONDecodeError("Unterminated JSON array", buffer, position)
@@ -0,0 +1,146 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional, Union
+from pydantic import BaseModel
+from src.exchange_processors.models import AccountDetails, ResponseDetails
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+AccountResult = Union[AccountDetails, ResponseDetails]
+
+
+class AccountCacheStats(BaseModel):
+    """
+    Counters of an account cache
+
+    `hits`: int
+        Reads served from the cached snapshot
+    `misses`: int
+        Reads that found no fresh snapshot
+    `refreshes`: int
+        Requests sent to the exchange, misses joining a refresh in flight do not send one
+    `invalidations`: int
+        Snapshots dropped before their TTL, e.g. after an order was placed
+    """
+    hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    invalidations: int = 0
+
+
+class AccountCache:
+    """
+    Account snapshot of one client, kept in memory for `ttl` seconds
+
+    Concurrent misses share one request, error responses are not cached.
+    """
+
+    def __init__(self, ttl: float):
+        """
+        Parameters
+        ----------
+        `ttl`
+            Seconds a snapshot is served for, counted from the start of its request
+        """
+        self.ttl = ttl
+        self.account: Optional[AccountDetails] = None
+        self.expires_at = 0.0
+        # Bumped by every invalidation, a refresh started before one is not stored
+        self.generation = 0
+        self.refreshing: Optional[Future] = None
+        self.refreshing_async: Optional["asyncio.Future"] = None
+        self.counters = AccountCacheStats()
+        self.lock = threading.Lock()
+
+    def fresh(self) -> Optional[AccountDetails]:
+        """Cached snapshot if it has not expired, counted as a hit or a miss, called under the lock"""
+        if self.account is not None and time.monotonic() < self.expires_at:
+            self.counters.hits += 1
+            return self.account
+        self.counters.misses += 1
+        return None
+
+    def store(self, account: AccountResult, generation: int, started_at: float) -> None:
+        """Keep the fetched snapshot unless the cache was invalidated meanwhile, called under the lock"""
+        if isinstance(account, AccountDetails) and generation == self.generation:
+            self.account, self.expires_at = account, started_at + self.ttl
+
+    def get(self, fetch: Callable[[], AccountResult]) -> AccountResult:
+        """Snapshot of the account, `fetch` requests it when the cached one is missing or stale"""
+        with self.lock:
+            account = self.fresh()
+            if account is not None:
+                return account
+            future = self.refreshing
+            if future is not None:
+                leader = False
+            else:
+                leader = True
+                future = self.refreshing = Future()
+                generation = self.generation
+                self.counters.refreshes += 1
+        if not leader:
+            return future.result()
+
+        started_at = time.monotonic()
+        try:
+            account = fetch()
+        except BaseException as error:
+            with self.lock:
+                if self.refreshing is future:
+                    self.refreshing = None
+            future.set_exception(error)
+            raise
+        with self.lock:
+            self.store(account, generation, started_at)
+            if self.refreshing is future:
+                self.refreshing = None
+        future.set_result(account)
+        return account
+
+    async def get_async(self, fetch: Callable[[], Awaitable[AccountResult]]) -> AccountResult:
+        """Asynchronous `get`, readers on the same event loop share one request"""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            account = self.fresh()
+            if account is not None:
+                return account
+            task = self.refreshing_async
+            # A task of a closed loop, e.g. of an earlier `AsyncHTTPClient.run`, can not be awaited
+            if task is None or task.done() or task.get_loop() is not loop:
+                task = self.refreshing_async = asyncio.ensure_future(self.refresh_async(fetch, self.generation))
+                self.counters.refreshes += 1
+        # A cancelled reader does not cancel the refresh the others wait for
+        return await asyncio.shield(task)
+
+    async def refresh_async(self, fetch: Callable[[], Awaitable[AccountResult]], generation: int) -> AccountResult:
+        import asyncio
+
+        started_at = time.monotonic()
+        try:
+            account = await fetch()
+            with self.lock:
+                self.store(account, generation, started_at)
+            return account
+        finally:
+            with self.lock:
+                if self.refreshing_async is asyncio.current_task():
+                    self.refreshing_async = None
+
+    def invalidate(self) -> None:
+        """Drop the snapshot, the next read fetches the account again"""
+        with self.lock:
+            self.account, self.expires_at = None, 0.0
+            self.generation += 1
+            # Readers arriving from now on must not join a request sent before the change
+            self.refreshing = self.refreshing_async = None
+            self.counters.invalidations += 1
+
+    def stats(self) -> AccountCacheStats:
+        with self.lock:
+            return self.counters.copy()
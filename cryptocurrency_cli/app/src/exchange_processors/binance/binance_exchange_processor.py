@@ -1,29 +1,628 @@
+import json
+import time
 from datetime import datetime
-from typing import ClassVar, Optional, Union
-from src.exchange_processors.models import AccountDetails, CandleDetails, OrderDetails, ResponseDetails
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, ClassVar, Iterable, Iterator, List, Optional, Tuple, Union
+from src.exchange_processors.models import (
+    AccountDetails,
+    CandleDetails,
+    OrderBookSnapshot,
+    OrderDetails,
+    OrderRequest,
+    ResponseDetails,
+    SymbolRules,
+    TickerDetails,
+)
 from src.clients.binance_main_client.binance_client import BinanceClient
-from src.exchange_processors.exchange_processor import CryptoExchangeProcessor
+from src.clients.http_client import RequestType
+from src.exchange_processors.account_cache import AccountCache
+from src.exchange_processors.exchange_processor import AsyncCryptoExchangeProcessor, CryptoExchangeProcessor
+from src.exchange_processors.fast_decode import DEFAULT_VALIDATION_RATE, construct_models, gc_paused
+from src.exchange_processors.orders import format_decimal
 
+if TYPE_CHECKING:
+    from src.clients.async_http_client import AsyncHTTPClient
+    from src.exchange_processors.candle_series import CandleSeries
+    from src.storage.candle_store import CandleStore
+    from src.storage.symbol_index import SymbolIndex
+    from src.exchange_processors.binance.binance_market_stream import BinanceMarketStream
 
-class BinanceExchangeProcessor(CryptoExchangeProcessor):
+
+KLINES_PAGE_LIMIT = 1000
+DEPTH_SNAPSHOT_LIMIT = 1000
+
+MINUTE = 60 * 1000
+INTERVAL_MILLISECONDS: dict[str, int] = {
+    "1m": MINUTE,
+    "3m": 3 * MINUTE,
+    "5m": 5 * MINUTE,
+    "15m": 15 * MINUTE,
+    "30m": 30 * MINUTE,
+    "1h": 60 * MINUTE,
+    "2h": 2 * 60 * MINUTE,
+    "4h": 4 * 60 * MINUTE,
+    "6h": 6 * 60 * MINUTE,
+    "8h": 8 * 60 * MINUTE,
+    "12h": 12 * 60 * MINUTE,
+    "1d": 24 * 60 * MINUTE,
+    "3d": 3 * 24 * 60 * MINUTE,
+    "1w": 7 * 24 * 60 * MINUTE,
+    # The shortest month, so a new monthly candle is never missed
+    "1M": 28 * 24 * 60 * MINUTE,
+}
+
+
+class BinanceExchangeProcessor(CryptoExchangeProcessor, AsyncCryptoExchangeProcessor):
 
     url_path_check_connection: ClassVar[str] = '/check_connection'
     url_path_to_get_candle: ClassVar[str] = "/klines"
     url_path_to_get_order: ClassVar[str] = "/order"
     url_path_to_get_account_info: ClassVar[str] = "/account"
+    url_path_to_get_depth: ClassVar[str] = "/depth"
+    url_path_to_get_exchange_info: ClassVar[str] = "/exchangeInfo"
+    url_path_to_get_tickers: ClassVar[str] = "/ticker/24hr"
 
-    def __init__(self, client: BinanceClient):
+    request_weights: ClassVar[dict[str, int]] = {
+        url_path_check_connection: 1,
+        url_path_to_get_candle: 2,
+        url_path_to_get_order: 1,
+        url_path_to_get_account_info: 10,
+        url_path_to_get_depth: 10,
+        url_path_to_get_exchange_info: 20,
+        # Weight of 21 to 100 symbols, the batches of `fetch_tickers`
+        url_path_to_get_tickers: 40,
+    }
+
+    default_interval: ClassVar[str] = "1h"
+    default_limit: ClassVar[int] = 500
+    candle_page_limit: ClassVar[int] = KLINES_PAGE_LIMIT
+    interval_milliseconds: ClassVar[dict[str, int]] = INTERVAL_MILLISECONDS
+
+    def __init__(
+        self,
+        client: BinanceClient,
+        async_client: Optional["AsyncHTTPClient"] = None,
+        candle_store: Optional["CandleStore"] = None,
+        fast_decode: bool = False,
+        validation_rate: float = DEFAULT_VALIDATION_RATE,
+        account_ttl: Optional[float] = None,
+        symbol_index: Optional["SymbolIndex"] = None,
+    ):
+        """
+        Parameters
+        ----------
+        `client`, `async_client`
+            Clients of the exchange API, `async_client` is derived from `client` on first use by default
+        `candle_store`
+            Store keeping fetched candles, only the missing ones are fetched when set
+        `fast_decode`
+            Decode responses with `orjson` and build models without validating every row
+        `validation_rate`
+            Share of the rows still validated in `fast_decode` mode
+        `account_ttl`
+            Seconds an account snapshot is served from memory, by default it is requested on every read
+        `symbol_index`
+            Index of the symbol rules, symbols and orders are validated and rounded locally when set
+        """
         self.client = client
+        if async_client is not None:
+            self.async_client = async_client
+        self.candle_store = candle_store
+        self.fast_decode = fast_decode
+        self.validation_rate = validation_rate
+        self.account_cache = AccountCache(account_ttl) if account_ttl is not None else None
+        self.symbol_index = symbol_index
+        self.market_stream: Optional["BinanceMarketStream"] = None
         super().__init__(client)
-    
+
+    @cached_property
+    def async_client(self) -> "AsyncHTTPClient":
+        """Async client derived from `client` on first use"""
+        return self.client.to_async()
+
     def ping_client(self) -> ResponseDetails:
         return 200
 
-    def show_candles(self, symbol: str, interval: Optional[str]) -> Union[CandleDetails, ResponseDetails]:
-        ...
+    def show_candles(
+        self,
+        symbol: str,
+        interval: Optional[str],
+        limit: Optional[int] = None,
+        as_series: bool = False,
+    ) -> Union[List[CandleDetails], "CandleSeries", ResponseDetails]:
+        interval = interval or self.default_interval
+        if self.market_stream is not None and self.market_stream.is_streaming(symbol, interval):
+            return self.market_stream.show_candles(symbol, interval, limit, as_series)
+        rejected = self.check_symbol(symbol)
+        if rejected is not None:
+            return rejected
+        if self.candle_store is None:
+            response = self.client.request(
+                RequestType.GET,
+                self.url_path_to_get_candle,
+                params=self.compose_candle_params(symbol, interval, limit=limit),
+            )
+            return self.parse_candles(symbol, self.decode(response), as_series)
+
+        start_time, open_klines = self.get_sync_start_time(symbol, interval, limit), []
+        while start_time is not None:
+            response = self.client.request(
+                RequestType.GET,
+                self.url_path_to_get_candle,
+                params=self.compose_candle_params(symbol, interval, start_time, KLINES_PAGE_LIMIT),
+            )
+            start_time, open_klines = self.store_candles(symbol, interval, self.decode(response))
+        wanted = (limit or self.default_limit) - len(open_klines)
+        params = self.compose_head_params(symbol, interval, wanted)
+        while params is not None:
+            response = self.client.request(RequestType.GET, self.url_path_to_get_candle, params=params)
+            params = self.prepend_candles(symbol, interval, self.decode(response), params, wanted)
+        return self.read_stored_candles(symbol, interval, wanted, open_klines, as_series)
+
+    def stream_market_data(
+        self,
+        symbols: Iterable[str],
+        intervals: Iterable[str],
+        order_books: Iterable[str] = (),
+        **kwargs: Any,
+    ) -> "BinanceMarketStream":
+        """
+        Serve `show_candles` of the symbols/intervals from a live kline stream
+
+        Symbols of `order_books` also get a local order book replica, `kwargs` go to `BinanceMarketStream`.
+        """
+        from src.exchange_processors.binance.binance_market_stream import BinanceMarketStream
+        from src.order_book.order_book import OrderBookReplica
+
+        replicas = {
+            symbol.upper(): OrderBookReplica(symbol.upper(), lambda symbol=symbol.upper(): self.get_order_book_snapshot(symbol))
+            for symbol in order_books
+        }
+        stream = BinanceMarketStream(symbols, intervals, order_books=replicas, **kwargs)
+        for (symbol, interval), window in stream.windows.items():
+            window.extend(self.show_candles(symbol, interval, window.capacity, as_series=True))
+        self.market_stream = stream.start()
+        return stream
+
+    def iter_candle_pages(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: int,
+        end_time: Optional[int] = None,
+    ) -> Iterator["CandleSeries"]:
+        """
+        Candles of a time range, one klines page at a time
+
+        The next page is only requested once the previous one was consumed,
+        so exporting years of candles never holds more than one page.
 
-    def place_order(self, symbol: str, side: str, type: str, quantity: float, price: float) -> Union[OrderDetails, ResponseDetails]:
-        ...
+        Parameters
+        ----------
+        `symbol`
+            Symbol of the candles
+        `interval`
+            Kline interval
+        `start_time`, `end_time`
+            Open time range in milliseconds, `end_time` defaults to now
+        """
+        while start_time is not None:
+            response = self.client.request(
+                RequestType.GET,
+                self.url_path_to_get_candle,
+                params=self.compose_candle_params(symbol, interval, start_time, KLINES_PAGE_LIMIT, end_time),
+            )
+            klines = self.decode(response)
+            if klines:
+                yield self.parse_candles(symbol, klines, as_series=True)
+            start_time = klines[-1][0] + INTERVAL_MILLISECONDS[interval] if len(klines) == KLINES_PAGE_LIMIT else None
+
+    def iter_candles(self, symbol: str, interval: Optional[str], limit: Optional[int] = None) -> Iterator[CandleDetails]:
+        """
+        Candles of `show_candles`, parsed one at a time while the klines download
+
+        Neither the candle store nor the market stream are consulted.
+        """
+        interval = interval or self.default_interval
+        rows = self.client.stream_rows(
+            RequestType.GET,
+            self.url_path_to_get_candle,
+            params=self.compose_candle_params(symbol, interval, limit=limit),
+        )
+        for kline in rows:
+            yield self.parse_kline(symbol, kline)
+
+    def get_order_book_snapshot(self, symbol: str, limit: int = DEPTH_SNAPSHOT_LIMIT) -> OrderBookSnapshot:
+        """Best `limit` levels of both sides of the book"""
+        response = self.client.request(
+            RequestType.GET,
+            self.url_path_to_get_depth,
+            params={"symbol": symbol, "limit": limit},
+        )
+        depth = self.decode(response)
+        return OrderBookSnapshot(last_update_id=depth["lastUpdateId"], bids=depth["bids"], asks=depth["asks"])
+
+    def quote_order(self, symbol: str, side: str, quantity: float) -> Optional[float]:
+        """
+        Average price of a market order from the local order book
+
+        Returns
+        ----------
+        Optional[float]
+            `None` if the book of the symbol is not streamed or not deep enough
+        """
+        order_book = self.market_stream.order_book(symbol) if self.market_stream is not None else None
+        if order_book is None or not order_book.synced:
+            return None
+        return order_book.price_for(side, quantity)
+
+    def place_order(
+        self,
+        symbol: str,
+        side: str,
+        type: str,
+        quantity: float,
+        price: float,
+        client_order_id: Optional[str] = None,
+    ) -> Union[OrderDetails, ResponseDetails]:
+        order, error = self.check_order(OrderRequest(
+            symbol=symbol, side=side, type=type, quantity=quantity, price=price, client_order_id=client_order_id
+        ))
+        if error is not None:
+            return self.rejected_request(error)
+        return self.send_order(order, self.prepare_order(order))
+
+    def send_order(self, order: OrderRequest, payload: dict[str, Any]) -> Union[OrderDetails, ResponseDetails]:
+        response = self.client.request(
+            RequestType.POST,
+            self.url_path_to_get_order,
+            params=payload,
+            idempotent=order.client_order_id is not None,
+            sign=self.sign_params,
+        )
+        result = self.parse_order(self.decode(response))
+        self.invalidate_account()
+        return result
 
     def get_account(self, timestamp: Optional[datetime]) -> Union[AccountDetails, ResponseDetails]:
-        return AccountDetails(username='Andrii', balances={'BTC': 777})
+        """Current balances, the account endpoint has no history so `timestamp` is not sent"""
+        if self.account_cache is None:
+            return self.fetch_account()
+        return self.account_cache.get(self.fetch_account)
+
+    def fetch_account(self) -> AccountDetails:
+        response = self.client.request(
+            RequestType.GET,
+            self.url_path_to_get_account_info,
+            sign=self.sign_params,
+        )
+        return self.parse_account(self.decode(response))
+
+    async def ping_client_async(self) -> ResponseDetails:
+        return self.ping_client()
+
+    async def show_candles_async(
+        self,
+        symbol: str,
+        interval: Optional[str],
+        limit: Optional[int] = None,
+        as_series: bool = False,
+    ) -> Union[List[CandleDetails], "CandleSeries", ResponseDetails]:
+        interval = interval or self.default_interval
+        if self.market_stream is not None and self.market_stream.is_streaming(symbol, interval):
+            return self.market_stream.show_candles(symbol, interval, limit, as_series)
+        rejected = await self.check_symbol_async(symbol)
+        if rejected is not None:
+            return rejected
+        if self.candle_store is None:
+            response = await self.async_client.request(
+                RequestType.GET,
+                self.url_path_to_get_candle,
+                params=self.compose_candle_params(symbol, interval, limit=limit),
+            )
+            return self.parse_candles(symbol, self.decode(response), as_series)
+
+        start_time, open_klines = self.get_sync_start_time(symbol, interval, limit), []
+        while start_time is not None:
+            response = await self.async_client.request(
+                RequestType.GET,
+                self.url_path_to_get_candle,
+                params=self.compose_candle_params(symbol, interval, start_time, KLINES_PAGE_LIMIT),
+            )
+            start_time, open_klines = self.store_candles(symbol, interval, self.decode(response))
+        wanted = (limit or self.default_limit) - len(open_klines)
+        params = self.compose_head_params(symbol, interval, wanted)
+        while params is not None:
+            response = await self.async_client.request(RequestType.GET, self.url_path_to_get_candle, params=params)
+            params = self.prepend_candles(symbol, interval, self.decode(response), params, wanted)
+        return self.read_stored_candles(symbol, interval, wanted, open_klines, as_series)
+
+    async def fetch_candle_range_async(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: int,
+        end_time: int,
+    ) -> "CandleSeries":
+        response = await self.async_client.request(
+            RequestType.GET,
+            self.url_path_to_get_candle,
+            params=self.compose_candle_params(symbol, interval, start_time, KLINES_PAGE_LIMIT, end_time),
+        )
+        return self.parse_candles(symbol, self.decode(response), as_series=True)
+
+    async def place_order_async(
+        self,
+        symbol: str,
+        side: str,
+        type: str,
+        quantity: float,
+        price: float,
+        client_order_id: Optional[str] = None,
+    ) -> Union[OrderDetails, ResponseDetails]:
+        await self.load_symbol_index_async()
+        order, error = self.check_order(OrderRequest(
+            symbol=symbol, side=side, type=type, quantity=quantity, price=price, client_order_id=client_order_id
+        ))
+        if error is not None:
+            return self.rejected_request(error)
+        return await self.send_order_async(order, self.prepare_order(order))
+
+    def prepare_order(self, order: OrderRequest) -> dict[str, Any]:
+        """Params of the order request, signed by `sign_params` when it is sent"""
+        params: dict[str, Any] = {
+            "symbol": order.symbol,
+            "side": order.side,
+            "type": order.type,
+            "quantity": format_decimal(order.quantity),
+        }
+        if order.type == "LIMIT":
+            params["timeInForce"] = "GTC"
+            params["price"] = format_decimal(order.price)
+        if order.client_order_id is not None:
+            params["newClientOrderId"] = order.client_order_id
+        return params
+
+    def sign_params(self, params: dict[str, Any]) -> dict[str, Any]:
+        """Add the timestamp and signature a signed endpoint requires"""
+        params["timestamp"] = int(time.time() * 1000)
+        params["signature"] = self.client.get_signature(params)
+        return params
+
+    async def send_order_async(self, order: OrderRequest, payload: dict[str, Any]) -> Union[OrderDetails, ResponseDetails]:
+        response = await self.async_client.request(
+            RequestType.POST,
+            self.url_path_to_get_order,
+            params=payload,
+            idempotent=order.client_order_id is not None,
+            sign=self.sign_params,
+        )
+        result = self.parse_order(self.decode(response))
+        self.invalidate_account()
+        return result
+
+    async def get_account_async(self, timestamp: Optional[datetime]) -> Union[AccountDetails, ResponseDetails]:
+        if self.account_cache is None:
+            return await self.fetch_account_async()
+        return await self.account_cache.get_async(self.fetch_account_async)
+
+    async def fetch_account_async(self) -> AccountDetails:
+        response = await self.async_client.request(
+            RequestType.GET,
+            self.url_path_to_get_account_info,
+            sign=self.sign_params,
+        )
+        return self.parse_account(self.decode(response))
+
+    def fetch_symbol_rules(self) -> List[SymbolRules]:
+        """Rules of every symbol from the exchange info, read from its price, lot size and notional filters"""
+        response = self.client.request(RequestType.GET, self.url_path_to_get_exchange_info)
+        return [self.parse_symbol_rules(symbol) for symbol in self.decode(response)["symbols"]]
+
+    def fetch_tickers(self, symbols: List[str]) -> List[TickerDetails]:
+        """
+        24 hour tickers of up to 100 symbols in one request
+
+        Binance rejects the whole request when one symbol is unknown, so with
+        a `symbol_index` the symbols it does not list are dropped beforehand.
+        """
+        if self.symbol_index is not None:
+            symbols = [symbol for symbol in symbols if self.check_symbol(symbol) is None]
+        if not symbols:
+            return []
+        response = self.client.request(
+            RequestType.GET,
+            self.url_path_to_get_tickers,
+            params={"symbols": json.dumps(symbols, separators=(",", ":"))},
+        )
+        return [self.parse_ticker(ticker) for ticker in self.decode(response)]
+
+    def compose_candle_params(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: Optional[int] = None,
+        limit: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> dict[str, Any]:
+        """Compose query params of the klines request"""
+        params: dict[str, Any] = {"symbol": symbol, "interval": interval}
+        if start_time is not None:
+            params["startTime"] = start_time
+        if end_time is not None:
+            params["endTime"] = end_time
+        if limit is not None:
+            params["limit"] = limit
+        return params
+
+    def parse_order(self, order: dict[str, Any]) -> OrderDetails:
+        """Parse the order response"""
+        return OrderDetails(status=order["status"], ticker=order["price"], client_order_id=order.get("clientOrderId"))
+
+    def parse_ticker(self, ticker: dict[str, Any]) -> TickerDetails:
+        """Parse a 24 hour ticker"""
+        return TickerDetails(
+            symbol=ticker["symbol"],
+            last_price=ticker["lastPrice"],
+            change_percent=ticker["priceChangePercent"],
+            volume=ticker["volume"],
+        )
+
+    def parse_symbol_rules(self, symbol: dict[str, Any]) -> SymbolRules:
+        """Parse a symbol of the exchange info, `NOTIONAL` replaced the `MIN_NOTIONAL` filter on newer symbols"""
+        filters = {entry["filterType"]: entry for entry in symbol.get("filters", [])}
+        price = filters.get("PRICE_FILTER", {})
+        lot_size = filters.get("LOT_SIZE", {})
+        notional = filters.get("NOTIONAL") or filters.get("MIN_NOTIONAL") or {}
+        return SymbolRules(
+            symbol=symbol["symbol"],
+            trading=symbol.get("status") == "TRADING",
+            tick_size=price.get("tickSize", 0),
+            min_price=price.get("minPrice", 0),
+            max_price=price.get("maxPrice", 0),
+            step_size=lot_size.get("stepSize", 0),
+            min_quantity=lot_size.get("minQty", 0),
+            max_quantity=lot_size.get("maxQty", 0),
+            min_notional=notional.get("minNotional", 0),
+        )
+
+    def parse_account(self, account: dict[str, Any]) -> AccountDetails:
+        """Parse the account response, free and locked amounts of the held assets are summed"""
+        balances = {}
+        for balance in account["balances"]:
+            amount = float(balance["free"]) + float(balance["locked"])
+            if amount:
+                balances[balance["asset"]] = amount
+        return AccountDetails(username=str(account.get("uid", "")), balances=balances)
+
+    def parse_candles(
+        self,
+        symbol: str,
+        klines: List[List[Any]],
+        as_series: bool = False,
+    ) -> Union[List[CandleDetails], "CandleSeries"]:
+        """Parse klines payload, each kline is [open_time, open, high, low, close, volume, close_time, ...]"""
+        if self.fast_decode:
+            return self.parse_candles_trusted(symbol, klines, as_series)
+        if as_series:
+            from src.exchange_processors.candle_series import CandleSeries
+
+            return CandleSeries.from_klines(symbol, klines)
+        return [self.parse_kline(symbol, kline) for kline in klines]
+
+    def parse_kline(self, symbol: str, kline: List[Any]) -> CandleDetails:
+        """Validated candle of a single kline"""
+        return CandleDetails(
+            symbol=symbol,
+            price=kline[4],
+            open_time=kline[0],
+            open=kline[1],
+            high=kline[2],
+            low=kline[3],
+            close=kline[4],
+            volume=kline[5],
+        )
+
+    def parse_candles_trusted(
+        self,
+        symbol: str,
+        klines: List[List[Any]],
+        as_series: bool = False,
+    ) -> Union[List[CandleDetails], "CandleSeries"]:
+        """Fast decode variant of `parse_candles`, only a sample of the models is validated"""
+        with gc_paused():
+            if as_series:
+                from src.exchange_processors.candle_series import CandleSeries
+
+                return CandleSeries.from_klines(symbol, klines)
+            rows = [
+                {
+                    "symbol": symbol,
+                    "price": kline[4],
+                    "open_time": kline[0],
+                    "open": float(kline[1]),
+                    "high": float(kline[2]),
+                    "low": float(kline[3]),
+                    "close": float(kline[4]),
+                    "volume": float(kline[5]),
+                }
+                for kline in klines
+            ]
+            return construct_models(CandleDetails, rows, self.validation_rate)
+
+    def get_sync_start_time(self, symbol: str, interval: str, limit: Optional[int]) -> int:
+        """
+        Open time to fetch the missing tail of the stored series from
+
+        An empty series is seeded with the newest `limit` candles.
+        """
+        last_open_time = self.candle_store.last_open_time(self.client.exchange, symbol, interval)
+        if last_open_time is None:
+            return int(time.time() * 1000) - ((limit or self.default_limit) + 1) * INTERVAL_MILLISECONDS[interval]
+        return last_open_time + INTERVAL_MILLISECONDS[interval]
+
+    def store_candles(
+        self, symbol: str, interval: str, klines: List[List[Any]]
+    ) -> Tuple[Optional[int], List[List[Any]]]:
+        """
+        Append the closed candles of a klines page to the store
+
+        Returns
+        ----------
+        Tuple[Optional[int], List[List[Any]]]
+            Start time of the next page, `None` if the page was the last one, and the klines still open
+        """
+        now = int(time.time() * 1000)
+        closed = [kline for kline in klines if kline[6] < now]
+        if closed:
+            from src.exchange_processors.candle_series import CandleSeries
+
+            series = CandleSeries.from_klines(symbol, closed)
+            self.candle_store.append(self.client.exchange, symbol, interval, series.columns, series.price_decimals)
+        if len(klines) < KLINES_PAGE_LIMIT:
+            return None, klines[len(closed):]
+        return klines[-1][0] + INTERVAL_MILLISECONDS[interval], []
+
+    def compose_head_params(self, symbol: str, interval: str, wanted: int) -> Optional[dict[str, Any]]:
+        """Params of the page of candles older than the stored ones, `None` if the store holds `wanted` candles"""
+        exchange = self.client.exchange
+        missing = wanted - self.candle_store.length(exchange, symbol, interval)
+        first_open_time = self.candle_store.first_open_time(exchange, symbol, interval)
+        if missing <= 0 or first_open_time is None:
+            return None
+        return self.compose_candle_params(
+            symbol, interval, limit=min(missing, KLINES_PAGE_LIMIT), end_time=first_open_time - 1
+        )
+
+    def prepend_candles(
+        self, symbol: str, interval: str, klines: List[List[Any]], params: dict[str, Any], wanted: int
+    ) -> Optional[dict[str, Any]]:
+        """Insert a page of older candles before the stored ones, return the params of the next page"""
+        if not klines:
+            return None
+        from src.exchange_processors.candle_series import CandleSeries
+
+        series = CandleSeries.from_klines(symbol, klines)
+        prepended = self.candle_store.prepend(self.client.exchange, symbol, interval, series.columns, series.price_decimals)
+        # A short page reached the listing of the symbol
+        if not prepended or len(klines) < params["limit"]:
+            return None
+        return self.compose_head_params(symbol, interval, wanted)
+
+    def read_stored_candles(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+        open_klines: List[List[Any]],
+        as_series: bool = False,
+    ) -> Union[List[CandleDetails], "CandleSeries"]:
+        """Newest `limit` stored candles followed by the open ones, the stored columns are not copied without them"""
+        from src.exchange_processors.candle_series import CandleSeries
+
+        exchange = self.client.exchange
+        columns = self.candle_store.read(exchange, symbol, interval, limit)
+        series = CandleSeries.from_columns(symbol, columns, self.candle_store.price_decimals(exchange, symbol, interval))
+        if open_klines:
+            series = series.append(CandleSeries.from_klines(symbol, open_klines))
+        return series if as_series else series.to_candles()
@@ -0,0 +1,51 @@
+from typing import Any, ClassVar, Dict, List
+from src.exchange_processors.models import CandleDetails
+from src.streaming.market_stream import MarketDataStream
+
+
+class BinanceMarketStream(MarketDataStream):
+    """Binance combined kline/ticker/depth stream"""
+
+    base_url: ClassVar[str] = "wss://stream.binance.com:9443"
+
+    def compose_url(self) -> str:
+        streams = [f"{symbol.lower()}@ticker" for symbol in self.symbols] + [
+            f"{symbol.lower()}@kline_{interval}" for symbol in self.symbols for interval in self.intervals
+        ]
+        streams += [f"{symbol.lower()}@depth@100ms" for symbol in self.order_books]
+        return f"{self.url}/stream?streams={'/'.join(streams)}"
+
+    def compose_subscriptions(self) -> List[Dict[str, Any]]:
+        """Streams are already part of the url"""
+        return []
+
+    def handle_message(self, message: Dict[str, Any]) -> None:
+        data = message.get("data", message)
+        match data.get("e"):
+            case "kline":
+                kline = data["k"]
+                window = self.window(data["s"], kline["i"])
+                if window is not None:
+                    window.update(
+                        kline["t"],
+                        float(kline["o"]),
+                        float(kline["h"]),
+                        float(kline["l"]),
+                        float(kline["c"]),
+                        float(kline["v"]),
+                    )
+            case "24hrTicker":
+                self.tickers[data["s"]] = CandleDetails(
+                    symbol=data["s"],
+                    price=data["c"],
+                    open_time=data["O"],
+                    open=data["o"],
+                    high=data["h"],
+                    low=data["l"],
+                    close=data["c"],
+                    volume=data["v"],
+                )
+            case "depthUpdate":
+                order_book = self.order_book(data["s"])
+                if order_book is not None:
+                    order_book.apply_diff(data["U"], data["u"], data["b"], data["a"])
@@ -1,32 +1,252 @@
 from datetime import datetime
-from typing import ClassVar, Optional, Union
-from src.exchange_processors.models import AccountDetails, CandleDetails, OrderDetails, ResponseDetails
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, ClassVar, Iterable, List, Optional, Union
+from src.exchange_processors.models import (
+    AccountDetails,
+    CandleDetails,
+    OrderDetails,
+    ResponseDetails,
+    SymbolRules,
+    TickerDetails,
+)
 from src.clients.bitfinex_main_client.bitfinex_client import BitfinexClient
-from src.exchange_processors.exchange_processor import CryptoExchangeProcessor
+from src.clients.http_client import RequestType
+from src.exchange_processors.exchange_processor import AsyncCryptoExchangeProcessor, CryptoExchangeProcessor
+from src.exchange_processors.fast_decode import DEFAULT_VALIDATION_RATE
 
+if TYPE_CHECKING:
+    from src.clients.async_http_client import AsyncHTTPClient
+    from src.exchange_processors.candle_series import CandleSeries
+    from src.exchange_processors.bitfinex.bitfinex_market_stream import BitfinexMarketStream
+    from src.storage.symbol_index import SymbolIndex
 
-class BitfinexExchangeProcessor(CryptoExchangeProcessor):
+
+CANDLES_PAGE_LIMIT = 10000
+AMOUNT_STEP = 1e-8
+
+MINUTE = 60 * 1000
+INTERVAL_MILLISECONDS: dict[str, int] = {
+    "1m": MINUTE,
+    "5m": 5 * MINUTE,
+    "15m": 15 * MINUTE,
+    "30m": 30 * MINUTE,
+    "1h": 60 * MINUTE,
+    "3h": 3 * 60 * MINUTE,
+    "6h": 6 * 60 * MINUTE,
+    "12h": 12 * 60 * MINUTE,
+    "1D": 24 * 60 * MINUTE,
+    "1W": 7 * 24 * 60 * MINUTE,
+    "14D": 14 * 24 * 60 * MINUTE,
+    # The shortest month, so a new monthly candle is never missed
+    "1M": 28 * 24 * 60 * MINUTE,
+}
+
+
+class BitfinexExchangeProcessor(CryptoExchangeProcessor, AsyncCryptoExchangeProcessor):
 
     url_path_check_connection: ClassVar[str] = 'v1/conn'
     url_path_to_get_candle: ClassVar[str] = "/v1/pubticker"
     url_path_to_get_order: ClassVar[str] = "/v1/order/"
     url_path_to_get_account_info: ClassVar[str] = "/v1/balances"
+    url_path_to_get_candle_history: ClassVar[str] = "/v2/candles"
+    url_path_to_get_symbols_details: ClassVar[str] = "/v1/symbols_details"
+    url_path_to_get_tickers: ClassVar[str] = "/v2/tickers"
 
-    def __init__(self, client: BitfinexClient):
+    request_weights: ClassVar[dict[str, int]] = {
+        url_path_check_connection: 1,
+        url_path_to_get_candle: 1,
+        url_path_to_get_order: 1,
+        url_path_to_get_account_info: 1,
+        url_path_to_get_candle_history: 1,
+        url_path_to_get_symbols_details: 1,
+        url_path_to_get_tickers: 1,
+    }
+
+    default_interval: ClassVar[str] = "1h"
+    default_quote: ClassVar[str] = "USD"
+    candle_page_limit: ClassVar[int] = CANDLES_PAGE_LIMIT
+    interval_milliseconds: ClassVar[dict[str, int]] = INTERVAL_MILLISECONDS
+
+    def __init__(
+        self,
+        client: BitfinexClient,
+        async_client: Optional["AsyncHTTPClient"] = None,
+        fast_decode: bool = False,
+        validation_rate: float = DEFAULT_VALIDATION_RATE,
+        symbol_index: Optional["SymbolIndex"] = None,
+    ):
         self.client = client
+        if async_client is not None:
+            self.async_client = async_client
+        self.fast_decode = fast_decode
+        self.validation_rate = validation_rate
+        self.symbol_index = symbol_index
+        self.market_stream: Optional["BitfinexMarketStream"] = None
         super().__init__(client)
+
+    @cached_property
+    def async_client(self) -> "AsyncHTTPClient":
+        """Async client derived from `client` on first use"""
+        return self.client.to_async()
     
     def ping_client(self) -> ResponseDetails:
-        ...
+        return 200
 
-    def show_candles(self, symbol: str, interval: Optional[str]) -> Union[CandleDetails, ResponseDetails]:
-        ...
+    def show_candles(
+        self,
+        symbol: str,
+        interval: Optional[str],
+        limit: Optional[int] = None,
+        as_series: bool = False,
+    ) -> Union[List[CandleDetails], "CandleSeries", ResponseDetails]:
+        interval = interval or self.default_interval
+        if self.market_stream is not None and self.market_stream.is_streaming(symbol, interval):
+            return self.market_stream.show_candles(symbol, interval, limit, as_series)
+        rejected = self.check_symbol(symbol)
+        if rejected is not None:
+            return rejected
+        response = self.client.request(RequestType.GET, self.compose_candle_path(symbol))
+        return self.parse_candles(symbol, self.decode(response), as_series)
 
-    def place_order(self, symbol: str, side: str, type: str, quantity: float, price: float) -> Union[OrderDetails, ResponseDetails]:
-        ...
+    def stream_market_data(self, symbols: Iterable[str], intervals: Iterable[str], **kwargs: Any) -> "BitfinexMarketStream":
+        """
+        Serve `show_candles` of the symbols/intervals from live candle channels
+
+        Bitfinex sends a snapshot of recent candles on subscribe, which seeds
+        the rolling windows. `kwargs` are passed to `BitfinexMarketStream`.
+        """
+        from src.exchange_processors.bitfinex.bitfinex_market_stream import BitfinexMarketStream
+
+        self.market_stream = BitfinexMarketStream(symbols, intervals, **kwargs).start()
+        return self.market_stream
+
+    def place_order(self, symbol: str, side: str, type: str, quantity: float, price: float, client_order_id: Optional[str] = None) -> Union[OrderDetails, ResponseDetails]:
+        """Orders need the signed v2 API, which the Bitfinex client does not implement yet"""
+        return self.rejected_request("Placing orders is not supported on Bitfinex")
 
     def get_account(self, timestamp: Optional[datetime]) -> Union[AccountDetails, ResponseDetails]:
-        ...
+        """Balances need the signed v2 API, which the Bitfinex client does not implement yet"""
+        return self.rejected_request("Reading the account is not supported on Bitfinex")
+
+    async def ping_client_async(self) -> ResponseDetails:
+        return self.ping_client()
+
+    async def show_candles_async(
+        self,
+        symbol: str,
+        interval: Optional[str],
+        limit: Optional[int] = None,
+        as_series: bool = False,
+    ) -> Union[List[CandleDetails], "CandleSeries", ResponseDetails]:
+        interval = interval or self.default_interval
+        if self.market_stream is not None and self.market_stream.is_streaming(symbol, interval):
+            return self.market_stream.show_candles(symbol, interval, limit, as_series)
+        rejected = await self.check_symbol_async(symbol)
+        if rejected is not None:
+            return rejected
+        response = await self.async_client.request(RequestType.GET, self.compose_candle_path(symbol))
+        return self.parse_candles(symbol, self.decode(response), as_series)
+
+    async def fetch_candle_range_async(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: int,
+        end_time: int,
+    ) -> "CandleSeries":
+        response = await self.async_client.request(
+            RequestType.GET,
+            f"{self.url_path_to_get_candle_history}/trade:{interval}:t{symbol.upper()}/hist",
+            params={"start": start_time, "end": end_time, "limit": CANDLES_PAGE_LIMIT, "sort": 1},
+        )
+        return self.parse_candle_history(symbol, self.decode(response))
+
+    async def place_order_async(self, symbol: str, side: str, type: str, quantity: float, price: float, client_order_id: Optional[str] = None) -> Union[OrderDetails, ResponseDetails]:
+        return self.place_order(symbol, side, type, quantity, price, client_order_id)
+
+    async def get_account_async(self, timestamp: Optional[datetime]) -> Union[AccountDetails, ResponseDetails]:
+        return self.get_account(timestamp)
+
+    def fetch_symbol_rules(self) -> List[SymbolRules]:
+        """
+        Rules of every pair from the symbols details
+
+        Bitfinex prices have no tick, only amounts are rounded, to 8 decimals.
+        """
+        response = self.client.request(RequestType.GET, self.url_path_to_get_symbols_details)
+        return [
+            SymbolRules(
+                symbol=pair["pair"],
+                step_size=AMOUNT_STEP,
+                min_quantity=pair["minimum_order_size"],
+                max_quantity=pair["maximum_order_size"],
+            )
+            for pair in self.decode(response)
+        ]
+
+    def ticker_symbol(self, coin: str, quote: str) -> str:
+        """Pair of the v1 API, a colon separates the currencies when one has more than 3 letters"""
+        if len(coin) == 3 and len(quote) == 3:
+            return f"{coin}{quote}".lower()
+        return f"{coin}:{quote}".lower()
+
+    def fetch_tickers(self, symbols: List[str]) -> List[TickerDetails]:
+        """Tickers of the pairs from the v2 API, which leaves out the pairs it does not list"""
+        response = self.client.request(
+            RequestType.GET,
+            self.url_path_to_get_tickers,
+            params={"symbols": ",".join(f"t{symbol.upper()}" for symbol in symbols)},
+        )
+        return [self.parse_ticker(ticker) for ticker in self.decode(response)]
+
+    def compose_candle_path(self, symbol: str) -> str:
+        """Ticker path of the symbol, Bitfinex v1 has no interval for the ticker"""
+        return f"{self.url_path_to_get_candle}/{symbol}"
+
+    def parse_ticker(self, ticker: List[Any]) -> TickerDetails:
+        """
+        Parse a v2 trading pair ticker
+
+        [symbol, bid, bid_size, ask, ask_size, daily_change, daily_change_relative, last_price, volume, high, low]
+        """
+        return TickerDetails(
+            symbol=ticker[0][1:].lower(),
+            last_price=ticker[7],
+            change_percent=ticker[6] * 100,
+            volume=ticker[8],
+        )
+
+    def parse_candle_history(self, symbol: str, candles: List[List[Any]]) -> "CandleSeries":
+        """Parse v2 candles payload, each candle is [open_time, open, close, high, low, volume]"""
+        import numpy as np
+        from src.exchange_processors.candle_series import CandleSeries
+
+        if not candles:
+            return CandleSeries.empty(symbol)
+        open_time, open, close, high, low, volume = np.array(candles, dtype=np.float64).T
+        return CandleSeries(symbol, open_time.astype(np.int64), open, high, low, close, volume)
+
+    def parse_candles(
+        self,
+        symbol: str,
+        ticker: dict[str, Any],
+        as_series: bool = False,
+    ) -> Union[List[CandleDetails], "CandleSeries"]:
+        """Parse ticker payload into a single candle"""
+        candles = [
+            CandleDetails(
+                symbol=symbol,
+                price=ticker["last_price"],
+                open_time=int(float(ticker["timestamp"]) * 1000),
+                close=ticker["last_price"],
+                volume=ticker["volume"],
+            )
+        ]
+        if as_series:
+            from src.exchange_processors.candle_series import CandleSeries
+
+            return CandleSeries.from_candles(symbol, candles)
+        return candles
 
 
 
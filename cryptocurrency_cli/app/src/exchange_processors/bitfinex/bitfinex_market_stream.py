@@ -0,0 +1,63 @@
+from typing import Any, ClassVar, Dict, List, Tuple, Union
+from src.exchange_processors.models import CandleDetails
+from src.streaming.market_stream import MarketDataStream
+
+
+class BitfinexMarketStream(MarketDataStream):
+    """Bitfinex v2 public candles/ticker channels"""
+
+    base_url: ClassVar[str] = "wss://api-pub.bitfinex.com/ws/2"
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.channels: Dict[int, Tuple[str, ...]] = {}
+
+    def compose_url(self) -> str:
+        return self.url
+
+    def compose_subscriptions(self) -> List[Dict[str, Any]]:
+        subscriptions = [{"event": "subscribe", "channel": "ticker", "symbol": f"t{symbol}"} for symbol in self.symbols]
+        subscriptions += [
+            {"event": "subscribe", "channel": "candles", "key": f"trade:{interval}:t{symbol}"}
+            for symbol in self.symbols
+            for interval in self.intervals
+        ]
+        return subscriptions
+
+    def handle_message(self, message: Union[Dict[str, Any], List[Any]]) -> None:
+        if isinstance(message, dict):
+            if message.get("event") == "subscribed":
+                self.register_channel(message)
+            return
+
+        channel_id, payload = message[0], message[1]
+        channel = self.channels.get(channel_id)
+        if channel is None or payload == "hb":
+            return
+        match channel:
+            case ("ticker", symbol):
+                self.tickers[symbol] = CandleDetails(
+                    symbol=symbol,
+                    price=str(payload[6]),
+                    close=payload[6],
+                    high=payload[8],
+                    low=payload[9],
+                    volume=payload[7],
+                )
+            case ("candles", symbol, interval):
+                window = self.window(symbol, interval)
+                if not payload:
+                    return
+                # A snapshot is a list of candles, newest first
+                candles = reversed(payload) if isinstance(payload[0], list) else [payload]
+                for open_time, open, close, high, low, volume in candles:
+                    window.update(open_time, open, high, low, close, volume)
+
+    def register_channel(self, message: Dict[str, Any]) -> None:
+        """Remember which symbol/interval a subscribed channel id streams"""
+        match message["channel"]:
+            case "ticker":
+                self.channels[message["chanId"]] = ("ticker", message["symbol"][1:])
+            case "candles":
+                _, interval, symbol = message["key"].split(":")
+                self.channels[message["chanId"]] = ("candles", symbol[1:], interval)
@@ -0,0 +1,170 @@
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union, overload
+import numpy as np
+from src.exchange_processors.models import CandleDetails
+from src.storage.candle_store import CANDLE_COLUMNS
+
+
+class CandleSeries:
+    """
+    Column oriented series of candles of one symbol
+
+    Slices are views of the same NumPy columns, items are built as `CandleDetails`.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        open_time: Sequence[int],
+        open: Sequence[float],
+        high: Sequence[float],
+        low: Sequence[float],
+        close: Sequence[float],
+        volume: Sequence[float],
+        price_decimals: Optional[int] = None,
+    ):
+        """
+        Parameters
+        ----------
+        `symbol`
+            Symbol of the candles
+        `open_time`
+            Open times in milliseconds
+        `open`, `high`, `low`, `close`, `volume`
+            OHLCV values, arrays of the right dtype are used without copying
+        `price_decimals`
+            Decimals of the close price strings of the exchange, `None` prints the float
+        """
+        self.symbol = symbol
+        self.price_decimals = price_decimals
+        self.open_time = np.asarray(open_time, dtype=CANDLE_COLUMNS["open_time"])
+        self.open = np.asarray(open, dtype=CANDLE_COLUMNS["open"])
+        self.high = np.asarray(high, dtype=CANDLE_COLUMNS["high"])
+        self.low = np.asarray(low, dtype=CANDLE_COLUMNS["low"])
+        self.close = np.asarray(close, dtype=CANDLE_COLUMNS["close"])
+        self.volume = np.asarray(volume, dtype=CANDLE_COLUMNS["volume"])
+        lengths = {len(column) for column in self.columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns of {symbol} series have different lengths: {sorted(lengths)}")
+
+    @classmethod
+    def from_columns(
+        cls, symbol: str, columns: Dict[str, np.ndarray], price_decimals: Optional[int] = None
+    ) -> "CandleSeries":
+        """Wrap columns keyed by name, e.g. the ones read from `CandleStore`"""
+        return cls(symbol, **{column: columns[column] for column in CANDLE_COLUMNS}, price_decimals=price_decimals)
+
+    @classmethod
+    def from_klines(cls, symbol: str, klines: List[List[Any]]) -> "CandleSeries":
+        """Parse a klines payload, each kline is [open_time, open, high, low, close, volume, ...]"""
+        if not klines:
+            return cls.empty(symbol)
+        # Parsing the strings with float() into one flat buffer beats letting NumPy convert nested lists
+        count = len(klines)
+        values = np.fromiter(
+            map(float, chain.from_iterable(kline[:6] for kline in klines)),
+            dtype=np.float64,
+            count=6 * count,
+        ).reshape(count, 6).T
+        return cls(
+            symbol,
+            values[0].astype(CANDLE_COLUMNS["open_time"]),
+            *np.ascontiguousarray(values[1:]),
+            price_decimals=price_decimals(klines[0][4]),
+        )
+
+    @classmethod
+    def from_candles(cls, symbol: str, candles: Iterable[CandleDetails]) -> "CandleSeries":
+        """Build the series from models, missing values become 0 for times and NaN otherwise"""
+        candles = list(candles)
+        return cls(
+            symbol,
+            [candle.open_time or 0 for candle in candles],
+            *(
+                [np.nan if getattr(candle, column) is None else getattr(candle, column) for candle in candles]
+                for column in ("open", "high", "low", "close", "volume")
+            ),
+        )
+
+    @classmethod
+    def empty(cls, symbol: str) -> "CandleSeries":
+        """Series without candles"""
+        return cls(symbol, *([] for _ in CANDLE_COLUMNS))
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Columns keyed by name"""
+        return {column: getattr(self, column) for column in CANDLE_COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self.open_time)
+
+    @overload
+    def __getitem__(self, index: int) -> CandleDetails:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "CandleSeries":
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[CandleDetails, "CandleSeries"]:
+        if isinstance(index, slice):
+            return CandleSeries(
+                self.symbol,
+                **{column: values[index] for column, values in self.columns.items()},
+                price_decimals=self.price_decimals,
+            )
+        close = float(self.close[index])
+        return CandleDetails(
+            symbol=self.symbol,
+            price=self.format_price(close),
+            open_time=int(self.open_time[index]),
+            open=float(self.open[index]),
+            high=float(self.high[index]),
+            low=float(self.low[index]),
+            close=close,
+            volume=float(self.volume[index]),
+        )
+
+    def __iter__(self) -> Iterator[CandleDetails]:
+        return iter(self.to_candles())
+
+    def __repr__(self) -> str:
+        return f"CandleSeries(symbol={self.symbol!r}, length={len(self)})"
+
+    def format_price(self, close: float) -> str:
+        """Close price the way the exchange writes it"""
+        return str(close) if self.price_decimals is None else f"{close:.{self.price_decimals}f}"
+
+    def to_candles(self) -> List[CandleDetails]:
+        """Build one `CandleDetails` per candle"""
+        return [
+            CandleDetails(
+                symbol=self.symbol,
+                price=self.format_price(close),
+                open_time=open_time,
+                open=open,
+                high=high,
+                low=low,
+                close=close,
+                volume=volume,
+            )
+            for open_time, open, high, low, close, volume in zip(
+                *(values.tolist() for values in self.columns.values())
+            )
+        ]
+
+    def append(self, other: "CandleSeries") -> "CandleSeries":
+        """New series with the candles of `other` after the ones of this series"""
+        return CandleSeries(
+            self.symbol,
+            **{column: np.concatenate((values, other.columns[column])) for column, values in self.columns.items()},
+            price_decimals=self.price_decimals if self.price_decimals is not None else other.price_decimals,
+        )
+
+
+def price_decimals(price: Any) -> Optional[int]:
+    """Decimals of a price string of the exchange, `None` for numbers"""
+    if not isinstance(price, str):
+        return None
+    return len(price.partition(".")[2])
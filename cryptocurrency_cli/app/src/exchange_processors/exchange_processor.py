@@ -1,20 +1,262 @@
+import time
+import uuid
 from abc import ABC, abstractmethod
-from typing import Optional, TypeVar, Union
+from http.client import HTTPException
+from typing import TYPE_CHECKING, Any, ClassVar, Dict, Iterable, List, Optional, Tuple, TypeVar, Union
 from src.clients.http_client import HTTPClient
-from src.exchange_processors.models import CandleDetails, AccountDetails, OrderDetails, ResponseDetails
+from src.exchange_processors.models import (
+    AccountDetails,
+    CandleDetails,
+    OrderDetails,
+    OrderRequest,
+    OrderResult,
+    ResponseDetails,
+    SymbolRules,
+    TickerDetails,
+)
+from src.exchange_processors.account_cache import AccountCache, AccountCacheStats
+from src.exchange_processors.fast_decode import DEFAULT_VALIDATION_RATE, decode_json
+from src.exchange_processors.orders import apply_symbol_rules, client_order_id, validate_order
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from src.clients.async_http_client import AsyncHTTPClient
+    from src.exchange_processors.candle_series import CandleSeries
+    from src.storage.symbol_index import SymbolIndex
+
 
 Client = TypeVar('Client', bound=HTTPClient)
 
+DEFAULT_ORDER_CONCURRENCY = 5
+
 
 class CryptoExchangeProcessor(ABC):
     """Crypto Exchange processor responsible to perform various operations"""
 
+    request_weights: ClassVar[Dict[str, int]] = {}
+
+    fast_decode: bool = False
+    validation_rate: float = DEFAULT_VALIDATION_RATE
+    account_cache: Optional[AccountCache] = None
+    symbol_index: Optional["SymbolIndex"] = None
+
+    # Quote currency of the popular coins and the most symbols a ticker request may ask for
+    default_quote: ClassVar[str] = "USDT"
+    ticker_batch_size: ClassVar[int] = 100
+
     @abstractmethod
     def __init__(self, client: Client) -> None:
-        """Initialization of the client, the required param is HTTPClient"""
+        """
+        Initialization of the client, the required param is HTTPClient
+
+        Weights of the processor paths are registered in the client rate limiter
+        """
         self.client: Client = client
+        if client.rate_limiter is not None:
+            client.rate_limiter.register_weights(self.request_weights)
+
+    def decode(self, response: Any) -> Any:
+        """
+        JSON body of a response
+
+        `fast_decode` skips the text decoding, the time is recorded when the client is instrumented.
+        """
+        timing = getattr(response, "timing", None)
+        if timing is None:
+            return decode_json(response.content) if self.fast_decode else response.json()
+        started_at = time.perf_counter()
+        body = decode_json(response.content) if self.fast_decode else response.json()
+        self.client.instrumentation.observe(timing.exchange, timing.path, "decode", time.perf_counter() - started_at)
+        return body
+
+    def invalidate_account(self) -> None:
+        """Drop the cached account snapshot, e.g. once an order changed the balances"""
+        if self.account_cache is not None:
+            self.account_cache.invalidate()
+
+    def account_cache_stats(self) -> Optional[AccountCacheStats]:
+        """Hit/miss/refresh counters of the account cache, `None` when it is disabled"""
+        return self.account_cache.stats() if self.account_cache is not None else None
+
+    def fetch_symbol_rules(self) -> List[SymbolRules]:
+        """Trading rules of every symbol of the exchange, stored in the `symbol_index`"""
+        raise NotImplementedError()
+
+    def ticker_symbol(self, coin: str, quote: str) -> str:
+        """Symbol of the pair of `coin` and `quote` as the exchange names it"""
+        return f"{coin}{quote}".upper()
+
+    def fetch_tickers(self, symbols: List[str]) -> List[TickerDetails]:
+        """24 hour tickers of the symbols in one request, symbols the exchange does not list are left out"""
+        raise NotImplementedError()
+
+    def symbol_rules(self, symbol: str) -> Optional[SymbolRules]:
+        """Rules of the symbol from the `symbol_index`, `None` if the exchange does not list it"""
+        return self.symbol_index.lookup(self.client.exchange, symbol, self.fetch_symbol_rules)
+
+    def check_symbol(self, symbol: str) -> Optional[ResponseDetails]:
+        """Rejection of an unknown symbol without a request, `None` if it is listed or there is no `symbol_index`"""
+        if self.symbol_index is None or self.symbol_rules(symbol) is not None:
+            return None
+        return self.rejected_request(f"Unknown symbol {symbol}")
+
+    async def check_symbol_async(self, symbol: str) -> Optional[ResponseDetails]:
+        """`check_symbol` that never blocks the event loop"""
+        await self.load_symbol_index_async()
+        return self.check_symbol(symbol)
+
+    async def load_symbol_index_async(self) -> None:
+        """Load or fetch the `symbol_index` from a worker thread when a lookup would wait for the disk or exchange"""
+        if self.symbol_index is None or self.symbol_index.is_current(self.client.exchange):
+            return
+        import asyncio
+
+        await asyncio.to_thread(self.symbol_index.loaded, self.client.exchange, self.fetch_symbol_rules)
+
+    def check_order(self, order: OrderRequest) -> Tuple[OrderRequest, Optional[str]]:
+        """
+        Validate an order before sending it
+
+        With a `symbol_index` the order is also checked against the rules of
+        its symbol, and its price and quantity rounded to their increments.
+
+        Returns
+        ----------
+        Tuple[OrderRequest, Optional[str]]
+            Order to send and why it is invalid, `None` if it is valid
+        """
+        error = validate_order(order)
+        if error is not None or self.symbol_index is None:
+            return order, error
+        rules = self.symbol_rules(order.symbol)
+        if rules is None:
+            return order, f"Unknown symbol {order.symbol}"
+        return apply_symbol_rules(order, rules)
+
+    def rejected_request(self, error: str) -> ResponseDetails:
+        """Details of a request rejected before sending it"""
+        return ResponseDetails(request_url=self.client.base_path, status_code=400, details=error)
+
+    def prepare_order(self, order: OrderRequest) -> Any:
+        """
+        Payload sent for the order, e.g. request params
+
+        Prepared for the whole batch before the first order is dispatched
+        """
+        return order
+
+    def send_order(self, order: OrderRequest, payload: Any) -> Union[OrderDetails, ResponseDetails]:
+        """Send an order prepared by `prepare_order`"""
+        return self.place_order(
+            order.symbol,
+            order.side,
+            order.type,
+            order.quantity,
+            order.price,
+            order.client_order_id,
+        )
+
+    async def send_order_async(self, order: OrderRequest, payload: Any) -> Union[OrderDetails, ResponseDetails]:
+        """Send an order prepared by `prepare_order`, from a worker thread unless the processor overrides it"""
+        import asyncio
+
+        return await asyncio.to_thread(self.send_order, order, payload)
+
+    def prepare_orders(
+        self, orders: Iterable[OrderRequest], batch_id: Optional[str] = None
+    ) -> List[Tuple[OrderRequest, Optional[str], Any]]:
+        """
+        Order, rejection and payload of every order of a batch
+
+        Orders without a client order id get one derived from `batch_id` and their position.
+        """
+        batch_id = batch_id or uuid.uuid4().hex
+        prepared = []
+        for index, order in enumerate(orders):
+            if not order.client_order_id:
+                order = order.copy(update={"client_order_id": client_order_id(order, batch_id, index)})
+            order, error = self.check_order(order)
+            prepared.append((order, error, self.prepare_order(order) if error is None else None))
+        return prepared
+
+    def place_orders(
+        self,
+        orders: Iterable[OrderRequest],
+        batch_id: Optional[str] = None,
+        max_concurrency: int = DEFAULT_ORDER_CONCURRENCY,
+    ) -> List[OrderResult]:
+        """
+        Validate, prepare and place a batch of orders concurrently
+
+        Parameters
+        ----------
+        `orders`
+            Orders to place, those without a client order id get a deterministic one
+        `batch_id`
+            Id of the batch the client order ids derive from, pass the same
+            one to send a batch again without placing its orders twice
+        `max_concurrency`
+            Number of orders in flight at once
+
+        Returns
+        ----------
+        List[OrderResult]
+            Result and latency of every order, in the order of `orders`
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        failures = (HTTPException, *self.client.transport_errors())
+
+        def place(order: OrderRequest, error: Optional[str], payload: Any) -> OrderResult:
+            if error is not None:
+                return OrderResult(order=order, result=self.rejected_request(error), latency=0.0)
+            started_at = time.perf_counter()
+            try:
+                result = self.send_order(order, payload)
+            except failures as exception:
+                result = self.failed_response(exception)
+            return OrderResult(order=order, result=result, latency=time.perf_counter() - started_at)
+
+        with ThreadPoolExecutor(max_concurrency) as executor:
+            return list(executor.map(lambda item: place(*item), self.prepare_orders(orders, batch_id)))
+
+    async def place_orders_async(
+        self,
+        orders: Iterable[OrderRequest],
+        batch_id: Optional[str] = None,
+        max_concurrency: int = DEFAULT_ORDER_CONCURRENCY,
+    ) -> List[OrderResult]:
+        """Asynchronous `place_orders`, the orders are dispatched on the running event loop"""
+        import asyncio
+        import httpx
+
+        failures = (HTTPException, httpx.HTTPError, *self.client.transport_errors())
+        semaphore = asyncio.Semaphore(max_concurrency)
+        await self.load_symbol_index_async()
+
+        async def place(order: OrderRequest, error: Optional[str], payload: Any) -> OrderResult:
+            if error is not None:
+                return OrderResult(order=order, result=self.rejected_request(error), latency=0.0)
+            async with semaphore:
+                started_at = time.perf_counter()
+                try:
+                    result = await self.send_order_async(order, payload)
+                except failures as exception:
+                    result = self.failed_response(exception)
+                return OrderResult(order=order, result=result, latency=time.perf_counter() - started_at)
+
+        return list(await asyncio.gather(*(place(*item) for item in self.prepare_orders(orders, batch_id))))
+
+    def failed_response(self, exception: Exception) -> ResponseDetails:
+        """Details of a request that failed, status code 0 when no response arrived"""
+        response = getattr(exception, "response", None)
+        if response is not None:
+            return ResponseDetails(request_url=str(response.url), status_code=response.status_code, details=response.text)
+        return ResponseDetails(
+            request_url=self.client.base_path,
+            status_code=0,
+            details=str(exception) or type(exception).__name__,
+        )
 
     @classmethod
     @property
@@ -54,8 +296,15 @@ class CryptoExchangeProcessor(ABC):
         self,
         symbol: str,
         interval: Optional[str],
-    ) -> Union[CandleDetails, ResponseDetails]:
-        """Show information about the candles"""
+        limit: Optional[int] = None,
+        as_series: bool = False,
+    ) -> Union[List[CandleDetails], "CandleSeries", ResponseDetails]:
+        """
+        Show information about the candles
+
+        `limit` restricts them to the newest N, `as_series` returns them as a
+        column oriented `CandleSeries` instead of a list of `CandleDetails`
+        """
         raise NotImplementedError()
 
     @abstractmethod
@@ -66,8 +315,9 @@ class CryptoExchangeProcessor(ABC):
         type: str,
         quantity: float,
         price: float,
+        client_order_id: Optional[str] = None,
     ) -> Union[OrderDetails, ResponseDetails]:
-        """Place order"""
+        """Place order, `client_order_id` makes retrying it safe"""
         raise NotImplementedError()
 
     @abstractmethod
@@ -77,3 +327,120 @@ class CryptoExchangeProcessor(ABC):
     ) -> Union[AccountDetails, ResponseDetails]:
         """Get account information"""
         raise NotImplementedError()
+
+
+class AsyncCryptoExchangeProcessor(ABC):
+    """
+    Asynchronous Crypto Exchange processor
+
+    Allows many symbols/intervals to be fetched concurrently on one event loop,
+    the number of requests in flight is bounded by the `AsyncHTTPClient`.
+    """
+
+    # Most candles returned by one history request
+    candle_page_limit: ClassVar[int]
+    # Length of every supported interval in milliseconds
+    interval_milliseconds: ClassVar[Dict[str, int]]
+
+    @abstractmethod
+    def __init__(self, async_client: "AsyncHTTPClient") -> None:
+        """Initialization of the client, the required param is AsyncHTTPClient"""
+        self.async_client: "AsyncHTTPClient" = async_client
+
+    @abstractmethod
+    async def ping_client_async(self) -> ResponseDetails:
+        """Ping client in order to check connection"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def show_candles_async(
+        self,
+        symbol: str,
+        interval: Optional[str],
+        limit: Optional[int] = None,
+        as_series: bool = False,
+    ) -> Union[List[CandleDetails], "CandleSeries", ResponseDetails]:
+        """
+        Show information about the candles
+
+        `limit` restricts them to the newest N, `as_series` returns them as a
+        column oriented `CandleSeries` instead of a list of `CandleDetails`
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def fetch_candle_range_async(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: int,
+        end_time: int,
+    ) -> "CandleSeries":
+        """Candles opened between `start_time` and `end_time` included, at most `candle_page_limit` of them"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def place_order_async(
+        self,
+        symbol: str,
+        side: str,
+        type: str,
+        quantity: float,
+        price: float,
+        client_order_id: Optional[str] = None,
+    ) -> Union[OrderDetails, ResponseDetails]:
+        """Place order, `client_order_id` makes retrying it safe"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def get_account_async(
+        self,
+        timestamp: Optional[datetime],
+    ) -> Union[AccountDetails, ResponseDetails]:
+        """Get account information"""
+        raise NotImplementedError()
+
+    async def show_many_candles_async(
+        self,
+        symbols: Iterable[str],
+        intervals: Iterable[Optional[str]] = (None,),
+        limit: Optional[int] = None,
+        as_series: bool = False,
+    ) -> Dict[Tuple[str, Optional[str]], Union[List[CandleDetails], "CandleSeries", ResponseDetails]]:
+        """
+        Show candles of every symbol/interval pair concurrently
+
+        Parameters
+        ----------
+        `symbols`
+            Symbols to fetch
+        `intervals`
+            Intervals fetched for each symbol, `None` stands for the default one
+        `limit`
+            Number of the newest candles per symbol/interval
+        `as_series`
+            Return each result as a `CandleSeries`
+
+        Returns
+        ----------
+        Dict[Tuple[str, Optional[str]], Union[List[CandleDetails], "CandleSeries", ResponseDetails]]
+            Candles keyed by `(symbol, interval)`
+        """
+        import asyncio
+
+        intervals = list(intervals)
+        keys = [(symbol, interval) for symbol in symbols for interval in intervals]
+        results = await asyncio.gather(
+            *(self.show_candles_async(symbol, interval, limit, as_series) for symbol, interval in keys)
+        )
+        return dict(zip(keys, results))
+
+    def show_many_candles(
+        self,
+        symbols: Iterable[str],
+        intervals: Iterable[Optional[str]] = (None,),
+        limit: Optional[int] = None,
+        as_series: bool = False,
+    ) -> Dict[Tuple[str, Optional[str]], Union[List[CandleDetails], "CandleSeries", ResponseDetails]]:
+        """Synchronous wrapper around `show_many_candles_async`"""
+        return self.async_client.run(self.show_many_candles_async(symbols, intervals, limit, as_series))
@@ -0,0 +1,74 @@
+import gc
+import json
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Sequence, Type, TypeVar, Union
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+# Share of the rows still validated in fast decode mode
+DEFAULT_VALIDATION_RATE = 0.01
+
+Model = TypeVar("Model", bound=BaseModel)
+
+_gc_lock = threading.Lock()
+_gc_pauses = 0
+_gc_was_enabled = False
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """
+    Pause the cyclic garbage collector
+
+    Nested and concurrent pauses are counted, the last one to finish enables it again.
+    """
+    global _gc_pauses, _gc_was_enabled
+    with _gc_lock:
+        if _gc_pauses == 0:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_pauses -= 1
+            if _gc_pauses == 0 and _gc_was_enabled:
+                gc.enable()
+
+
+def decode_json(content: Union[bytes, str]) -> Any:
+    """Decode a JSON body with `orjson` when it is installed, `json` otherwise"""
+    with gc_paused():
+        if orjson is not None:
+            return orjson.loads(content)
+        return json.loads(content)
+
+
+def construct_models(model: Type[Model], rows: Sequence[Dict[str, Any]], validation_rate: float) -> List[Model]:
+    """
+    Build models from trusted rows without validating every one of them
+
+    Evenly spread rows are validated, a `ValidationError` is raised if one of them is invalid.
+
+    Parameters
+    ----------
+    `model`
+        Model to build
+    `rows`
+        Field values of every model
+    `validation_rate`
+        Share of the rows to validate, 0 disables validation and 1 validates all of them
+    """
+    if validation_rate > 0:
+        step = max(1, round(1 / validation_rate))
+        for row in rows[::step]:
+            model(**row)
+    with gc_paused():
+        return [model.construct(**row) for row in rows]
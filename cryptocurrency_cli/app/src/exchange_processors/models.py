@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, List, Optional, Tuple, Union
 from pydantic import BaseModel
 
 
@@ -10,9 +10,19 @@ class CandleDetails(BaseModel):
         Symbol of candle
     `price`: str
         Current price of pair
+    `open_time`: Optional[int]
+        Open time of the candle in milliseconds
+    `open`, `high`, `low`, `close`, `volume`: Optional[float]
+        OHLCV values of the candle, if the exchange provides them
     """
     symbol: str
     price: str
+    open_time: Optional[int] = None
+    open: Optional[float] = None
+    high: Optional[float] = None
+    low: Optional[float] = None
+    close: Optional[float] = None
+    volume: Optional[float] = None
 
 
 class OrderDetails(BaseModel):
@@ -23,9 +33,12 @@ class OrderDetails(BaseModel):
         Order status
     `ticker`: str
         Price of opened/closed/moved position
+    `client_order_id`: Optional[str]
+        Id of the order given by the client
     """
     status: str
     ticker: str
+    client_order_id: Optional[str] = None
 
 class AccountDetails(BaseModel):
     """
@@ -44,3 +57,105 @@ class ResponseDetails(BaseModel):
     request_url: str
     status_code: int
     details: str
+
+
+class OrderBookSnapshot(BaseModel):
+    """
+    Order book depth at one moment
+
+    `last_update_id`: int
+        Id of the last update included in the snapshot
+    `bids`: List[Tuple[float, float]]
+        Bid levels as (price, quantity), best first
+    `asks`: List[Tuple[float, float]]
+        Ask levels as (price, quantity), best first
+    """
+    last_update_id: int
+    bids: List[Tuple[float, float]]
+    asks: List[Tuple[float, float]]
+
+
+class OrderRequest(BaseModel):
+    """
+    Order to place
+
+    `symbol`: str
+        Symbol of the pair
+    `side`: str
+        `BUY` or `SELL`
+    `type`: str
+        `MARKET` or `LIMIT`
+    `quantity`: float
+        Base quantity of the order
+    `price`: Optional[float]
+        Limit price, required by `LIMIT` orders
+    `client_order_id`: Optional[str]
+        Id of the order given by the client, the exchange rejects a second order with the same one
+    """
+    symbol: str
+    side: str
+    type: str
+    quantity: float
+    price: Optional[float] = None
+    client_order_id: Optional[str] = None
+
+
+class OrderResult(BaseModel):
+    """
+    Outcome of one order of a batch
+
+    `order`: OrderRequest
+        Placed order with its client order id
+    `result`: Union[OrderDetails, ResponseDetails]
+        Placed order details or the failed response
+    `latency`: float
+        Seconds from dispatching the order to its result
+    """
+    order: OrderRequest
+    result: Union[OrderDetails, ResponseDetails]
+    latency: float
+
+
+class SymbolRules(BaseModel):
+    """
+    Trading rules of a symbol from the exchange info
+
+    `symbol`: str
+        Symbol of the pair, upper case
+    `trading`: bool
+        Whether orders of the symbol are accepted
+    `tick_size`, `step_size`: float
+        Price and quantity increments, 0 when the exchange has none
+    `min_price`, `max_price`, `min_quantity`, `max_quantity`: float
+        Accepted ranges, 0 when unbounded
+    `min_notional`: float
+        Smallest price times quantity of an order, 0 when unbounded
+    """
+    symbol: str
+    trading: bool = True
+    tick_size: float = 0.0
+    min_price: float = 0.0
+    max_price: float = 0.0
+    step_size: float = 0.0
+    min_quantity: float = 0.0
+    max_quantity: float = 0.0
+    min_notional: float = 0.0
+
+
+class TickerDetails(BaseModel):
+    """
+    24 hour ticker of a symbol
+
+    `symbol`: str
+        Symbol of the pair, as the exchange names it
+    `last_price`: float
+        Price of the last trade
+    `change_percent`: float
+        Price change over the last 24 hours, in percent
+    `volume`: float
+        Base volume traded over the last 24 hours
+    """
+    symbol: str
+    last_price: float
+    change_percent: float
+    volume: float
@@ -0,0 +1,92 @@
+import hashlib
+import math
+from typing import Optional, Tuple
+from src.exchange_processors.models import OrderRequest, SymbolRules
+
+
+ORDER_SIDES = {"BUY", "SELL"}
+ORDER_TYPES = {"MARKET", "LIMIT"}
+
+# Longest client order id accepted by the exchanges
+CLIENT_ORDER_ID_LENGTH = 32
+
+
+def client_order_id(order: OrderRequest, batch_id: str, index: int) -> str:
+    """
+    Deterministic client order id
+
+    Depends only on the batch, the position in it and the order, so a resent batch is not placed twice.
+    """
+    key = "|".join(
+        str(value) for value in (batch_id, index, order.symbol, order.side, order.type, order.quantity, order.price)
+    )
+    return hashlib.sha256(key.encode()).hexdigest()[:CLIENT_ORDER_ID_LENGTH]
+
+
+def validate_order(order: OrderRequest) -> Optional[str]:
+    """
+    Check the order before sending it
+
+    Returns
+    ----------
+    Optional[str]
+        Why the order is invalid, `None` if it is valid
+    """
+    if order.side not in ORDER_SIDES:
+        return f"Unknown side {order.side}, expected one of {sorted(ORDER_SIDES)}"
+    if order.type not in ORDER_TYPES:
+        return f"Unknown type {order.type}, expected one of {sorted(ORDER_TYPES)}"
+    if order.quantity <= 0:
+        return f"Quantity must be positive, got {order.quantity}"
+    if order.type == "LIMIT" and (order.price is None or order.price <= 0):
+        return f"LIMIT order requires a positive price, got {order.price}"
+    return None
+
+
+def apply_symbol_rules(order: OrderRequest, rules: SymbolRules) -> Tuple[OrderRequest, Optional[str]]:
+    """
+    Round a valid order to the increments of its symbol and check its ranges
+
+    The quantity is rounded down, the checks run on the rounded values.
+
+    Returns
+    ----------
+    Tuple[OrderRequest, Optional[str]]
+        Rounded order and why it is invalid, `None` if it is valid
+    """
+    if not rules.trading:
+        return order, f"Symbol {rules.symbol} is not trading"
+    quantity = round_to_step(order.quantity, rules.step_size, down=True)
+    price = round_to_step(order.price, rules.tick_size) if order.price is not None else None
+    order = order.copy(update={"quantity": quantity, "price": price})
+    if quantity <= 0 or quantity < rules.min_quantity:
+        return order, f"Quantity {format_decimal(quantity)} is below the minimum {format_decimal(rules.min_quantity)} of {rules.symbol}"
+    if rules.max_quantity and quantity > rules.max_quantity:
+        return order, f"Quantity {format_decimal(quantity)} is above the maximum {format_decimal(rules.max_quantity)} of {rules.symbol}"
+    if order.type == "LIMIT":
+        if price <= 0 or price < rules.min_price:
+            return order, f"Price {format_decimal(price)} is below the minimum {format_decimal(rules.min_price)} of {rules.symbol}"
+        if rules.max_price and price > rules.max_price:
+            return order, f"Price {format_decimal(price)} is above the maximum {format_decimal(rules.max_price)} of {rules.symbol}"
+        if price * quantity < rules.min_notional:
+            return order, f"Notional {format_decimal(price * quantity)} is below the minimum {format_decimal(rules.min_notional)} of {rules.symbol}"
+    return order, None
+
+
+def round_to_step(value: float, step: float, down: bool = False) -> float:
+    """`value` rounded to the nearest multiple of `step`, or down to it, unchanged when `step` is 0"""
+    if not step:
+        return value
+    # The tolerance keeps a value already on the step, e.g. 0.3 / 0.1 = 2.9999999999999996, from dropping one step
+    steps = math.floor(value / step + 1e-9) if down else round(value / step)
+    return round(steps * step, decimals(step))
+
+
+def decimals(step: float) -> int:
+    """Number of decimals of an increment, e.g. 2 for 0.01"""
+    return len(format_decimal(step).partition(".")[2])
+
+
+def format_decimal(value: float) -> str:
+    """Plain decimal notation, exchanges reject scientific notation like `1e-05`"""
+    return f"{value:.8f}".rstrip("0").rstrip(".")
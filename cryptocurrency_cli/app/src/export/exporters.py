@@ -0,0 +1,282 @@
+import bz2
+import csv
+import gzip
+import json
+import lzma
+import sys
+import time
+from abc import ABC, abstractmethod
+from itertools import repeat
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+from pydantic import BaseModel
+from src.exchange_processors.candle_series import CandleSeries
+from src.exchange_processors.models import AccountDetails, CandleDetails
+
+
+EXPORT_FORMATS = ("csv", "json", "parquet")
+
+# Compression of the text formats, parquet compresses its column chunks itself
+COMPRESSIONS: Dict[str, Callable[..., IO]] = {
+    "gzip": gzip.open,
+    "bz2": bz2.open,
+    "xz": lzma.open,
+}
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+
+DEFAULT_PARQUET_COMPRESSION = "snappy"
+# Rows buffered before a parquet row group is written, bounds the memory of the export
+DEFAULT_ROW_GROUP_SIZE = 128 * 1024
+
+Columns = Dict[str, Sequence[Any]]
+ExportResult = Union[CandleSeries, List[CandleDetails], AccountDetails]
+
+
+class ExportStats(BaseModel):
+    """
+    Throughput of an export
+
+    `rows`: int
+        Number of rows written
+    `seconds`: float
+        Time spent since the exporter was opened
+    `rows_per_second`: float
+        Rows written per second
+    `peak_rss`: Optional[int]
+        Peak resident memory of the process so far in bytes, `None` where the platform does not report it
+    """
+    rows: int
+    seconds: float
+    rows_per_second: float
+    peak_rss: Optional[int]
+
+
+def peak_rss() -> Optional[int]:
+    """Peak resident memory of the process in bytes, `None` without the `resource` module, e.g. on Windows"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Reported in bytes on macOS, in kilobytes on Linux and the BSDs
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def result_columns(result: ExportResult) -> Columns:
+    """Columns of a `show_candles`/`get_account` result"""
+    if isinstance(result, CandleSeries):
+        return {
+            "symbol": list(repeat(result.symbol, len(result))),
+            **result.columns,
+        }
+    if isinstance(result, AccountDetails):
+        return {
+            "username": list(repeat(result.username, len(result.balances))),
+            "asset": list(result.balances),
+            "balance": list(result.balances.values()),
+        }
+    fields = list(CandleDetails.__fields__)
+    return {field: [getattr(candle, field) for candle in result] for field in fields}
+
+
+class Exporter(ABC):
+    """
+    Streaming writer of tabular results
+
+    The columns of the first batch fix the columns of the file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.names: Optional[List[str]] = None
+        self.rows = 0
+        self.started_at = time.perf_counter()
+
+    @abstractmethod
+    def write_columns(self, columns: Columns) -> None:
+        """Append a batch of rows given as equally long columns"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flush the buffered rows and close the file"""
+        raise NotImplementedError()
+
+    def write(self, result: ExportResult) -> None:
+        """Append a `show_candles`/`get_account` result"""
+        columns = result_columns(result)
+        if self.names is None:
+            self.names = list(columns)
+        self.write_columns({name: columns[name] for name in self.names})
+        self.rows += len(next(iter(columns.values()), ()))
+
+    def write_all(self, results: Iterable[ExportResult]) -> ExportStats:
+        """Write every result, e.g. the pages of a paginated fetch, and close the file"""
+        with self:
+            for result in results:
+                self.write(result)
+        return self.stats()
+
+    def stats(self) -> ExportStats:
+        seconds = time.perf_counter() - self.started_at
+        return ExportStats(
+            rows=self.rows,
+            seconds=seconds,
+            rows_per_second=self.rows / seconds if seconds else 0.0,
+            peak_rss=peak_rss(),
+        )
+
+    def __enter__(self) -> "Exporter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class TextExporter(Exporter):
+    """Exporter of a text format, optionally compressed"""
+
+    def __init__(self, path: str, compression: Optional[str] = None):
+        """
+        Parameters
+        ----------
+        `path`
+            File to write
+        `compression`
+            One of `COMPRESSIONS`, `None` writes plain text
+        """
+        super().__init__(path)
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression {compression}, expected one of {sorted(COMPRESSIONS)}")
+        opener = COMPRESSIONS[compression] if compression else open
+        self.file: IO[str] = opener(path, "wt", newline="")
+
+    @staticmethod
+    def iter_rows(columns: Columns) -> Iterator[tuple]:
+        """Rows of the columns as Python values, NumPy columns are converted in one go"""
+        return zip(*(values.tolist() if hasattr(values, "tolist") else values for values in columns.values()))
+
+
+class CsvExporter(TextExporter):
+    """Comma separated values with a header row"""
+
+    def __init__(self, path: str, compression: Optional[str] = None):
+        super().__init__(path, compression)
+        self.writer = csv.writer(self.file)
+        self.header_written = False
+
+    def write_columns(self, columns: Columns) -> None:
+        if not self.header_written:
+            self.writer.writerow(columns)
+            self.header_written = True
+        self.writer.writerows(self.iter_rows(columns))
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class JsonExporter(TextExporter):
+    """JSON array of one object per row, written element by element"""
+
+    def __init__(self, path: str, compression: Optional[str] = None):
+        super().__init__(path, compression)
+        self.file.write("[")
+
+    def write_columns(self, columns: Columns) -> None:
+        names = list(columns)
+        separator = ",\n" if self.rows else "\n"
+        for row in self.iter_rows(columns):
+            self.file.write(separator + json.dumps(dict(zip(names, row))))
+            separator = ",\n"
+
+    def close(self) -> None:
+        self.file.write("\n]\n" if self.rows else "]\n")
+        self.file.close()
+
+
+class ParquetExporter(Exporter):
+    """
+    Columnar parquet file
+
+    Rows are buffered up to `row_group_size` and written as one row group,
+    large groups compress better and are faster to scan.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        compression: Optional[str] = DEFAULT_PARQUET_COMPRESSION,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    ):
+        """
+        Parameters
+        ----------
+        `path`
+            File to write
+        `compression`
+            Parquet codec of the column chunks, e.g. `snappy`, `zstd` or `gzip`
+        `row_group_size`
+            Rows per row group
+        """
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as error:
+            raise ImportError("Parquet export requires pyarrow, install it with `pip install pyarrow`") from error
+        super().__init__(path)
+        self.pyarrow = pyarrow
+        self.compression = compression or "none"
+        self.row_group_size = row_group_size
+        self.writer = None
+        self.schema = None
+        self.buffered: List[Any] = []
+        self.buffered_rows = 0
+
+    def write_columns(self, columns: Columns) -> None:
+        if not len(next(iter(columns.values()), ())):
+            return
+        # Later batches take the types of the first one, e.g. int balances following float ones
+        batch = self.pyarrow.RecordBatch.from_pydict(columns, schema=self.schema)
+        self.schema = batch.schema
+        self.buffered.append(batch)
+        self.buffered_rows += batch.num_rows
+        if self.buffered_rows >= self.row_group_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered rows as one row group"""
+        if not self.buffered:
+            return
+        table = self.pyarrow.Table.from_batches(self.buffered)
+        if self.writer is None:
+            self.writer = self.pyarrow.parquet.ParquetWriter(self.path, self.schema, compression=self.compression)
+        self.writer.write_table(table, row_group_size=self.row_group_size)
+        self.buffered, self.buffered_rows = [], 0
+
+    def close(self) -> None:
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+
+
+def create_exporter(path: str, format: Optional[str] = None, compression: Optional[str] = None) -> Exporter:
+    """
+    Exporter of the file, the format and compression default to its extensions
+
+    e.g. `candles.csv.gz` is a gzip compressed CSV and `candles.parquet` a
+    snappy compressed parquet file
+    """
+    stem = path
+    for suffix, codec in COMPRESSION_EXTENSIONS.items():
+        if path.endswith(suffix):
+            stem, compression = path[:-len(suffix)], compression or codec
+    extension = stem.rsplit(".", 1)[-1].lower() if "." in stem else ""
+    format = format or extension
+    match format:
+        case "csv":
+            return CsvExporter(path, compression)
+        case "json":
+            return JsonExporter(path, compression)
+        case "parquet":
+            return ParquetExporter(path, compression or DEFAULT_PARQUET_COMPRESSION)
+        case _:
+            raise ValueError(f"Unknown export format {format!r}, expected one of {EXPORT_FORMATS}")
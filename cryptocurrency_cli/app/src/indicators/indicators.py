@@ -0,0 +1,371 @@
+import math
+from collections import deque
+from typing import Deque, Optional, Sequence, Tuple
+import numpy as np
+
+
+# Largest decay exponent of one EMA block, keeps decay ** -n far from overflowing
+EMA_BLOCK_EXPONENT = 150 * math.log(10)
+
+Bands = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def as_array(values: Sequence[float]) -> np.ndarray:
+    """View the values as a float64 array, copying only when needed"""
+    return np.asarray(values, dtype=np.float64)
+
+
+def sma(values: Sequence[float], window: int) -> np.ndarray:
+    """
+    Simple moving average
+
+    Returns
+    ----------
+    np.ndarray
+        Average of each window, NaN until the first window is complete
+    """
+    values = as_array(values)
+    result = np.full(len(values), np.nan)
+    if len(values) < window:
+        return result
+    # Shift by the first value so the running sum stays small and precise
+    shift = values[0]
+    cumulative = np.concatenate(([0.0], np.cumsum(values - shift)))
+    result[window - 1:] = (cumulative[window:] - cumulative[:-window]) / window + shift
+    return result
+
+
+def ema(
+    values: Sequence[float],
+    window: Optional[int] = None,
+    alpha: Optional[float] = None,
+    initial: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Exponential moving average, `y[i] = (1 - alpha) * y[i - 1] + alpha * x[i]`
+
+    Parameters
+    ----------
+    `window`
+        Span of the average, `alpha = 2 / (window + 1)`
+    `alpha`
+        Smoothing factor, overrides `window`
+    `initial`
+        Average preceding the first value, the first value itself by default
+    """
+    values = as_array(values)
+    result = np.empty(len(values))
+    if not len(values):
+        return result
+    alpha = alpha if alpha is not None else 2 / (window + 1)
+    decay = 1 - alpha
+    if decay <= 0:
+        result[:] = values
+        return result
+
+    block = max(1, int(EMA_BLOCK_EXPONENT / -math.log(decay)))
+    previous = values[0] if initial is None else initial
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        powers = decay ** np.arange(1, len(chunk) + 1)
+        result[start:start + len(chunk)] = powers * (previous + alpha * np.cumsum(chunk / powers))
+        previous = result[start + len(chunk) - 1]
+    return result
+
+
+def rsi_from_averages(average_gain: np.ndarray, average_loss: np.ndarray) -> np.ndarray:
+    """RSI of the average gains/losses, 100 when there were no losses"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(average_loss == 0, 100.0, 100 - 100 / (1 + average_gain / average_loss))
+
+
+def rsi(close: Sequence[float], window: int = 14) -> np.ndarray:
+    """
+    Relative strength index with Wilder smoothing
+
+    The first average gain/loss is the simple mean of the first `window`
+    changes, the next ones are smoothed with `alpha = 1 / window`.
+    """
+    close = as_array(close)
+    result = np.full(len(close), np.nan)
+    if len(close) <= window:
+        return result
+    change = np.diff(close)
+    gain = np.clip(change, 0, None)
+    loss = np.clip(-change, 0, None)
+    average_gain = ema(gain[window:], alpha=1 / window, initial=gain[:window].mean())
+    average_loss = ema(loss[window:], alpha=1 / window, initial=loss[:window].mean())
+    result[window] = rsi_from_averages(gain[:window].mean(), loss[:window].mean())
+    result[window + 1:] = rsi_from_averages(average_gain, average_loss)
+    return result
+
+
+def vwap(
+    high: Sequence[float],
+    low: Sequence[float],
+    close: Sequence[float],
+    volume: Sequence[float],
+    window: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Volume weighted average of the typical price `(high + low + close) / 3`
+
+    Parameters
+    ----------
+    `window`
+        Number of candles to average over, cumulative from the first candle if not set
+    """
+    volume = as_array(volume)
+    typical_price = (as_array(high) + as_array(low) + as_array(close)) / 3
+    cumulative_pv = np.cumsum(typical_price * volume)
+    cumulative_volume = np.cumsum(volume)
+    if window is not None:
+        result = np.full(len(volume), np.nan)
+        if len(volume) < window:
+            return result
+        pv = cumulative_pv[window - 1:] - np.concatenate(([0.0], cumulative_pv[:-window]))
+        traded = cumulative_volume[window - 1:] - np.concatenate(([0.0], cumulative_volume[:-window]))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result[window - 1:] = pv / traded
+        return result
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return cumulative_pv / cumulative_volume
+
+
+def bollinger_bands(close: Sequence[float], window: int = 20, width: float = 2.0) -> Bands:
+    """
+    Bollinger bands, the moving average +/- `width` population standard deviations
+
+    Returns
+    ----------
+    Bands
+        Middle, upper and lower band, NaN until the first window is complete
+    """
+    close = as_array(close)
+    middle = sma(close, window)
+    deviation = np.full(len(close), np.nan)
+    if len(close) >= window:
+        deviation[window - 1:] = np.lib.stride_tricks.sliding_window_view(close, window).std(axis=1)
+    return middle, middle + width * deviation, middle - width * deviation
+
+
+class IncrementalSMA:
+    """Simple moving average updated in O(1) per appended value"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values: Deque[float] = deque(maxlen=window)
+        self.total = 0.0
+
+    @property
+    def value(self) -> float:
+        """Current average, NaN until the window is complete"""
+        return self.total / self.window if len(self.values) == self.window else math.nan
+
+    def update(self, value: float) -> float:
+        """Append one value and return the new average"""
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+        return self.value
+
+    def extend(self, values: Sequence[float]) -> np.ndarray:
+        """Append many values at once and return the average after each of them"""
+        history = np.concatenate((np.fromiter(self.values, dtype=np.float64), as_array(values)))
+        result = sma(history, self.window)[len(self.values):]
+        self.values = deque(history[-self.window:].tolist(), maxlen=self.window)
+        self.total = math.fsum(self.values)
+        return result
+
+
+class IncrementalEMA:
+    """Exponential moving average updated in O(1) per appended value"""
+
+    def __init__(self, window: Optional[int] = None, alpha: Optional[float] = None):
+        self.alpha = alpha if alpha is not None else 2 / (window + 1)
+        self.value: Optional[float] = None
+
+    def update(self, value: float) -> float:
+        """Append one value and return the new average"""
+        self.value = value if self.value is None else (1 - self.alpha) * self.value + self.alpha * value
+        return self.value
+
+    def extend(self, values: Sequence[float]) -> np.ndarray:
+        """Append many values at once and return the average after each of them"""
+        result = ema(values, alpha=self.alpha, initial=self.value)
+        if len(result):
+            self.value = float(result[-1])
+        return result
+
+
+class IncrementalRSI:
+    """Wilder RSI updated in O(1) per appended close"""
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.previous: Optional[float] = None
+        self.changes = 0
+        self.average_gain = 0.0
+        self.average_loss = 0.0
+
+    @property
+    def value(self) -> float:
+        """Current RSI, NaN until `window` changes were seen"""
+        if self.changes < self.window:
+            return math.nan
+        if self.average_loss == 0:
+            return 100.0
+        return 100 - 100 / (1 + self.average_gain / self.average_loss)
+
+    def update(self, close: float) -> float:
+        """Append one close and return the new RSI"""
+        if self.previous is not None:
+            change = close - self.previous
+            gain, loss = max(change, 0.0), max(-change, 0.0)
+            self.changes += 1
+            if self.changes <= self.window:
+                # Simple mean of the first `window` changes seeds the averages
+                self.average_gain += (gain - self.average_gain) / self.changes
+                self.average_loss += (loss - self.average_loss) / self.changes
+            else:
+                self.average_gain += (gain - self.average_gain) / self.window
+                self.average_loss += (loss - self.average_loss) / self.window
+        self.previous = close
+        return self.value
+
+    def extend(self, closes: Sequence[float]) -> np.ndarray:
+        """Append many closes at once and return the RSI after each of them"""
+        closes = as_array(closes)
+        # Seeding is at most `window` steps, the rest is vectorized
+        seeding = 0
+        while seeding < len(closes) and (self.previous is None or self.changes < self.window):
+            self.update(float(closes[seeding]))
+            seeding += 1
+        result = np.full(len(closes), np.nan)
+        if seeding:
+            result[seeding - 1] = self.value
+        if seeding == len(closes):
+            return result
+
+        change = np.diff(np.concatenate(([self.previous], closes[seeding:])))
+        average_gain = ema(np.clip(change, 0, None), alpha=1 / self.window, initial=self.average_gain)
+        average_loss = ema(np.clip(-change, 0, None), alpha=1 / self.window, initial=self.average_loss)
+        result[seeding:] = rsi_from_averages(average_gain, average_loss)
+        self.previous = float(closes[-1])
+        self.changes += len(change)
+        self.average_gain = float(average_gain[-1])
+        self.average_loss = float(average_loss[-1])
+        return result
+
+
+class IncrementalVWAP:
+    """VWAP updated in O(1) per appended candle, cumulative or over the last `window` candles"""
+
+    def __init__(self, window: Optional[int] = None):
+        self.window = window
+        self.candles: Deque[Tuple[float, float]] = deque(maxlen=window)
+        self.total_pv = 0.0
+        self.total_volume = 0.0
+
+    @property
+    def value(self) -> float:
+        """Current VWAP, NaN until the window is complete or while nothing was traded"""
+        if self.window is not None and len(self.candles) < self.window:
+            return math.nan
+        return self.total_pv / self.total_volume if self.total_volume else math.nan
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        """Append one candle and return the new VWAP"""
+        pv = (high + low + close) / 3 * volume
+        if self.window is not None:
+            if len(self.candles) == self.window:
+                old_pv, old_volume = self.candles[0]
+                self.total_pv -= old_pv
+                self.total_volume -= old_volume
+            self.candles.append((pv, volume))
+        self.total_pv += pv
+        self.total_volume += volume
+        return self.value
+
+    def extend(
+        self,
+        high: Sequence[float],
+        low: Sequence[float],
+        close: Sequence[float],
+        volume: Sequence[float],
+    ) -> np.ndarray:
+        """Append many candles at once and return the VWAP after each of them"""
+        volume = as_array(volume)
+        pv = (as_array(high) + as_array(low) + as_array(close)) / 3 * volume
+        if self.window is None:
+            cumulative_pv = self.total_pv + np.cumsum(pv)
+            cumulative_volume = self.total_volume + np.cumsum(volume)
+            if len(volume):
+                self.total_pv, self.total_volume = float(cumulative_pv[-1]), float(cumulative_volume[-1])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.where(cumulative_volume != 0, cumulative_pv / cumulative_volume, np.nan)
+
+        history = len(self.candles)
+        all_pv = np.concatenate(([candle[0] for candle in self.candles], pv))
+        all_volume = np.concatenate(([candle[1] for candle in self.candles], volume))
+        # VWAP of the typical price equal to pv / volume gives back the same weighted average
+        with np.errstate(divide="ignore", invalid="ignore"):
+            typical_price = np.where(all_volume != 0, all_pv / all_volume, 0.0)
+        result = vwap(typical_price, typical_price, typical_price, all_volume, self.window)[history:]
+        self.candles = deque(
+            zip(all_pv[-self.window:].tolist(), all_volume[-self.window:].tolist()), maxlen=self.window
+        )
+        self.total_pv = math.fsum(candle[0] for candle in self.candles)
+        self.total_volume = math.fsum(candle[1] for candle in self.candles)
+        return result
+
+
+class IncrementalBollingerBands:
+    """Bollinger bands updated in O(1) per appended close"""
+
+    def __init__(self, window: int = 20, width: float = 2.0):
+        self.window = window
+        self.width = width
+        self.values: Deque[float] = deque(maxlen=window)
+        # Sums of values shifted by the first one, keeps the variance precise
+        self.shift: Optional[float] = None
+        self.total = 0.0
+        self.total_squares = 0.0
+
+    @property
+    def value(self) -> Tuple[float, float, float]:
+        """Current middle, upper and lower band, NaN until the window is complete"""
+        if len(self.values) < self.window:
+            return math.nan, math.nan, math.nan
+        mean = self.total / self.window
+        deviation = math.sqrt(max(0.0, self.total_squares / self.window - mean * mean))
+        middle = mean + self.shift
+        return middle, middle + self.width * deviation, middle - self.width * deviation
+
+    def update(self, close: float) -> Tuple[float, float, float]:
+        """Append one close and return the new bands"""
+        if self.shift is None:
+            self.shift = close
+        if len(self.values) == self.window:
+            old = self.values[0] - self.shift
+            self.total -= old
+            self.total_squares -= old * old
+        self.values.append(close)
+        shifted = close - self.shift
+        self.total += shifted
+        self.total_squares += shifted * shifted
+        return self.value
+
+    def extend(self, closes: Sequence[float]) -> Bands:
+        """Append many closes at once and return the bands after each of them"""
+        history = np.concatenate((np.fromiter(self.values, dtype=np.float64), as_array(closes)))
+        middle, upper, lower = bollinger_bands(history, self.window, self.width)
+        skip = len(self.values)
+        self.values = deque(history[-self.window:].tolist(), maxlen=self.window)
+        if self.shift is None and len(history):
+            self.shift = float(history[0])
+        shifted = np.fromiter(self.values, dtype=np.float64) - (self.shift or 0.0)
+        self.total = math.fsum(shifted)
+        self.total_squares = math.fsum(shifted * shifted)
+        return middle[skip:], upper[skip:], lower[skip:]
@@ -0,0 +1,235 @@
+import heapq
+import threading
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from src.exchange_processors.models import OrderBookSnapshot
+
+
+Level = Tuple[float, float]
+
+# Rebuild a heap once stale prices outnumber live ones by this factor
+HEAP_COMPACTION_RATIO = 2
+
+
+class OrderBookSide:
+    """
+    Price levels of one side of the book
+
+    Removed prices stay in the heap until they reach its top.
+    """
+
+    def __init__(self, descending: bool):
+        """
+        Parameters
+        ----------
+        `descending`
+            Best price is the highest one, `True` for bids
+        """
+        self.sign = -1 if descending else 1
+        self.levels: Dict[float, float] = {}
+        self.heap: List[float] = []
+        self.best: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def clear(self) -> None:
+        self.levels.clear()
+        self.heap.clear()
+        self.best = None
+
+    def update(self, price: float, quantity: float) -> None:
+        """Set the quantity of the level, 0 removes it"""
+        if not quantity:
+            if self.levels.pop(price, None) is not None and price == self.best:
+                self.refresh_best()
+            return
+        if price not in self.levels:
+            if len(self.heap) > HEAP_COMPACTION_RATIO * len(self.levels) + 64:
+                self.compact()
+            heapq.heappush(self.heap, self.sign * price)
+            if self.best is None or self.sign * price < self.sign * self.best:
+                self.best = price
+        self.levels[price] = quantity
+
+    def refresh_best(self) -> None:
+        """Drop removed prices from the top of the heap and pick the new best level"""
+        while self.heap and self.sign * self.heap[0] not in self.levels:
+            heapq.heappop(self.heap)
+        self.best = self.sign * self.heap[0] if self.heap else None
+
+    def compact(self) -> None:
+        """Rebuild the heap from the live prices only"""
+        self.heap = [self.sign * price for price in self.levels]
+        heapq.heapify(self.heap)
+
+    def best_level(self) -> Optional[Level]:
+        """Best (price, quantity)"""
+        return None if self.best is None else (self.best, self.levels[self.best])
+
+    def walk(self) -> Iterator[Level]:
+        """
+        Levels best first
+
+        Explores the heap tree through a frontier heap of node indexes, so
+        reading the best k levels costs O(k log k) whatever the book size.
+        """
+        heap, seen = self.heap, set()
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier:
+            key, index = heapq.heappop(frontier)
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+            price = self.sign * key
+            if price in self.levels and price not in seen:
+                seen.add(price)
+                yield price, self.levels[price]
+
+    def top(self, depth: int) -> List[Level]:
+        """Best `depth` levels, best first"""
+        return list(islice(self.walk(), depth))
+
+
+class OrderBook:
+    """Local order book of one symbol"""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids = OrderBookSide(descending=True)
+        self.asks = OrderBookSide(descending=False)
+        self.last_update_id = 0
+
+    def apply_snapshot(self, snapshot: OrderBookSnapshot) -> None:
+        """Replace the content of the book with the snapshot"""
+        self.bids.clear()
+        self.asks.clear()
+        self.update(snapshot.bids, snapshot.asks)
+        self.last_update_id = snapshot.last_update_id
+
+    def update(self, bids: Iterable[Sequence], asks: Iterable[Sequence]) -> None:
+        """Apply changed levels as (price, quantity) pairs, numbers or their string form"""
+        for price, quantity in bids:
+            self.bids.update(float(price), float(quantity))
+        for price, quantity in asks:
+            self.asks.update(float(price), float(quantity))
+
+    def best_bid(self) -> Optional[Level]:
+        return self.bids.best_level()
+
+    def best_ask(self) -> Optional[Level]:
+        return self.asks.best_level()
+
+    def mid_price(self) -> Optional[float]:
+        """Average of the best bid and ask"""
+        if self.bids.best is None or self.asks.best is None:
+            return None
+        return (self.bids.best + self.asks.best) / 2
+
+    def spread(self) -> Optional[float]:
+        if self.bids.best is None or self.asks.best is None:
+            return None
+        return self.asks.best - self.bids.best
+
+    def price_for(self, side: str, quantity: float) -> Optional[float]:
+        """
+        Average price of a market order walking the book
+
+        Parameters
+        ----------
+        `side`
+            `BUY` takes asks, `SELL` takes bids
+        `quantity`
+            Base quantity of the order
+
+        Returns
+        ----------
+        Optional[float]
+            Volume weighted price, `None` if the book is not deep enough
+        """
+        book_side = self.asks if side.upper() == "BUY" else self.bids
+        remaining, cost = quantity, 0.0
+        for price, available in book_side.walk():
+            taken = min(remaining, available)
+            cost += taken * price
+            remaining -= taken
+            if remaining <= 0:
+                return cost / quantity
+        return None
+
+
+class OrderBookReplica:
+    """
+    Order book kept in sync from a snapshot plus depth diffs
+
+    A gap in the update ids rebuilds the book from a fresh snapshot.
+    """
+
+    def __init__(self, symbol: str, snapshot_loader: Callable[[], OrderBookSnapshot]):
+        """
+        Parameters
+        ----------
+        `symbol`
+            Symbol of the book
+        `snapshot_loader`
+            Fetches a fresh snapshot, called on the first diff and after every gap
+        """
+        self.book = OrderBook(symbol)
+        self.snapshot_loader = snapshot_loader
+        self.synced = False
+        self.updates = 0
+        self.gaps = 0
+        self.resyncs = 0
+        self.lock = threading.Lock()
+
+    def resync(self) -> None:
+        """Rebuild the book from a fresh snapshot"""
+        self.book.apply_snapshot(self.snapshot_loader())
+        self.synced = True
+        self.resyncs += 1
+
+    def apply_diff(
+        self,
+        first_update_id: int,
+        final_update_id: int,
+        bids: Iterable[Sequence],
+        asks: Iterable[Sequence],
+    ) -> bool:
+        """
+        Apply a depth diff
+
+        Returns
+        ----------
+        bool
+            Whether the diff changed the book
+        """
+        with self.lock:
+            if not self.synced:
+                self.resync()
+            if final_update_id <= self.book.last_update_id:
+                return False
+            if first_update_id > self.book.last_update_id + 1:
+                self.gaps += 1
+                self.resync()
+                if final_update_id <= self.book.last_update_id:
+                    return False
+                if first_update_id > self.book.last_update_id + 1:
+                    # The snapshot is older than the diff, try again on the next one
+                    self.synced = False
+                    return False
+            self.book.update(bids, asks)
+            self.book.last_update_id = final_update_id
+            self.updates += 1
+            return True
+
+    def best_bid(self) -> Optional[Level]:
+        with self.lock:
+            return self.book.best_bid()
+
+    def best_ask(self) -> Optional[Level]:
+        with self.lock:
+            return self.book.best_ask()
+
+    def price_for(self, side: str, quantity: float) -> Optional[float]:
+        with self.lock:
+            return self.book.price_for(side, quantity)
@@ -0,0 +1,117 @@
+import threading
+import time
+from typing import TYPE_CHECKING, Iterable, Optional
+from src.storage.ticker_snapshots import TickerSnapshot, TickerSnapshotStore
+
+if TYPE_CHECKING:
+    from src.exchange_processors.exchange_processor import CryptoExchangeProcessor
+
+
+POPULAR_COINS = (
+    "BTC", "ETH", "BNB", "SOL", "XRP", "ADA", "DOGE", "TRX", "LTC", "LINK",
+    "DOT", "AVAX", "BCH", "XLM", "ATOM", "ETC", "UNI", "FIL", "NEAR", "APT",
+)
+
+# Seconds a snapshot is current, older ones are shown as stale while they are refreshed
+DEFAULT_REFRESH_INTERVAL = 60.0
+# Seconds before a failed refresh is tried again
+DEFAULT_RETRY_INTERVAL = 10.0
+
+
+class PopularCoins:
+    """
+    Tickers of the popular coins served from a snapshot a background thread keeps current
+
+    `snapshot()` never waits for the exchange, a failed refresh keeps serving the previous one.
+    """
+
+    def __init__(
+        self,
+        processor: "CryptoExchangeProcessor",
+        store: Optional[TickerSnapshotStore] = None,
+        coins: Iterable[str] = POPULAR_COINS,
+        quote: Optional[str] = None,
+        refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+        retry_interval: float = DEFAULT_RETRY_INTERVAL,
+    ):
+        """
+        Parameters
+        ----------
+        `processor`
+            Processor of the exchange the tickers are fetched from
+        `store`
+            Store of the snapshots, `TickerSnapshotStore()` by default
+        `coins`
+            Coins of the view, in the order they are shown
+        `quote`
+            Quote currency of the pairs, the `default_quote` of the processor by default
+        `refresh_interval`
+            Seconds a snapshot is current
+        `retry_interval`
+            Seconds before a failed refresh is tried again
+        """
+        self.processor = processor
+        self.store = store or TickerSnapshotStore()
+        self.exchange = processor.client.exchange
+        quote = quote or processor.default_quote
+        self.symbols = [processor.ticker_symbol(coin, quote) for coin in coins]
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self.error: Optional[Exception] = None
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def snapshot(self) -> Optional[TickerSnapshot]:
+        """Latest snapshot, `None` before the first refresh ever finished"""
+        return self.store.load(self.exchange)
+
+    def is_stale(self, snapshot: TickerSnapshot) -> bool:
+        """Whether the snapshot is older than `refresh_interval`"""
+        return snapshot.age > self.refresh_interval
+
+    def refresh(self) -> TickerSnapshot:
+        """Fetch the tickers of every coin in batches and store them as the latest snapshot"""
+        fetched_at = time.time()
+        batch_size = self.processor.ticker_batch_size
+        tickers = {}
+        for start in range(0, len(self.symbols), batch_size):
+            for ticker in self.processor.fetch_tickers(self.symbols[start:start + batch_size]):
+                tickers[ticker.symbol.lower()] = ticker
+        ordered = [tickers[symbol.lower()] for symbol in self.symbols if symbol.lower() in tickers]
+        snapshot = TickerSnapshot(exchange=self.exchange, fetched_at=fetched_at, tickers=ordered)
+        self.store.save(snapshot)
+        return snapshot
+
+    def start(self) -> "PopularCoins":
+        """Keep the snapshot current from a daemon thread until `stop()`"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="popular-coins", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop refreshing, a refresh in flight still finishes"""
+        self.stopped.set()
+
+    def run(self) -> None:
+        while not self.stopped.is_set():
+            snapshot = self.snapshot()
+            due_in = 0.0 if snapshot is None else self.refresh_interval - snapshot.age
+            if due_in > 0:
+                self.stopped.wait(due_in)
+                continue
+            try:
+                self.refresh()
+                self.error = None
+            except Exception as error:
+                self.error = error
+                self.stopped.wait(self.retry_interval)
+
+
+def format_age(seconds: float) -> str:
+    """Age in its two largest units, e.g. `45s`, `3m 12s` or `2d 5h`"""
+    seconds = int(seconds)
+    for unit, size, smaller, smaller_size in (("d", 86400, "h", 3600), ("h", 3600, "m", 60), ("m", 60, "s", 1)):
+        if seconds >= size:
+            return f"{seconds // size}{unit} {seconds % size // smaller_size}{smaller}"
+    return f"{seconds}s"
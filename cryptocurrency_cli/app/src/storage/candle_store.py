@@ -0,0 +1,225 @@
+import os
+import shutil
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser("~"), ".cryptocli", "candles")
+
+# numpy dtype of every column
+CANDLE_COLUMNS: Dict[str, str] = {
+    "open_time": "<i8",
+    "open": "<f8",
+    "high": "<f8",
+    "low": "<f8",
+    "close": "<f8",
+    "volume": "<f8",
+}
+
+# File of the series holding the decimals of the exchange price strings
+PRICE_DECIMALS_FILE = "price_decimals"
+
+Columns = Dict[str, "np.ndarray"]
+SeriesKey = Tuple[str, str, str]
+
+
+class CandleStore:
+    """
+    On-disk columnar OHLCV store
+
+    One append-only file per column of every series, read through memory maps.
+    """
+
+    def __init__(self, root: str = DEFAULT_STORE_PATH):
+        """
+        Parameters
+        ----------
+        `root`
+            Directory holding the series
+        """
+        self.root = root
+        self.lock = threading.Lock()
+        self._maps: Dict[SeriesKey, Tuple[int, Columns]] = {}
+
+    def path(self, exchange: str, symbol: str, interval: str) -> str:
+        """Directory of the series"""
+        return os.path.join(self.root, exchange, symbol.upper(), interval)
+
+    def column_path(self, exchange: str, symbol: str, interval: str, column: str) -> str:
+        """File of one column of the series"""
+        return os.path.join(self.path(exchange, symbol, interval), f"{column}.bin")
+
+    def length(self, exchange: str, symbol: str, interval: str) -> int:
+        """
+        Number of complete candles in the series
+
+        A write interrupted half way leaves columns of different lengths, only
+        rows present in every column are considered stored.
+        """
+        import numpy as np
+
+        lengths = []
+        for column, dtype in CANDLE_COLUMNS.items():
+            try:
+                size = os.path.getsize(self.column_path(exchange, symbol, interval, column))
+            except FileNotFoundError:
+                return 0
+            lengths.append(size // np.dtype(dtype).itemsize)
+        return min(lengths)
+
+    def first_open_time(self, exchange: str, symbol: str, interval: str) -> Optional[int]:
+        """Open time of the oldest stored candle, `None` for an empty series"""
+        open_time = self.read(exchange, symbol, interval)["open_time"]
+        return int(open_time[0]) if len(open_time) else None
+
+    def last_open_time(self, exchange: str, symbol: str, interval: str) -> Optional[int]:
+        """Open time of the newest stored candle, `None` for an empty series"""
+        open_time = self.read(exchange, symbol, interval, limit=1)["open_time"]
+        return int(open_time[-1]) if len(open_time) else None
+
+    def price_decimals(self, exchange: str, symbol: str, interval: str) -> Optional[int]:
+        """Decimals of the price strings of the exchange, `None` if they were never stored"""
+        try:
+            with open(os.path.join(self.path(exchange, symbol, interval), PRICE_DECIMALS_FILE)) as file:
+                return int(file.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def write_price_decimals(self, directory: str, price_decimals: Optional[int]) -> None:
+        if price_decimals is not None:
+            with open(os.path.join(directory, PRICE_DECIMALS_FILE), "w") as file:
+                file.write(str(price_decimals))
+
+    def read(self, exchange: str, symbol: str, interval: str, limit: Optional[int] = None) -> Columns:
+        """
+        Read the series
+
+        Parameters
+        ----------
+        `limit`
+            Return only the newest `limit` candles
+
+        Returns
+        ----------
+        Columns
+            Read-only views of the memory mapped columns keyed by column name
+        """
+        key = (exchange, symbol.upper(), interval)
+        length = self.length(exchange, symbol, interval)
+        cached = self._maps.get(key)
+        if cached is None or cached[0] != length:
+            columns = {
+                column: self.map_column(exchange, symbol, interval, column, length)
+                for column in CANDLE_COLUMNS
+            }
+            self._maps[key] = cached = (length, columns)
+
+        start = 0 if limit is None else max(0, length - limit)
+        return {column: values[start:] for column, values in cached[1].items()}
+
+    def map_column(self, exchange: str, symbol: str, interval: str, column: str, length: int) -> "np.ndarray":
+        """Memory map the first `length` values of the column"""
+        import numpy as np
+
+        dtype = CANDLE_COLUMNS[column]
+        if not length:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(
+            self.column_path(exchange, symbol, interval, column),
+            dtype=dtype,
+            mode="r",
+            shape=(length,),
+        )
+
+    def append(
+        self,
+        exchange: str,
+        symbol: str,
+        interval: str,
+        columns: Dict[str, Sequence],
+        price_decimals: Optional[int] = None,
+    ) -> int:
+        """
+        Append candles to the series
+
+        Candles not newer than the last stored one are skipped.
+
+        Returns
+        ----------
+        int
+            Number of appended candles
+        """
+        import numpy as np
+
+        with self.lock:
+            length = self.length(exchange, symbol, interval)
+            open_time = np.asarray(columns["open_time"], dtype=CANDLE_COLUMNS["open_time"])
+            last_open_time = self.last_open_time(exchange, symbol, interval)
+            start = 0 if last_open_time is None else int(np.searchsorted(open_time, last_open_time, side="right"))
+            if start >= len(open_time):
+                return 0
+
+            os.makedirs(self.path(exchange, symbol, interval), exist_ok=True)
+            self.write_price_decimals(self.path(exchange, symbol, interval), price_decimals)
+            for column, dtype in CANDLE_COLUMNS.items():
+                values = np.asarray(columns[column], dtype=dtype)[start:]
+                with open(self.column_path(exchange, symbol, interval, column), "r+b" if length else "wb") as file:
+                    # Drop a tail left by an interrupted append before writing
+                    file.truncate(length * values.itemsize)
+                    file.seek(length * values.itemsize)
+                    file.write(values.tobytes())
+            return len(open_time) - start
+
+    def prepend(
+        self,
+        exchange: str,
+        symbol: str,
+        interval: str,
+        columns: Dict[str, Sequence],
+        price_decimals: Optional[int] = None,
+    ) -> int:
+        """
+        Insert candles older than the first stored one before the series
+
+        The series is rewritten into a new directory swapped in place of the old one.
+
+        Returns
+        ----------
+        int
+            Number of prepended candles
+        """
+        import numpy as np
+
+        with self.lock:
+            path = self.path(exchange, symbol, interval)
+            open_time = np.asarray(columns["open_time"], dtype=CANDLE_COLUMNS["open_time"])
+            first_open_time = self.first_open_time(exchange, symbol, interval)
+            end = len(open_time) if first_open_time is None else int(np.searchsorted(open_time, first_open_time))
+            if not end:
+                return 0
+
+            stored = self.read(exchange, symbol, interval)
+            temporary = f"{path}.{os.getpid()}.tmp"
+            shutil.rmtree(temporary, ignore_errors=True)
+            os.makedirs(temporary)
+            if os.path.isdir(path):
+                column_files = {f"{column}.bin" for column in CANDLE_COLUMNS}
+                for name in os.listdir(path):
+                    if name not in column_files:
+                        shutil.copy2(os.path.join(path, name), temporary)
+            self.write_price_decimals(temporary, price_decimals)
+            for column, dtype in CANDLE_COLUMNS.items():
+                values = np.concatenate((np.asarray(columns[column], dtype=dtype)[:end], stored[column]))
+                with open(os.path.join(temporary, f"{column}.bin"), "wb") as file:
+                    file.write(values.tobytes())
+
+            replaced = f"{path}.{os.getpid()}.old"
+            if os.path.isdir(path):
+                os.rename(path, replaced)
+            os.rename(temporary, path)
+            shutil.rmtree(replaced, ignore_errors=True)
+            self._maps.pop((exchange, symbol.upper(), interval), None)
+            return end
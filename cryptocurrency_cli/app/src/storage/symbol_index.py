@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Optional
+from src.exchange_processors.models import SymbolRules
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+DEFAULT_SYMBOLS_PATH = os.path.join(os.path.expanduser("~"), ".cryptocli", "symbols")
+
+# Exchange info changes rarely, a day old index is still good for validation
+DEFAULT_SYMBOLS_MAX_AGE = 24 * 60 * 60
+
+# numpy dtype of the index rows
+SYMBOL_DTYPE = [
+    ("symbol", "<U24"),
+    ("trading", "?"),
+    ("tick_size", "<f8"),
+    ("min_price", "<f8"),
+    ("max_price", "<f8"),
+    ("step_size", "<f8"),
+    ("min_quantity", "<f8"),
+    ("max_quantity", "<f8"),
+    ("min_notional", "<f8"),
+]
+SYMBOL_FIELDS = [field for field, _ in SYMBOL_DTYPE]
+
+FetchRules = Callable[[], Iterable[SymbolRules]]
+
+
+class SymbolIndex:
+    """
+    On-disk index of the symbol trading rules of the exchanges
+
+    One `.npy` file per exchange, fetched again when older than `max_age`.
+    """
+
+    def __init__(self, root: str = DEFAULT_SYMBOLS_PATH, max_age: float = DEFAULT_SYMBOLS_MAX_AGE):
+        """
+        Parameters
+        ----------
+        `root`
+            Directory holding the index files
+        `max_age`
+            Seconds after which the index of an exchange is fetched again
+        """
+        self.root = root
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self._loaded: Dict[str, LoadedIndex] = {}
+
+    def path(self, exchange: str) -> str:
+        """File of the index of the exchange"""
+        return os.path.join(self.root, f"{exchange}.npy")
+
+    def age(self, exchange: str) -> Optional[float]:
+        """Seconds since the index of the exchange was fetched, `None` if it never was"""
+        loaded = self._loaded.get(exchange)
+        if loaded is not None:
+            return time.time() - loaded.fetched_at
+        try:
+            return time.time() - os.path.getmtime(self.path(exchange))
+        except FileNotFoundError:
+            return None
+
+    def table(self, exchange: str, fetch: FetchRules) -> "np.ndarray":
+        """
+        Rules of the exchange sorted by symbol
+
+        Parameters
+        ----------
+        `fetch`
+            Called for the rules when the index is missing or too old
+        """
+        return self.loaded(exchange, fetch).table
+
+    def is_current(self, exchange: str) -> bool:
+        """Whether the index of the exchange is in memory and not too old, so a lookup does no I/O"""
+        loaded = self._loaded.get(exchange)
+        return loaded is not None and time.time() - loaded.fetched_at <= self.max_age
+
+    def loaded(self, exchange: str, fetch: FetchRules) -> "LoadedIndex":
+        """Index of the exchange in memory, loaded or fetched when missing or too old"""
+        if self.is_current(exchange):
+            return self._loaded[exchange]
+        with self.lock:
+            loaded = self._loaded.get(exchange)
+            if loaded is not None and time.time() - loaded.fetched_at <= self.max_age:
+                return loaded
+            if loaded is None:
+                loaded = self.load(exchange)
+            if loaded is None or time.time() - loaded.fetched_at > self.max_age:
+                try:
+                    loaded = self.save(exchange, fetch())
+                except Exception:
+                    if loaded is None:
+                        raise
+                    # Stale rules still validate better than none, retried after another `max_age`
+                    loaded = LoadedIndex(time.time(), loaded.table)
+            self._loaded[exchange] = loaded
+            return loaded
+
+    def load(self, exchange: str) -> Optional["LoadedIndex"]:
+        """Stored index of the exchange, `None` if there is none"""
+        import numpy as np
+
+        try:
+            fetched_at = os.path.getmtime(self.path(exchange))
+            return LoadedIndex(fetched_at, np.load(self.path(exchange)))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save(self, exchange: str, rules: Iterable[SymbolRules]) -> "LoadedIndex":
+        """Store the rules, replacing the index atomically so readers never see half of it"""
+        import numpy as np
+
+        rows = sorted(
+            (rule.symbol.upper(), *(getattr(rule, field) for field in SYMBOL_FIELDS[1:])) for rule in rules
+        )
+        table = np.array(rows, dtype=SYMBOL_DTYPE)
+        os.makedirs(self.root, exist_ok=True)
+        temporary = f"{self.path(exchange)}.{os.getpid()}.tmp.npy"
+        np.save(temporary, table)
+        os.replace(temporary, self.path(exchange))
+        return LoadedIndex(time.time(), table)
+
+    def refresh(self, exchange: str, fetch: FetchRules) -> "np.ndarray":
+        """Fetch and store the rules of the exchange regardless of the age of the index"""
+        with self.lock:
+            self._loaded[exchange] = loaded = self.save(exchange, fetch())
+            return loaded.table
+
+    def lookup(self, exchange: str, symbol: str, fetch: FetchRules) -> Optional[SymbolRules]:
+        """Rules of the symbol, `None` if the exchange does not list it"""
+        return self.loaded(exchange, fetch).lookup(symbol)
+
+
+class LoadedIndex:
+    """Rules of an exchange in memory, symbols found by binary search are kept for the next lookups"""
+
+    def __init__(self, fetched_at: float, table: "np.ndarray"):
+        self.fetched_at = fetched_at
+        self.table = table
+        self.symbols = table["symbol"]
+        self.rules: Dict[str, SymbolRules] = {}
+
+    def lookup(self, symbol: str) -> Optional[SymbolRules]:
+        import numpy as np
+
+        symbol = symbol.upper()
+        rules = self.rules.get(symbol)
+        if rules is not None:
+            return rules
+        position = int(np.searchsorted(self.symbols, symbol))
+        if position == len(self.symbols) or self.symbols[position] != symbol:
+            return None
+        rules = SymbolRules.construct(**dict(zip(SYMBOL_FIELDS, self.table[position].item())))
+        self.rules[symbol] = rules
+        return rules
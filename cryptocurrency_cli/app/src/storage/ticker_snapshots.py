@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from src.exchange_processors.models import TickerDetails
+
+
+DEFAULT_TICKERS_PATH = os.path.join(os.path.expanduser("~"), ".cryptocli", "tickers")
+
+
+class TickerSnapshot(BaseModel):
+    """
+    Tickers of an exchange at one moment
+
+    `exchange`: str
+        Exchange the tickers come from
+    `fetched_at`: float
+        Unix time the tickers were requested at
+    `tickers`: List[TickerDetails]
+        Tickers in the order they were asked for
+    """
+    exchange: str
+    fetched_at: float
+    tickers: List[TickerDetails]
+
+    @property
+    def age(self) -> float:
+        """Seconds since the tickers were requested"""
+        return max(0.0, time.time() - self.fetched_at)
+
+
+class TickerSnapshotStore:
+    """
+    On-disk snapshots of the tickers, one JSON file per exchange
+
+    Snapshots are replaced atomically and kept in memory until their file changes.
+    """
+
+    def __init__(self, root: str = DEFAULT_TICKERS_PATH):
+        """
+        Parameters
+        ----------
+        `root`
+            Directory holding the snapshot files
+        """
+        self.root = root
+        self.lock = threading.Lock()
+        self._loaded: Dict[str, Tuple[float, TickerSnapshot]] = {}
+
+    def path(self, exchange: str) -> str:
+        """File of the snapshot of the exchange"""
+        return os.path.join(self.root, f"{exchange}.json")
+
+    def load(self, exchange: str) -> Optional[TickerSnapshot]:
+        """Latest snapshot of the exchange, `None` if there is none or it can not be read"""
+        try:
+            modified_at = os.path.getmtime(self.path(exchange))
+        except FileNotFoundError:
+            return None
+        with self.lock:
+            loaded = self._loaded.get(exchange)
+            if loaded is not None and loaded[0] == modified_at:
+                return loaded[1]
+            try:
+                snapshot = TickerSnapshot.parse_file(self.path(exchange))
+            except (FileNotFoundError, ValueError):
+                return None
+            self._loaded[exchange] = modified_at, snapshot
+            return snapshot
+
+    def save(self, snapshot: TickerSnapshot) -> None:
+        """Store the snapshot, replacing the previous one of its exchange atomically"""
+        os.makedirs(self.root, exist_ok=True)
+        path = self.path(snapshot.exchange)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "w") as file:
+            file.write(snapshot.json())
+        os.replace(temporary, path)
+        with self.lock:
+            self._loaded[snapshot.exchange] = os.path.getmtime(path), snapshot
@@ -0,0 +1,249 @@
+import asyncio
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import IO, Any, ClassVar, Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+import websockets
+from src.exchange_processors.candle_series import CandleSeries
+from src.exchange_processors.models import CandleDetails
+from src.order_book.order_book import OrderBookReplica
+from src.storage.candle_store import CANDLE_COLUMNS
+
+
+DEFAULT_WINDOW_SIZE = 1000
+DEFAULT_RECONNECT_DELAY = 1.0
+
+WindowKey = Tuple[str, str]
+
+
+class RollingCandleWindow:
+    """
+    Last `capacity` candles of one symbol/interval kept in memory
+
+    An update with the open time of the newest candle replaces it.
+    """
+
+    def __init__(self, symbol: str, capacity: int = DEFAULT_WINDOW_SIZE):
+        self.symbol = symbol
+        self.capacity = capacity
+        self.columns = {column: np.zeros(2 * capacity, dtype=dtype) for column, dtype in CANDLE_COLUMNS.items()}
+        self.end = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return min(self.end, self.capacity)
+
+    def update(self, open_time: int, open: float, high: float, low: float, close: float, volume: float) -> None:
+        """Append a new candle or replace the newest one if `open_time` matches it"""
+        with self.lock:
+            last_open_time = self.columns["open_time"][self.end - 1] if self.end else None
+            if last_open_time is not None and open_time < last_open_time:
+                return
+            if last_open_time != open_time:
+                if self.end == 2 * self.capacity:
+                    for values in self.columns.values():
+                        values[:self.capacity] = values[self.capacity:]
+                    self.end = self.capacity
+                self.end += 1
+            index = self.end - 1
+            for column, value in zip(CANDLE_COLUMNS, (open_time, open, high, low, close, volume)):
+                self.columns[column][index] = value
+
+    def extend(self, series: CandleSeries) -> None:
+        """Append the candles of the series, e.g. history fetched over REST"""
+        for open_time, open, high, low, close, volume in zip(*(values.tolist() for values in series.columns.values())):
+            self.update(open_time, open, high, low, close, volume)
+
+    def series(self, limit: Optional[int] = None) -> CandleSeries:
+        """Copy of the newest `limit` candles"""
+        with self.lock:
+            count = len(self) if limit is None else min(limit, len(self))
+            return CandleSeries(
+                self.symbol,
+                **{column: values[self.end - count:self.end].copy() for column, values in self.columns.items()},
+            )
+
+
+class MarketDataStream(ABC):
+    """
+    Live kline/ticker/depth stream of an exchange
+
+    Consumed by a daemon thread, so reads never wait for the network.
+    """
+
+    base_url: ClassVar[str]
+
+    def __init__(
+        self,
+        symbols: Iterable[str],
+        intervals: Iterable[str],
+        url: Optional[str] = None,
+        window_size: int = DEFAULT_WINDOW_SIZE,
+        reconnect_delay: float = DEFAULT_RECONNECT_DELAY,
+        record_path: Optional[str] = None,
+        order_books: Optional[Dict[str, OrderBookReplica]] = None,
+    ):
+        """
+        Parameters
+        ----------
+        `symbols`
+            Symbols to subscribe to
+        `intervals`
+            Kline intervals subscribed for every symbol
+        `url`
+            Websocket url, `base_url` of the exchange by default
+        `window_size`
+            Number of candles kept per symbol/interval
+        `reconnect_delay`
+            Seconds to wait before reconnecting a dropped connection
+        `record_path`
+            Append every received frame to this JSON lines file, it can be replayed later
+        `order_books`
+            Replicas kept in sync from the depth diffs of their symbol
+        """
+        self.symbols = [symbol.upper() for symbol in symbols]
+        self.intervals = list(intervals)
+        self.url = url or self.base_url
+        self.reconnect_delay = reconnect_delay
+        self.record_path = record_path
+        self.windows: Dict[WindowKey, RollingCandleWindow] = {
+            (symbol, interval): RollingCandleWindow(symbol, window_size)
+            for symbol in self.symbols
+            for interval in self.intervals
+        }
+        self.tickers: Dict[str, CandleDetails] = {}
+        self.order_books = {symbol.upper(): replica for symbol, replica in (order_books or {}).items()}
+        self.frames = 0
+        self.message_errors = 0
+        self.last_message_error: Optional[Exception] = None
+        self.last_frame_at: Optional[float] = None
+        self.connected = threading.Event()
+        # Set from any thread, `stop` may come before the loop of `run` exists
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @abstractmethod
+    def compose_url(self) -> str:
+        """Url of the websocket, may embed the subscribed streams"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def compose_subscriptions(self) -> List[Dict[str, Any]]:
+        """Messages sent right after connecting"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def handle_message(self, message: Any) -> None:
+        """Apply one decoded frame to the windows and tickers"""
+        raise NotImplementedError()
+
+    def window(self, symbol: str, interval: str) -> Optional[RollingCandleWindow]:
+        """Rolling window of the symbol/interval, `None` if it is not streamed"""
+        return self.windows.get((symbol.upper(), interval))
+
+    def is_streaming(self, symbol: str, interval: Optional[str]) -> bool:
+        """Whether candles of the symbol/interval are served by the stream"""
+        return interval is not None and self.window(symbol, interval) is not None
+
+    def show_candles(
+        self,
+        symbol: str,
+        interval: str,
+        limit: Optional[int] = None,
+        as_series: bool = False,
+    ) -> Union[List[CandleDetails], CandleSeries]:
+        """Newest candles of the rolling window"""
+        series = self.window(symbol, interval).series(limit)
+        return series if as_series else series.to_candles()
+
+    def ticker(self, symbol: str) -> Optional[CandleDetails]:
+        """Last streamed ticker of the symbol"""
+        return self.tickers.get(symbol.upper())
+
+    def order_book(self, symbol: str) -> Optional[OrderBookReplica]:
+        """Order book replica of the symbol, `None` if its depth is not streamed"""
+        return self.order_books.get(symbol.upper())
+
+    @property
+    def staleness(self) -> Optional[float]:
+        """Seconds since the last frame, `None` before the first one"""
+        return None if self.last_frame_at is None else time.monotonic() - self.last_frame_at
+
+    def start(self, timeout: Optional[float] = None) -> "MarketDataStream":
+        """Start consuming in a daemon thread, wait up to `timeout` seconds for the connection"""
+        self._stopped.clear()
+        self._thread = threading.Thread(target=asyncio.run, args=(self.run(),), daemon=True)
+        self._thread.start()
+        if timeout is not None:
+            self.connected.wait(timeout)
+        return self
+
+    def stop(self) -> None:
+        """Close the connection and wait for the thread to finish"""
+        self._stopped.set()
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                # The loop already finished
+                pass
+        if self._thread is not None:
+            self._thread.join()
+        self._thread = None
+
+    def __enter__(self) -> "MarketDataStream":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    async def run(self) -> None:
+        """Consume the websocket until stopped, reconnecting when the connection drops"""
+        self._wakeup = asyncio.Event()
+        # `stop` checks the loop after setting `_stopped`, so either it wakes the loop or the loop sees the flag
+        self._loop = asyncio.get_running_loop()
+        record = open(self.record_path, "a") if self.record_path else None
+        try:
+            while not self._stopped.is_set():
+                consume = asyncio.ensure_future(self.consume(record))
+                stopped = asyncio.ensure_future(self._wakeup.wait())
+                await asyncio.wait({consume, stopped}, return_when=asyncio.FIRST_COMPLETED)
+                consume.cancel()
+                stopped.cancel()
+                self.connected.clear()
+                if not self._stopped.is_set():
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), self.reconnect_delay)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            self._loop = self._wakeup = None
+            if record is not None:
+                record.close()
+
+    async def consume(self, record: Optional[IO[str]]) -> None:
+        """Connect, subscribe and apply frames until the connection is closed"""
+        try:
+            async with websockets.connect(self.compose_url()) as connection:
+                for subscription in self.compose_subscriptions():
+                    await connection.send(json.dumps(subscription))
+                self.connected.set()
+                started_at = time.monotonic()
+                async for frame in connection:
+                    self.frames += 1
+                    self.last_frame_at = time.monotonic()
+                    if record is not None:
+                        record.write(json.dumps({"t": self.last_frame_at - started_at, "frame": frame}) + "\n")
+                    try:
+                        self.handle_message(json.loads(frame))
+                    except Exception as error:
+                        # A frame that does not parse must not drop the connection, nor pass unnoticed
+                        self.message_errors += 1
+                        self.last_message_error = error
+        except (OSError, websockets.WebSocketException):
+            return
@@ -0,0 +1,51 @@
+import io
+import json
+import os
+import sys
+
+import pytest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+if APP_PATH not in sys.path:
+    sys.path.insert(0, APP_PATH)
+
+
+class FakeResponse:
+    """Response of a mocked client request"""
+
+    def __init__(self, payload, status_code: int = 200, headers=None):
+        self.payload = payload
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = json.dumps(payload).encode()
+        self.raw = io.BytesIO(self.content)
+        self.raw.seek(0, io.SEEK_END)
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    """`requests.Session` answering with `responses` in turn, the last one repeated"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+        self.closed = False
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        return self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_response():
+    return FakeResponse
+
+
+@pytest.fixture
+def fake_session():
+    return FakeSession
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.exchange_processors.account_cache import AccountCache
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+from src.exchange_processors.models import AccountDetails, ResponseDetails
+
+
+class Fetch:
+    """Account fetch counting its calls, every call returns a new snapshot"""
+
+    def __init__(self, result=None):
+        self.calls = 0
+        self.result = result
+
+    def __call__(self):
+        self.calls += 1
+        return self.result or AccountDetails(username=f"user{self.calls}", balances={"BTC": self.calls})
+
+
+def test_snapshot_is_served_until_invalidated():
+    cache, fetch = AccountCache(ttl=60), Fetch()
+    assert cache.get(fetch) == cache.get(fetch)
+    assert fetch.calls == 1
+
+    cache.invalidate()
+    assert cache.get(fetch).balances == {"BTC": 2}
+    assert fetch.calls == 2
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.refreshes, stats.invalidations) == (1, 2, 2, 1)
+
+
+def test_refresh_started_before_an_invalidation_is_not_stored():
+    cache, fetch = AccountCache(ttl=60), Fetch()
+
+    def fetch_then_order():
+        account = fetch()
+        # An order placed while the account was requested
+        cache.invalidate()
+        return account
+
+    assert cache.get(fetch_then_order).username == "user1"
+    assert cache.get(fetch).username == "user2"
+
+
+def test_expired_snapshot_and_errors_are_fetched_again():
+    error = ResponseDetails(request_url="/account", status_code=500, details="down")
+    cache, failing = AccountCache(ttl=60), Fetch(error)
+    assert cache.get(failing) == error
+    assert cache.get(failing) == error
+    assert failing.calls == 2
+
+    expiring, fetch = AccountCache(ttl=0), Fetch()
+    expiring.get(fetch)
+    expiring.get(fetch)
+    assert fetch.calls == 2
+
+
+def test_concurrent_misses_share_one_request():
+    cache, release = AccountCache(ttl=60), threading.Event()
+    fetch = Fetch()
+
+    def slow_fetch():
+        release.wait(5)
+        return fetch()
+
+    results = []
+    readers = [threading.Thread(target=lambda: results.append(cache.get(slow_fetch))) for _ in range(8)]
+    for reader in readers:
+        reader.start()
+    while cache.stats().misses < len(readers):
+        time.sleep(0.001)
+    release.set()
+    for reader in readers:
+        reader.join()
+    assert fetch.calls == 1
+    assert len(results) == 8 and all(result is results[0] for result in results)
+
+
+def test_async_readers_share_one_request():
+    cache, fetch = AccountCache(ttl=60), Fetch()
+
+    async def fetch_async():
+        await asyncio.sleep(0.01)
+        return fetch()
+
+    async def read():
+        return await asyncio.gather(*(cache.get_async(fetch_async) for _ in range(8)))
+
+    accounts = asyncio.run(read())
+    assert fetch.calls == 1
+    assert all(account is accounts[0] for account in accounts)
+
+
+def test_processor_caches_only_when_enabled(mocker, fake_response):
+    request = mocker.patch.object(BinanceClient, "request", return_value=fake_response({"balances": []}))
+    mocker.patch.object(BinanceExchangeProcessor, "parse_account", return_value=AccountDetails(username="", balances={}))
+    client = BinanceClient("key", rate_limiter=None)
+
+    uncached = BinanceExchangeProcessor(client)
+    assert uncached.account_cache is None
+    uncached.get_account(None)
+    uncached.get_account(None)
+    assert request.call_count == 2
+
+    cached = BinanceExchangeProcessor(client, account_ttl=60)
+    cached.get_account(None)
+    cached.get_account(None)
+    assert request.call_count == 3
+    request.return_value = fake_response({"status": "FILLED", "price": "1.00"})
+    cached.place_order("BTCUSDT", "BUY", "MARKET", 1.0, 0.0)
+    request.return_value = fake_response({"balances": []})
+    cached.get_account(None)
+    assert request.call_count == 5
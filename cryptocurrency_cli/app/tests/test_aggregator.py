@@ -0,0 +1,100 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+
+from src.accounts.aggregator import AccountAggregator, AccountKey, read_key_file
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.clients.rate_limiter import CombinedRateLimiter
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+from src.exchange_processors.models import AccountDetails, ResponseDetails
+
+
+def test_key_file_lines():
+    keys = read_key_file([
+        "# accounts\n",
+        "secret-a\n",
+        "\n",
+        "trading-1 secret-b\n",
+        "trading-2 secret-c api-c\n",
+    ])
+    assert keys == [
+        AccountKey(name="key2", secret_key="secret-a"),
+        AccountKey(name="trading-1", secret_key="secret-b"),
+        AccountKey(name="trading-2", secret_key="secret-c", api_key="api-c"),
+    ]
+    with pytest.raises(ValueError, match="Line 2 .* repeats the name a"):
+        read_key_file(["a secret-a", "a secret-b"])
+    with pytest.raises(ValueError, match="Line 1 .* got 4 fields"):
+        read_key_file(["a secret-a api-a extra"])
+
+
+def fake_processor(mocker, ping=HTTPStatus.OK, account=None):
+    processor = mocker.Mock()
+    processor.ping_client_async = mocker.AsyncMock(return_value=ping)
+    processor.get_account_async = mocker.AsyncMock(return_value=account)
+    processor.async_client.aclose = mocker.AsyncMock()
+    return processor
+
+
+def test_balances_are_summed_over_the_accounts_that_answered(mocker):
+    processors = {
+        "secret-a": fake_processor(mocker, account=AccountDetails(username="a", balances={"BTC": "1.5", "ETH": 2})),
+        "secret-b": fake_processor(mocker, account=AccountDetails(username="b", balances={"BTC": 0.5})),
+        "secret-c": fake_processor(mocker, ping=HTTPStatus.UNAUTHORIZED),
+        "secret-d": fake_processor(
+            mocker, account=ResponseDetails(request_url="/account", status_code=418, details="no")
+        ),
+    }
+    factory = mocker.Mock(side_effect=lambda exchange, secret_key, api_key=None: processors[secret_key])
+    keys = [AccountKey(name=secret_key[-1], secret_key=secret_key, api_key="api") for secret_key in processors]
+
+    with AccountAggregator(factory, "binance", keys) as aggregator:
+        consolidated = aggregator.get_accounts()
+    assert factory.call_args_list[0] == mocker.call("binance", "secret-a", api_key="api")
+    assert consolidated.balances == {"BTC": 2.0, "ETH": 2.0}
+    assert [result.name for result in consolidated.results] == ["a", "b", "c", "d"]
+    assert consolidated.failed == 2
+    assert consolidated.results[2].error.startswith("PermissionError")
+    assert consolidated.results[3].error == "418: no"
+    assert all(processor.async_client.aclose.await_count == 1 for processor in processors.values())
+
+
+def test_operations_run_concurrently_up_to_the_limit(mocker):
+    in_flight = []
+    peak = 0
+
+    async def operation(processor):
+        nonlocal peak
+        in_flight.append(processor)
+        peak = max(peak, len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(processor)
+        return processor.name
+
+    keys = [AccountKey(name=f"key{number}", secret_key=f"secret{number}") for number in range(10)]
+
+    def factory(exchange, secret_key, api_key=None):
+        processor = fake_processor(mocker)
+        processor.name = secret_key
+        return processor
+
+    results = AccountAggregator(factory, "binance", keys, concurrency=3).map(operation)
+    assert peak == 3
+    assert [result.result for result in results.results] == [f"secret{number}" for number in range(10)]
+    assert results.serial > results.wall
+
+
+def test_every_key_gets_a_budget_of_its_own():
+    def factory(exchange, secret_key, api_key=None):
+        return BinanceExchangeProcessor(BinanceClient(secret_key, api_key=api_key), account_ttl=None)
+
+    keys = [AccountKey(name="a", secret_key="secret-a"), AccountKey(name="b", secret_key="secret-b")]
+    aggregator = AccountAggregator(factory, "binance", keys, key_weight_budget=100)
+    limiters = [processor.client.rate_limiter for processor in aggregator.processors.values()]
+    assert all(isinstance(limiter, CombinedRateLimiter) for limiter in limiters)
+    assert [limiter.limiters[0].name for limiter in limiters] == ["binance:a", "binance:b"]
+    # The budget of the exchange stays shared between the keys
+    assert limiters[0].limiters[1] is limiters[1].limiters[1]
+    for processor in aggregator.processors.values():
+        assert processor.async_client.rate_limiter is processor.client.rate_limiter
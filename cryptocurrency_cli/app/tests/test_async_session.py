@@ -0,0 +1,77 @@
+import asyncio
+import gc
+
+import httpx
+import pytest
+
+from src.clients.async_http_client import AsyncHTTPClient
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.clients.http_client import RequestType
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+
+
+@pytest.fixture
+def requests(mocker):
+    """Paths requested through the async sessions, answered with an empty list"""
+    requested = []
+
+    def handler(request):
+        requested.append(request.url.path)
+        return httpx.Response(200, json=[])
+
+    mocker.patch.object(
+        AsyncHTTPClient, "create_session", lambda self: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    return requested
+
+
+def test_session_is_closed_with_its_event_loop(requests):
+    client = AsyncHTTPClient({}, [200], "http://exchange", rate_limiter=None)
+
+    async def ping():
+        await client.request(RequestType.GET, "/ping")
+        return client.session
+
+    first = asyncio.run(ping())
+    second = asyncio.run(ping())
+    assert second is not first
+    assert first.is_closed and second.is_closed
+    assert requests == ["/ping", "/ping"]
+
+
+def test_session_is_reused_within_a_loop(requests):
+    client = AsyncHTTPClient({}, [200], "http://exchange", rate_limiter=None)
+
+    async def sessions():
+        await client.request(RequestType.GET, "/ping")
+        session = client.session
+        await client.request(RequestType.GET, "/time")
+        return session, client.session
+
+    first, second = client.run(sessions())
+    assert first is second and first.is_closed
+
+
+def test_many_candles_accepts_generated_intervals(requests):
+    processor = BinanceExchangeProcessor(BinanceClient("key", rate_limiter=None), account_ttl=None)
+    candles = processor.show_many_candles(["BTCUSDT", "ETHUSDT"], (interval for interval in ("1h", "1d")))
+    assert sorted(candles) == [("BTCUSDT", "1d"), ("BTCUSDT", "1h"), ("ETHUSDT", "1d"), ("ETHUSDT", "1h")]
+    assert len(requests) == 4
+
+
+def test_closed_client_leaves_nothing_to_finalize(requests, caplog):
+    client = AsyncHTTPClient({}, [200], "http://exchange", rate_limiter=None)
+
+    async def ping_and_close():
+        await client.request(RequestType.GET, "/ping")
+        session = client.session
+        await client.aclose()
+        return session
+
+    # A loop closed without shutting down its async generators, as when it is driven by `run_until_complete`
+    loop = asyncio.new_event_loop()
+    session = loop.run_until_complete(ping_and_close())
+    loop.close()
+    gc.collect()
+    assert session.is_closed
+    assert "Task was destroyed" not in caplog.text
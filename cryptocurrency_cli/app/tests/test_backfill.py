@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from src.backfill.backfill import BackfillEngine
+from src.clients.async_http_client import AsyncHTTPClient
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.clients.bitfinex_main_client.bitfinex_client import BitfinexClient
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+from src.exchange_processors.bitfinex.bitfinex_exchange_processor import BitfinexExchangeProcessor
+from src.exchange_processors.candle_series import CandleSeries
+from src.storage.candle_store import CandleStore
+
+HOUR = 60 * 60 * 1000
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+def engine(tmp_path):
+    processor = BinanceExchangeProcessor(BinanceClient("key", rate_limiter=None), account_ttl=None)
+    processor.ranges = []
+
+    async def fetch_candle_range_async(symbol, interval, start_time, end_time):
+        processor.ranges.append((start_time, end_time))
+        open_times = list(range(start_time, end_time + 1, HOUR))
+        values = [float(t // HOUR) for t in open_times]
+        return CandleSeries(symbol, open_times, values, values, values, values, values, price_decimals=2)
+
+    processor.fetch_candle_range_async = fetch_candle_range_async
+    return BackfillEngine(processor, CandleStore(str(tmp_path)), concurrency=1)
+
+
+def test_interrupted_backfill_resumes_from_its_checkpoint(engine):
+    page = engine.processor.candle_page_limit * HOUR
+    end_time = int(time.time() * 1000) // HOUR * HOUR - 10 * HOUR
+    start_time = end_time - 2 * page - 5 * HOUR
+
+    def interrupt(checkpoint):
+        raise Interrupted
+
+    with pytest.raises(Interrupted):
+        asyncio.run(engine.backfill_async("BTCUSDT", "1h", start_time, end_time, on_progress=interrupt))
+    checkpoint = engine.load_checkpoint("BTCUSDT", "1h")
+    assert (checkpoint.next_time, checkpoint.rows) == (start_time + page, page // HOUR)
+
+    engine.processor.ranges.clear()
+    checkpoint = asyncio.run(engine.backfill_async("BTCUSDT", "1h", start_time, end_time))
+    assert engine.processor.ranges == [
+        (start_time + page, start_time + 2 * page - 1),
+        (start_time + 2 * page, end_time - 1),
+    ]
+    assert checkpoint.done and checkpoint.rows == (end_time - start_time) // HOUR
+    stored = engine.store.read("binance", "BTCUSDT", "1h")["open_time"].tolist()
+    assert stored == list(range(start_time, end_time, HOUR))
+    assert engine.store.price_decimals("binance", "BTCUSDT", "1h") == 2
+
+    # A finished job fetches nothing again
+    engine.processor.ranges.clear()
+    asyncio.run(engine.backfill_async("BTCUSDT", "1h", start_time, end_time))
+    assert engine.processor.ranges == []
+
+
+def test_history_before_the_store_is_refused(engine):
+    end_time = int(time.time() * 1000) // HOUR * HOUR
+    asyncio.run(engine.backfill_async("BTCUSDT", "1h", end_time - 10 * HOUR, end_time))
+    with pytest.raises(ValueError):
+        engine.plan("BTCUSDT", "1h", end_time - 20 * HOUR, end_time)
+
+
+def test_bitfinex_history_asks_for_the_uppercase_pair(mocker):
+    paths = []
+
+    def handler(request):
+        paths.append(request.url.path)
+        return httpx.Response(200, json=[[HOUR, 1.0, 2.0, 3.0, 0.5, 10.0]])
+
+    mocker.patch.object(
+        AsyncHTTPClient, "create_session", lambda self: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    processor = BitfinexExchangeProcessor(BitfinexClient("key", rate_limiter=None))
+    series = processor.async_client.run(processor.fetch_candle_range_async("btcusd", "1h", HOUR, 2 * HOUR))
+    assert paths == ["/v2/candles/trade:1h:tBTCUSD/hist"]
+    assert series.open_time.tolist() == [HOUR]
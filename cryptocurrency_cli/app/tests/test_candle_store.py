@@ -0,0 +1,127 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+from src.storage.candle_store import CANDLE_COLUMNS, CandleStore
+
+HOUR = 60 * 60 * 1000
+
+
+def columns(open_times):
+    return {
+        column: np.asarray(open_times if column == "open_time" else [float(t // HOUR) for t in open_times], dtype=dtype)
+        for column, dtype in CANDLE_COLUMNS.items()
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CandleStore(str(tmp_path))
+
+
+def test_append_skips_candles_already_stored(store):
+    assert store.append("binance", "btcusdt", "1h", columns([0, HOUR, 2 * HOUR])) == 3
+    assert store.append("binance", "BTCUSDT", "1h", columns([HOUR, 2 * HOUR, 3 * HOUR])) == 1
+    assert store.read("binance", "BTCUSDT", "1h")["open_time"].tolist() == [0, HOUR, 2 * HOUR, 3 * HOUR]
+    assert store.read("binance", "BTCUSDT", "1h", limit=2)["open_time"].tolist() == [2 * HOUR, 3 * HOUR]
+
+
+def test_torn_tail_is_ignored_and_overwritten(store):
+    store.append("binance", "BTCUSDT", "1h", columns([0, HOUR]))
+    # An append interrupted after writing the first column only
+    with open(store.column_path("binance", "BTCUSDT", "1h", "open_time"), "ab") as file:
+        file.write(np.asarray([2 * HOUR], dtype=CANDLE_COLUMNS["open_time"]).tobytes())
+
+    assert store.length("binance", "BTCUSDT", "1h") == 2
+    assert store.append("binance", "BTCUSDT", "1h", columns([2 * HOUR, 3 * HOUR])) == 2
+    stored = store.read("binance", "BTCUSDT", "1h")
+    assert stored["open_time"].tolist() == [0, HOUR, 2 * HOUR, 3 * HOUR]
+    assert stored["close"].tolist() == [0.0, 1.0, 2.0, 3.0]
+    for column, dtype in CANDLE_COLUMNS.items():
+        assert os.path.getsize(store.column_path("binance", "BTCUSDT", "1h", column)) == 4 * np.dtype(dtype).itemsize
+
+
+def test_prepend_keeps_older_candles_and_other_files(store):
+    store.append("binance", "BTCUSDT", "1h", columns([2 * HOUR, 3 * HOUR]), price_decimals=2)
+    with open(os.path.join(store.path("binance", "BTCUSDT", "1h"), "checkpoint.json"), "w") as file:
+        file.write("{}")
+    store.read("binance", "BTCUSDT", "1h")
+
+    assert store.prepend("binance", "BTCUSDT", "1h", columns([0, HOUR, 2 * HOUR])) == 2
+    assert store.read("binance", "BTCUSDT", "1h")["open_time"].tolist() == [0, HOUR, 2 * HOUR, 3 * HOUR]
+    assert store.price_decimals("binance", "BTCUSDT", "1h") == 2
+    assert os.path.exists(os.path.join(store.path("binance", "BTCUSDT", "1h"), "checkpoint.json"))
+    assert store.prepend("binance", "BTCUSDT", "1h", columns([HOUR])) == 0
+
+
+class FakeBinance:
+    """Hourly klines of a symbol listed `listed_hours` ago, answering like the klines endpoint"""
+
+    def __init__(self, fake_response, listed_hours: int = 5000):
+        self.fake_response = fake_response
+        self.listed_at = (int(time.time() * 1000) // HOUR - listed_hours) * HOUR
+        self.requests = []
+
+    def __call__(self, type, path, params=None, **kwargs):
+        self.requests.append(params)
+        current = int(time.time() * 1000) // HOUR * HOUR
+        limit = params.get("limit", 500)
+        end = min(current, params.get("endTime", current) // HOUR * HOUR)
+        if "startTime" in params:
+            first = max(self.listed_at, -(-params["startTime"] // HOUR) * HOUR)
+        else:
+            first = max(self.listed_at, end - (limit - 1) * HOUR)
+        open_times = list(range(first, end + 1, HOUR))[:limit]
+        return self.fake_response([
+            [t, "1.00", "2.00", "0.50", f"{t // HOUR % 1000}.50", "3.00", t + HOUR - 1] for t in open_times
+        ])
+
+
+@pytest.fixture
+def processors(tmp_path, mocker, fake_response):
+    exchange = FakeBinance(fake_response)
+    mocker.patch.object(BinanceClient, "request", side_effect=exchange)
+    client = BinanceClient("key", rate_limiter=None)
+    direct = BinanceExchangeProcessor(client, account_ttl=None)
+    stored = BinanceExchangeProcessor(client, candle_store=CandleStore(str(tmp_path)), account_ttl=None)
+    return exchange, direct, stored
+
+
+def test_stored_candles_match_direct_request(processors):
+    exchange, direct, stored = processors
+    assert stored.show_candles("BTCUSDT", "1h", 10) == direct.show_candles("BTCUSDT", "1h", 10)
+    # A larger limit fetches the older candles the store is missing
+    candles = stored.show_candles("BTCUSDT", "1h", 500)
+    assert len(candles) == 500
+    assert candles == direct.show_candles("BTCUSDT", "1h", 500)
+    assert candles[-1].open_time == int(time.time() * 1000) // HOUR * HOUR
+    assert candles[0].price.endswith(".50")
+    assert stored.show_candles("BTCUSDT", "1h", 500, as_series=True).to_candles() == candles
+
+
+def test_stored_candles_span_several_head_pages(processors):
+    exchange, direct, stored = processors
+    stored.show_candles("BTCUSDT", "1h", 5)
+    candles = stored.show_candles("BTCUSDT", "1h", 2500)
+    assert len(candles) == 2500
+    assert [candle.open_time for candle in candles] == list(
+        range(candles[-1].open_time - 2499 * HOUR, candles[-1].open_time + 1, HOUR)
+    )
+    # Served from the store afterwards, only the open candle is requested again
+    exchange.requests.clear()
+    assert stored.show_candles("BTCUSDT", "1h", 2500) == candles
+    assert len(exchange.requests) == 1
+
+
+def test_history_shorter_than_the_limit(tmp_path, mocker, fake_response):
+    exchange = FakeBinance(fake_response, listed_hours=30)
+    mocker.patch.object(BinanceClient, "request", side_effect=exchange)
+    processor = BinanceExchangeProcessor(
+        BinanceClient("key", rate_limiter=None), candle_store=CandleStore(str(tmp_path)), account_ttl=None
+    )
+    processor.show_candles("BTCUSDT", "1h", 5)
+    assert len(processor.show_candles("BTCUSDT", "1h", 100)) == 31
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.clients.coalescing import AsyncSingleFlight, CoalescingStats, SingleFlight, request_key
+
+
+def test_request_key_only_for_reads():
+    assert request_key("GET", "/ticker", {"b": 1, "a": 2}) == request_key("GET", "/ticker", {"a": 2, "b": 1})
+    assert request_key("POST", "/order", {"a": 1}) is None
+    assert request_key("GET", "/ticker", {"symbols": ["A", "B"]}) is None
+
+
+def share_call(single_flight, call, callers=4):
+    """Run `callers` threads asking for one key, the call is held until all of them wait for it"""
+    release = threading.Event()
+    calls = []
+
+    def held():
+        calls.append(1)
+        release.wait(5)
+        return call()
+
+    with ThreadPoolExecutor(callers) as executor:
+        futures = [executor.submit(single_flight.run, "key", held, 5) for _ in range(callers)]
+        while single_flight.stats.coalesced < callers - 1:
+            time.sleep(0.001)
+        release.set()
+        outcomes = []
+        for future in futures:
+            try:
+                outcomes.append(future.result())
+            except Exception as error:
+                outcomes.append(error)
+    return calls, outcomes
+
+
+def test_callers_in_flight_share_one_result():
+    single_flight = SingleFlight(CoalescingStats())
+    calls, outcomes = share_call(single_flight, lambda: object())
+    assert len(calls) == 1
+    assert all(outcome is outcomes[0] for outcome in outcomes)
+    assert (single_flight.stats.sent, single_flight.stats.saved_weight) == (1, 15)
+    # Nothing is cached, the next caller starts a call of its own
+    assert single_flight.run("key", lambda: "again") == "again"
+    assert single_flight.in_flight == {}
+
+
+def test_callers_in_flight_share_one_exception():
+    single_flight = SingleFlight(CoalescingStats())
+
+    def fail():
+        raise RuntimeError("down")
+
+    calls, outcomes = share_call(single_flight, fail)
+    assert len(calls) == 1
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert single_flight.run("key", lambda: "recovered") == "recovered"
+
+
+def test_async_callers_share_one_call_and_survive_a_cancelled_one():
+    single_flight = AsyncSingleFlight(CoalescingStats())
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        cancelled = asyncio.ensure_future(single_flight.run("key", call))
+        waiting = [asyncio.ensure_future(single_flight.run("key", call)) for _ in range(3)]
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        results = await asyncio.gather(*waiting)
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return results
+
+    assert asyncio.run(main()) == ["result"] * 3
+    assert len(calls) == 1
+    assert single_flight.in_flight == {}
@@ -0,0 +1,91 @@
+import asyncio
+import io
+import json
+import socket
+import threading
+import time
+from http import HTTPStatus
+
+import pytest
+
+from daemon import CryptoDaemon
+from daemon_client import (
+    FRAME_HEADER,
+    MAX_FRAME_SIZE,
+    DaemonClient,
+    FrameError,
+    decode_frame_size,
+    encode_frame,
+    forward_batch,
+)
+
+
+@pytest.fixture
+def daemon_path(tmp_path, mocker):
+    """Socket of a daemon served from a background thread, its processors answer every ping"""
+    processor = mocker.Mock()
+    processor.ping_client.return_value = HTTPStatus.OK
+    processor.async_client.aclose = mocker.AsyncMock()
+    processor.show_candles_async = mocker.AsyncMock(return_value=[])
+    daemon = CryptoDaemon(lambda exchange, secret_key, api_key=None: processor, str(tmp_path / "daemon.sock"), 1)
+    loop = asyncio.new_event_loop()
+    server = loop.create_task(daemon.serve())
+    thread = threading.Thread(target=loop.run_until_complete, args=(asyncio.wait([server]),))
+    thread.start()
+    # The socket file appears when it is bound, before the daemon listens on it
+    while True:
+        try:
+            DaemonClient(daemon.path).close()
+            break
+        except (FileNotFoundError, ConnectionRefusedError):
+            time.sleep(0.001)
+    yield daemon.path
+    loop.call_soon_threadsafe(server.cancel)
+    thread.join(5)
+    loop.close()
+
+
+def send_body(client, body):
+    client.socket.sendall(FRAME_HEADER.pack(len(body)) + body)
+
+
+def test_malformed_frames_are_answered_and_the_connection_kept(daemon_path):
+    with DaemonClient(daemon_path, timeout=5) as client:
+        send_body(client, b"{not json")
+        record = client.receive()
+        assert (record["id"], record["ok"]) == (None, False)
+        assert record["error"].startswith(("JSONDecodeError", "ValueError"))
+
+        send_body(client, b"[1, 2]")
+        assert client.receive() == {"id": None, "ok": False, "error": "ValueError: Expected a JSON object, got list"}
+
+        # The only slot of the connection is still free for the next request
+        record = client.call("binance", "secret", "unknown")
+        assert (record["id"], record["ok"]) == (1, False)
+        assert record["error"].startswith("ValueError: Unknown action unknown")
+
+
+def test_frames_round_trip_within_the_size_limit():
+    frame = encode_frame({"line": "get_candle BTCUSDT", "number": 1})
+    assert decode_frame_size(frame[:FRAME_HEADER.size]) == len(frame) - FRAME_HEADER.size
+    assert json.loads(frame[FRAME_HEADER.size:]) == {"line": "get_candle BTCUSDT", "number": 1}
+    with pytest.raises(FrameError):
+        decode_frame_size(FRAME_HEADER.pack(MAX_FRAME_SIZE + 1))
+
+
+@pytest.mark.parametrize("data", [FRAME_HEADER.pack(MAX_FRAME_SIZE + 1), b"\x00\x00", FRAME_HEADER.pack(10) + b"{}"])
+def test_connection_out_of_sync_is_closed(daemon_path, data):
+    with DaemonClient(daemon_path, timeout=5) as client:
+        client.socket.sendall(data)
+        client.socket.shutdown(socket.SHUT_WR)
+        assert client.receive() is None
+
+
+def test_forwarded_batch_streams_every_record(daemon_path):
+    actions = io.StringIO("get_candle BTCUSDT 1h 5\n\n# comment\nunknown\nget_candle ETHUSDT\n")
+    output = io.StringIO()
+    with DaemonClient(daemon_path, timeout=5) as client:
+        assert forward_batch(client, "binance", "secret", actions, output) == 1
+    records = sorted(map(json.loads, output.getvalue().splitlines()), key=lambda record: record["id"])
+    assert [(record["id"], record["ok"]) for record in records] == [(1, True), (4, False), (5, True)]
+    assert records[0]["action"] == "get_candle"
@@ -0,0 +1,121 @@
+import builtins
+import bz2
+import csv
+import gzip
+import json
+import lzma
+import sys
+
+import pytest
+
+from src.exchange_processors.candle_series import CandleSeries
+from src.exchange_processors.models import AccountDetails, CandleDetails
+from src.export import exporters
+
+HOUR = 60 * 60 * 1000
+
+
+def series(start, count):
+    open_times = [HOUR * number for number in range(start, start + count)]
+    values = [number + 0.5 for number in range(start, start + count)]
+    return CandleSeries("BTCUSDT", open_times, values, values, values, values, values)
+
+
+def test_peak_rss_in_bytes(mocker):
+    resource = pytest.importorskip("resource")
+    usage = mocker.patch.object(resource, "getrusage")
+    usage.return_value.ru_maxrss = 2048
+    mocker.patch.object(sys, "platform", "linux")
+    assert exporters.peak_rss() == 2048 * 1024
+    mocker.patch.object(sys, "platform", "darwin")
+    assert exporters.peak_rss() == 2048
+
+
+def test_peak_rss_without_resource_module(mocker):
+    real_import = builtins.__import__
+
+    def no_resource(name, *args, **kwargs):
+        if name == "resource":
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    mocker.patch.object(builtins, "__import__", no_resource)
+    assert exporters.peak_rss() is None
+
+
+def test_export_stats_report_peak_rss(tmp_path):
+    stats = exporters.create_exporter(str(tmp_path / "account.csv")).write_all([])
+    assert stats.rows == 0
+    assert stats.peak_rss > 0
+
+
+@pytest.mark.parametrize("suffix, opener", [("", open), (".gz", gzip.open), (".bz2", bz2.open), (".xz", lzma.open)])
+def test_csv_pages_share_one_header(tmp_path, suffix, opener):
+    path = str(tmp_path / f"candles.csv{suffix}")
+    stats = exporters.create_exporter(path).write_all([series(0, 2), series(2, 1)])
+    assert stats.rows == 3
+    with opener(path, "rt", newline="") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ["symbol", "open_time", "open", "high", "low", "close", "volume"]
+    assert [row[1] for row in rows[1:]] == [str(HOUR * number) for number in range(3)]
+    assert rows[3] == ["BTCUSDT", str(2 * HOUR), "2.5", "2.5", "2.5", "2.5", "2.5"]
+
+
+def test_json_array_of_every_row(tmp_path):
+    candles = [CandleDetails(symbol="BTCUSDT", price="1.5", open_time=HOUR, close=1.5)]
+    account = AccountDetails(username="user", balances={"BTC": 0.5, "ETH": 2.0})
+    path = tmp_path / "export.json"
+    exporters.create_exporter(str(path)).write_all([candles, candles])
+    assert json.loads(path.read_text()) == [candles[0].dict()] * 2
+
+    exporters.create_exporter(str(path)).write_all([account])
+    assert json.loads(path.read_text()) == [
+        {"username": "user", "asset": "BTC", "balance": 0.5},
+        {"username": "user", "asset": "ETH", "balance": 2.0},
+    ]
+    exporters.create_exporter(str(path)).write_all([])
+    assert json.loads(path.read_text()) == []
+
+
+def test_parquet_row_groups_and_types(tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "candles.parquet")
+    exporter = exporters.ParquetExporter(path, row_group_size=4)
+    stats = exporter.write_all([series(0, 3), series(3, 3), series(6, 0), series(6, 3)])
+    assert stats.rows == 9
+    file = parquet.ParquetFile(path)
+    assert file.metadata.num_rows == 9
+    assert file.metadata.num_row_groups == 3
+    assert file.metadata.row_group(0).column(0).compression == "SNAPPY"
+    table = file.read()
+    assert table.column("open_time").to_pylist() == [HOUR * number for number in range(9)]
+    assert str(table.schema.field("volume").type) == "double"
+
+    # Later balances take the type of the first ones
+    path = str(tmp_path / "account.parquet")
+    exporters.create_exporter(path).write_all([
+        AccountDetails(username="a", balances={"BTC": 0.5}),
+        AccountDetails(username="b", balances={"BTC": 1}),
+    ])
+    assert parquet.read_table(path).column("balance").to_pylist() == [0.5, 1.0]
+
+
+def test_parquet_without_pyarrow(mocker, tmp_path):
+    real_import = builtins.__import__
+
+    def no_pyarrow(name, *args, **kwargs):
+        if name.startswith("pyarrow"):
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    mocker.patch.object(builtins, "__import__", no_pyarrow)
+    with pytest.raises(ImportError, match="pip install pyarrow"):
+        exporters.create_exporter(str(tmp_path / "candles.parquet"))
+
+
+def test_unknown_format_or_compression(tmp_path):
+    with pytest.raises(ValueError, match="Unknown export format 'txt'"):
+        exporters.create_exporter(str(tmp_path / "candles.txt"))
+    with pytest.raises(ValueError, match="Unknown compression zip"):
+        exporters.create_exporter(str(tmp_path / "candles.csv"), compression="zip")
+    assert isinstance(exporters.create_exporter(str(tmp_path / "candles"), format="json"), exporters.JsonExporter)
@@ -0,0 +1,81 @@
+import gc
+
+import pytest
+from pydantic import ValidationError
+
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.exchange_processors import fast_decode
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+from src.exchange_processors.fast_decode import construct_models, decode_json, gc_paused
+from src.exchange_processors.models import CandleDetails
+
+KLINES = [
+    [3600000 * number, "30000.10", "30100.00", "29900.50", f"{30050 + number}.25", "12.5", 0, "0", 10, "0", "0", "0"]
+    for number in range(250)
+]
+
+
+@pytest.fixture
+def gc_enabled():
+    was_enabled = gc.isenabled()
+    gc.enable()
+    yield
+    if not was_enabled:
+        gc.disable()
+
+
+@pytest.mark.parametrize("orjson", [fast_decode.orjson, None])
+def test_decode_json_with_and_without_orjson(monkeypatch, orjson):
+    monkeypatch.setattr(fast_decode, "orjson", orjson)
+    body = '{"a": [1, 2.5, "é", null]}'
+    assert decode_json(body) == decode_json(body.encode()) == {"a": [1, 2.5, "é", None]}
+    with pytest.raises(ValueError):
+        decode_json(b"[1,")
+
+
+def test_nested_and_failed_pauses_enable_the_collector_again(gc_enabled):
+    with gc_paused():
+        with gc_paused():
+            assert not gc.isenabled()
+        assert not gc.isenabled()
+    assert gc.isenabled()
+
+    with pytest.raises(RuntimeError):
+        with gc_paused():
+            raise RuntimeError
+    assert gc.isenabled()
+
+    # A collector disabled by the caller stays disabled
+    gc.disable()
+    with gc_paused():
+        pass
+    assert not gc.isenabled()
+
+
+def test_construct_models_validates_a_sample():
+    row = {"symbol": "BTCUSDT", "price": "1", "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.0, "volume": 3.0}
+    rows = [{**row, "open_time": open_time} for open_time in range(100)]
+    assert construct_models(CandleDetails, rows, 0.1) == [CandleDetails(**row) for row in rows]
+
+    rows[50]["open"] = "not a number"
+    with pytest.raises(ValidationError):
+        construct_models(CandleDetails, rows, 0.1)
+    # Every 7th row is validated, which skips row 50, and 0 validates none
+    assert len(construct_models(CandleDetails, rows, 1 / 7)) == 100
+    assert len(construct_models(CandleDetails, rows, 0)) == 100
+
+
+@pytest.mark.parametrize("as_series", [False, True])
+def test_fast_decode_parses_the_same_candles(fake_response, fake_session, as_series):
+    def show_candles(fast):
+        processor = BinanceExchangeProcessor(
+            BinanceClient("key", rate_limiter=None), account_ttl=None, fast_decode=fast, validation_rate=0.05
+        )
+        processor.client._session = fake_session(fake_response(KLINES))
+        return processor.show_candles("BTCUSDT", "1h", 250, as_series=as_series)
+
+    slow, fast = show_candles(False), show_candles(True)
+    if as_series:
+        slow, fast = slow.to_candles(), fast.to_candles()
+    assert fast == slow
+    assert len(fast) == 250
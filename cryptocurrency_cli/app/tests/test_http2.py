@@ -0,0 +1,129 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPException
+
+import httpx
+import pytest
+import requests
+from h2.config import H2Configuration
+from h2.connection import H2Connection
+from h2.events import RequestReceived, StreamEnded
+
+from src.clients.async_http_client import AsyncHTTPClient
+from src.clients.http_client import HTTPClient, RequestType
+from src.clients.retry import RetryPolicy
+
+
+class H2Protocol(asyncio.Protocol):
+    """Cleartext HTTP/2 connection answering every path with its target as JSON, `/missing` with a 404"""
+
+    def __init__(self, server):
+        self.server = server
+        self.connection = H2Connection(H2Configuration(client_side=False, header_encoding="utf-8"))
+        self.targets = {}
+
+    def connection_made(self, transport):
+        self.server.connections += 1
+        self.transport = transport
+        self.connection.initiate_connection()
+        self.transport.write(self.connection.data_to_send())
+
+    def data_received(self, data):
+        for event in self.connection.receive_data(data):
+            if isinstance(event, RequestReceived):
+                self.targets[event.stream_id] = dict(event.headers)[":path"]
+            elif isinstance(event, StreamEnded):
+                target = self.targets.pop(event.stream_id)
+                body = json.dumps({"target": target}).encode()
+                status = "404" if target.startswith("/missing") else "200"
+                self.connection.send_headers(
+                    event.stream_id, [(":status", status), ("content-length", str(len(body)))]
+                )
+                self.connection.send_data(event.stream_id, body, end_stream=True)
+        self.transport.write(self.connection.data_to_send())
+
+
+class H2Server:
+    def __init__(self):
+        self.connections = 0
+        self.loop = asyncio.new_event_loop()
+        server = self.loop.run_until_complete(self.loop.create_server(lambda: H2Protocol(self), "127.0.0.1", 0))
+        self.base_path = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def shutdown(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+        self.loop.close()
+
+
+@pytest.fixture
+def server():
+    server = H2Server()
+    yield server
+    server.shutdown()
+
+
+def test_sync_requests_share_one_connection(server):
+    client = HTTPClient(headers={}, supported_codes=[200], base_path=server.base_path, http2=True)
+
+    def get(number):
+        return client.request(RequestType.GET, "/ticker", params={"symbol": f"S{number}"})
+
+    # Requests racing for the first connection may each open one, later ones find it established
+    responses = [get(0)]
+    with ThreadPoolExecutor(8) as executor:
+        responses += executor.map(get, range(1, 32))
+    assert [response.json() for response in responses] == [{"target": f"/ticker?symbol=S{n}"} for n in range(32)]
+    assert {response.http_version for response in responses} == {"HTTP/2"}
+    assert server.connections == 1
+    assert client.transfer_stats.body_bytes == sum(len(response.content) for response in responses)
+
+    with pytest.raises(HTTPException) as error:
+        client.request(RequestType.GET, "/missing")
+    assert error.value.response.status_code == 404
+    client.close()
+
+
+def test_async_requests_share_one_connection(server):
+    client = AsyncHTTPClient(headers={}, supported_codes=[200], base_path=server.base_path, http2=True)
+
+    async def get_all():
+        return await asyncio.gather(
+            *(client.request(RequestType.GET, "/ticker", params={"symbol": f"S{n}"}) for n in range(32))
+        )
+
+    async def get_after_connecting():
+        await client.request(RequestType.GET, "/ping")
+        return await get_all()
+
+    responses = client.run(get_after_connecting())
+    assert {response.http_version for response in responses} == {"HTTP/2"}
+    assert responses[5].json() == {"target": "/ticker?symbol=S5"}
+    assert server.connections == 1
+
+
+def test_http2_transport_errors_are_retried():
+    client = HTTPClient(
+        headers={},
+        supported_codes=[200],
+        base_path="http://127.0.0.1:9",
+        http2=True,
+        retry_policy=RetryPolicy(max_attempts=2, backoff_base=0),
+    )
+    with pytest.raises(httpx.ConnectError):
+        client.request(RequestType.GET, "/ping")
+    assert client.retry_stats.retries == 1
+
+
+def test_http2_is_negotiated_on_https_and_assumed_on_http():
+    for base_path, http1 in (("https://exchange", True), ("http://exchange", False)):
+        client = HTTPClient({}, [200], base_path, http2=True)
+        async_client = AsyncHTTPClient({}, [200], base_path, http2=True)
+        for session in (client.create_session(), async_client.create_session()):
+            pool = session._transport._pool
+            assert (pool._http1, pool._http2) == (http1, True)
+    assert isinstance(HTTPClient({}, [200], "http://exchange").create_session(), requests.Session)
@@ -0,0 +1,60 @@
+from http.client import HTTPException
+
+import pytest
+import requests
+
+from src.clients.http_client import HTTPClient, RequestType
+
+
+@pytest.fixture
+def client():
+    return HTTPClient(headers={"X-MBX-APIKEY": "key"}, supported_codes=[200], base_path="http://exchange/api")
+
+
+@pytest.mark.parametrize("type", list(RequestType))
+def test_request_type_is_sent_as_its_method(client, type, fake_response, fake_session):
+    client._session = session = fake_session(fake_response({}))
+    client.request(type, "/order", params={"symbol": "BTCUSDT"})
+    method, url, kwargs = session.requests[0]
+    assert method == type.value == type.name
+    assert url == "http://exchange/api/order"
+    assert kwargs["params"] == {"symbol": "BTCUSDT"}
+    assert kwargs["headers"] == {"X-MBX-APIKEY": "key"}
+
+
+def test_request_type_must_be_a_request_type(client):
+    with pytest.raises(HTTPException):
+        client.request("GET", "/ping")
+
+
+def test_one_session_serves_every_request(client, mocker, fake_response):
+    request = mocker.patch.object(requests.Session, "request", autospec=True, return_value=fake_response({}))
+    create_session = mocker.spy(client, "create_session")
+
+    for path in ("/ping", "/time", "/ping"):
+        client.request(RequestType.GET, path)
+    assert create_session.call_count == 1
+    assert request.call_count == 3
+    assert {id(call.args[0]) for call in request.call_args_list} == {id(client.session)}
+
+    session = client.session
+    client.close()
+    client.request(RequestType.GET, "/ping")
+    assert client.session is not session
+    assert create_session.call_count == 2
+
+
+def test_session_keeps_connections_alive(client):
+    session = client.session
+    adapter = session.get_adapter("https://exchange")
+    assert adapter is session.get_adapter("http://exchange")
+    assert adapter._pool_maxsize == client.pool_maxsize
+    assert session.headers["Connection"] == "keep-alive"
+    assert HTTPClient({}, [200], "http://exchange", keep_alive=False).session.headers["Connection"] == "close"
+
+
+def test_unsupported_status_raises_with_the_response(client, fake_response, fake_session):
+    client._session = fake_session(fake_response({"msg": "not found"}, 404))
+    with pytest.raises(HTTPException) as error:
+        client.request(RequestType.GET, "/missing")
+    assert error.value.response.status_code == 404
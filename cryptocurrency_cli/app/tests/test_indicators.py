@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from src.indicators.indicators import (
+    IncrementalBollingerBands,
+    IncrementalEMA,
+    IncrementalRSI,
+    IncrementalSMA,
+    IncrementalVWAP,
+    bollinger_bands,
+    ema,
+    rsi,
+    sma,
+    vwap,
+)
+
+WINDOW = 14
+
+
+@pytest.fixture
+def candles():
+    """High, low, close and volume of a random walk around 30000, some candles without trades"""
+    random = np.random.default_rng(7)
+    close = 30000 + np.cumsum(random.normal(0, 50, 500))
+    spread = random.uniform(0, 40, 500)
+    volume = random.uniform(0, 5, 500)
+    volume[::50] = 0.0
+    return close + spread, close - spread, close, volume
+
+
+def chunked(indicator, *columns, sizes=(1, 5, WINDOW, 200)):
+    """Results of `indicator.extend` fed with the columns cut into chunks of varied sizes"""
+    results, start, turn = [], 0, 0
+    while start < len(columns[0]):
+        end = start + sizes[turn % len(sizes)]
+        results.append(indicator.extend(*(column[start:end] for column in columns)))
+        start, turn = end, turn + 1
+    return results
+
+
+def test_incremental_indicators_match_the_vectorised_ones(candles):
+    high, low, close, volume = candles
+
+    expected = sma(close, WINDOW)
+    single = IncrementalSMA(WINDOW)
+    np.testing.assert_allclose([single.update(value) for value in close], expected, rtol=1e-12)
+    np.testing.assert_allclose(np.concatenate(chunked(IncrementalSMA(WINDOW), close)), expected, rtol=1e-12)
+
+    expected = ema(close, WINDOW)
+    single = IncrementalEMA(WINDOW)
+    np.testing.assert_allclose([single.update(value) for value in close], expected, rtol=1e-12)
+    np.testing.assert_allclose(np.concatenate(chunked(IncrementalEMA(WINDOW), close)), expected, rtol=1e-12)
+
+    expected = rsi(close, WINDOW)
+    single = IncrementalRSI(WINDOW)
+    np.testing.assert_allclose([single.update(value) for value in close], expected, rtol=1e-9)
+    np.testing.assert_allclose(np.concatenate(chunked(IncrementalRSI(WINDOW), close)), expected, rtol=1e-9)
+
+    for window in (None, WINDOW):
+        expected = vwap(high, low, close, volume, window)
+        single = IncrementalVWAP(window)
+        updates = [single.update(*candle) for candle in zip(high, low, close, volume)]
+        np.testing.assert_allclose(updates, expected, rtol=1e-9)
+        extended = chunked(IncrementalVWAP(window), high, low, close, volume)
+        np.testing.assert_allclose(np.concatenate(extended), expected, rtol=1e-9)
+
+    expected = np.column_stack(bollinger_bands(close, WINDOW))
+    single = IncrementalBollingerBands(WINDOW)
+    np.testing.assert_allclose([single.update(value) for value in close], expected, rtol=1e-9)
+    extended = [np.column_stack(bands) for bands in chunked(IncrementalBollingerBands(WINDOW), close)]
+    np.testing.assert_allclose(np.concatenate(extended), expected, rtol=1e-9)
+
+
+def test_input_shorter_than_the_window(candles):
+    high, low, close, volume = (column[:WINDOW - 1] for column in candles)
+    assert np.isnan(sma(close, WINDOW)).all()
+    assert np.isnan(rsi(close[:WINDOW], WINDOW)).all()
+    assert np.isnan(vwap(high, low, close, volume, WINDOW)).all()
+    assert all(np.isnan(band).all() for band in bollinger_bands(close, WINDOW))
+    # The average of an EMA starts with the first value
+    assert ema(close, WINDOW)[0] == close[0]
+
+    assert np.isnan(IncrementalSMA(WINDOW).extend(close)).all()
+    assert np.isnan(IncrementalRSI(WINDOW).extend(close)).all()
+    assert np.isnan(IncrementalVWAP(WINDOW).extend(high, low, close, volume)).all()
+    assert all(np.isnan(band).all() for band in IncrementalBollingerBands(WINDOW).extend(close))
+
+
+def test_empty_input():
+    assert len(sma([], WINDOW)) == len(ema([], WINDOW)) == len(rsi([], WINDOW)) == 0
+    assert len(vwap([], [], [], [])) == len(vwap([], [], [], [], WINDOW)) == 0
+    assert all(len(band) == 0 for band in bollinger_bands([], WINDOW))
+
+    for indicator in (IncrementalSMA(WINDOW), IncrementalEMA(WINDOW), IncrementalRSI(WINDOW)):
+        assert len(indicator.extend([])) == 0
+    assert np.isnan(IncrementalSMA(WINDOW).value)
+    assert IncrementalEMA(WINDOW).extend([]).size == 0 and IncrementalEMA(WINDOW).value is None
+    assert np.isnan(IncrementalRSI(WINDOW).value)
+    for window in (None, WINDOW):
+        indicator = IncrementalVWAP(window)
+        assert len(indicator.extend([], [], [], [])) == 0
+        assert np.isnan(indicator.value)
+    bands = IncrementalBollingerBands(WINDOW)
+    assert all(len(band) == 0 for band in bands.extend([]))
+    assert all(np.isnan(band) for band in bands.value)
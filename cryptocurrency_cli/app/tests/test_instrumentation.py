@@ -0,0 +1,132 @@
+import threading
+import urllib.error
+import urllib.request
+from http.client import HTTPException
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src.clients.http_client import HTTPClient, RequestType
+from src.clients.instrumentation import Histogram, RequestInstrumentation
+from src.clients.retry import RetryPolicy
+
+BODY = b"[1, 2, 3]"
+
+
+class ExchangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        status = 503 if self.path.startswith("/busy") else 200
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def base_path():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ExchangeHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def instrumentation():
+    return RequestInstrumentation()
+
+
+def client_of(base_path, instrumentation, **kwargs):
+    return HTTPClient(
+        headers={}, supported_codes=[200], base_path=base_path, instrumentation=instrumentation, **kwargs
+    )
+
+
+def test_phases_of_new_and_reused_connections(base_path, instrumentation):
+    timings = []
+    instrumentation.add_hook(timings.append)
+    client = client_of(base_path, instrumentation)
+
+    first = client.request(RequestType.GET, "/ticker")
+    client.request(RequestType.GET, "/ticker")
+    assert [timing.attempt for timing in timings] == [0, 0]
+    assert first.timing is timings[0]
+    # Only the first request opened a connection, plain http has no handshake
+    assert set(timings[0].phases) == {"queue", "connect", "server", "download"}
+    assert set(timings[1].phases) == {"queue", "server", "download"}
+    for timing in timings:
+        assert (timing.method, timing.path, timing.status, timing.response_size) == ("GET", "/ticker", 200, len(BODY))
+        assert sum(timing.phases.values()) <= timing.total
+    assert instrumentation.statuses == {("", "/ticker", "200"): 2}
+    assert instrumentation.sizes[("", "/ticker")].count == 2
+    assert instrumentation.phases[("", "/ticker", "connect")].count == 1
+
+
+def test_every_attempt_is_recorded(base_path, instrumentation):
+    client = client_of(base_path, instrumentation, retry_policy=RetryPolicy(max_attempts=2, backoff_base=0))
+    with pytest.raises(HTTPException):
+        client.request(RequestType.GET, "/busy")
+    assert instrumentation.statuses == {("", "/busy", "503"): 2}
+
+    client = client_of("http://127.0.0.1:9", instrumentation, retry_policy=RetryPolicy(max_attempts=1))
+    with pytest.raises(requests.ConnectionError):
+        client.request(RequestType.GET, "/ping")
+    assert instrumentation.statuses[("", "/ping", "error")] == 1
+    assert ("", "/ping", "server") not in instrumentation.phases
+
+
+def test_broken_hook_does_not_fail_the_request(base_path, instrumentation):
+    def broken(timing):
+        raise RuntimeError("hook")
+
+    instrumentation.add_hook(broken)
+    assert client_of(base_path, instrumentation).request(RequestType.GET, "/ticker").status_code == 200
+    assert instrumentation.hook_errors == 1
+    instrumentation.remove_hook(broken)
+    client_of(base_path, instrumentation).request(RequestType.GET, "/ticker")
+    assert instrumentation.hook_errors == 1
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    assert histogram.cumulative() == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+    assert (histogram.count, histogram.sum) == (4, 2.65)
+
+
+def test_prometheus_export(tmp_path):
+    instrumentation = RequestInstrumentation(time_buckets=(0.5,), size_buckets=(100,))
+    instrumentation.observe("binance", '/a"b', "decode", 0.25)
+    text = instrumentation.to_prometheus()
+    labels = 'exchange="binance",path="/a\\"b",phase="decode"'
+    assert f'cryptocli_request_phase_seconds_bucket{{{labels},le="0.5"}} 1' in text
+    assert f'cryptocli_request_phase_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+    assert f"cryptocli_request_phase_seconds_sum{{{labels}}} 0.25" in text
+    assert f"cryptocli_request_phase_seconds_count{{{labels}}} 1" in text
+
+    path = tmp_path / "metrics.prom"
+    instrumentation.write_prometheus(str(path))
+    assert path.read_text() == text
+    assert [file.name for file in tmp_path.iterdir()] == ["metrics.prom"]
+
+    server = instrumentation.serve_prometheus(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{url}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert response.read().decode() == text
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{url}/other")
+        assert error.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,66 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+import websockets
+
+from src.exchange_processors.binance.binance_market_stream import BinanceMarketStream
+
+KLINE = {
+    "e": "kline",
+    "s": "BTCUSDT",
+    "k": {"t": 60000, "i": "1m", "o": "1", "h": "2", "l": "0.5", "c": "1.5", "v": "10"},
+}
+
+
+@pytest.fixture
+def ws_url():
+    """Url of a websocket server sending a frame without its kline, then a valid one, on every connection"""
+    ready = threading.Event()
+    address = {}
+
+    async def send_frames(connection):
+        await connection.send(json.dumps({"e": "kline", "s": "BTCUSDT"}))
+        await connection.send(json.dumps(KLINE))
+        await connection.wait_closed()
+
+    async def serve():
+        async with websockets.serve(send_frames, "127.0.0.1", 0) as server:
+            address["port"] = list(server.sockets)[0].getsockname()[1]
+            ready.set()
+            await asyncio.Future()
+
+    threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+    ready.wait(5)
+    return f"ws://127.0.0.1:{address['port']}"
+
+
+def stop_within(stream, timeout):
+    stopping = threading.Thread(target=stream.stop, daemon=True)
+    stopping.start()
+    stopping.join(timeout)
+    return not stopping.is_alive()
+
+
+def test_stop_before_the_loop_started():
+    stream = BinanceMarketStream(["BTCUSDT"], ["1m"], url="ws://127.0.0.1:9", reconnect_delay=60)
+    stream.start()
+    assert stop_within(stream, 5)
+    # Stopped while waiting to reconnect
+    stream.start()
+    while stream._loop is None:
+        time.sleep(0.001)
+    assert stop_within(stream, 5)
+
+
+def test_bad_frame_is_counted_and_the_connection_kept(ws_url):
+    with BinanceMarketStream(["BTCUSDT"], ["1m"], url=ws_url) as stream:
+        deadline = time.monotonic() + 5
+        while stream.frames < 2 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        assert stream.connected.is_set()
+        assert (stream.frames, stream.message_errors) == (2, 1)
+        assert isinstance(stream.last_message_error, KeyError)
+        assert stream.window("BTCUSDT", "1m").series().open_time.tolist() == [60000]
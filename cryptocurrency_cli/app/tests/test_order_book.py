@@ -0,0 +1,50 @@
+from src.exchange_processors.models import OrderBookSnapshot
+from src.order_book.order_book import OrderBook, OrderBookReplica
+
+
+def snapshot(last_update_id, bids=((100.0, 1.0),), asks=((101.0, 1.0),)):
+    return OrderBookSnapshot(last_update_id=last_update_id, bids=list(bids), asks=list(asks))
+
+
+def test_book_keeps_best_levels_through_updates():
+    book = OrderBook("BTCUSDT")
+    book.apply_snapshot(snapshot(1, bids=[(100.0, 1.0), (99.0, 2.0)], asks=[(101.0, 1.0), (102.0, 3.0)]))
+    book.update([("100.5", "1")], [(101.0, 0)])
+    assert book.best_bid() == (100.5, 1.0)
+    assert book.best_ask() == (102.0, 3.0)
+    assert book.bids.top(3) == [(100.5, 1.0), (100.0, 1.0), (99.0, 2.0)]
+    assert book.price_for("SELL", 2.0) == (100.5 + 100.0) / 2
+    assert book.price_for("BUY", 4.0) is None
+
+
+def test_replica_syncs_on_first_diff_and_skips_stale_ones(mocker):
+    loader = mocker.Mock(return_value=snapshot(10))
+    replica = OrderBookReplica("BTCUSDT", loader)
+    assert replica.apply_diff(5, 10, [(100.0, 5.0)], []) is False
+    assert replica.apply_diff(9, 12, [(100.0, 5.0)], []) is True
+    assert replica.apply_diff(13, 13, [], [(101.0, 0)]) is True
+    assert replica.best_bid() == (100.0, 5.0)
+    assert replica.best_ask() is None
+    assert (loader.call_count, replica.updates, replica.gaps) == (1, 2, 0)
+
+
+def test_gap_resyncs_from_a_fresh_snapshot(mocker):
+    loader = mocker.Mock(side_effect=[snapshot(10), snapshot(20, bids=[(90.0, 1.0)])])
+    replica = OrderBookReplica("BTCUSDT", loader)
+    replica.apply_diff(11, 11, [], [])
+    # Ids 12 - 14 were missed, the diff is applied on top of the fresh snapshot
+    assert replica.apply_diff(15, 21, [(91.0, 1.0)], []) is True
+    assert replica.best_bid() == (91.0, 1.0)
+    assert replica.book.last_update_id == 21
+    assert (replica.gaps, replica.resyncs) == (1, 2)
+
+
+def test_snapshot_older_than_the_diff_syncs_again_later(mocker):
+    loader = mocker.Mock(side_effect=[snapshot(10), snapshot(12), snapshot(30)])
+    replica = OrderBookReplica("BTCUSDT", loader)
+    replica.apply_diff(11, 11, [], [])
+    assert replica.apply_diff(20, 25, [(99.0, 1.0)], []) is False
+    assert replica.synced is False
+    assert replica.apply_diff(26, 31, [(98.0, 1.0)], []) is True
+    assert replica.best_bid() == (100.0, 1.0)
+    assert loader.call_count == 3
@@ -0,0 +1,147 @@
+import asyncio
+import itertools
+from urllib.parse import parse_qsl
+
+import httpx
+import pytest
+
+from src.clients.async_http_client import AsyncHTTPClient
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.clients.bitfinex_main_client.bitfinex_client import BitfinexClient
+from src.clients.retry import RetryPolicy
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+from src.exchange_processors.bitfinex.bitfinex_exchange_processor import BitfinexExchangeProcessor
+from src.exchange_processors.models import OrderRequest
+from src.exchange_processors.orders import CLIENT_ORDER_ID_LENGTH, client_order_id
+
+ORDER = OrderRequest(symbol="BTCUSDT", side="BUY", type="LIMIT", quantity=0.5, price=30000.0)
+FILLED = {"status": "FILLED", "price": "30000.00", "clientOrderId": "id"}
+
+
+def test_client_order_id_is_deterministic():
+    order_id = client_order_id(ORDER, "batch", 0)
+    assert len(order_id) == CLIENT_ORDER_ID_LENGTH
+    assert client_order_id(ORDER.copy(), "batch", 0) == order_id
+    assert client_order_id(ORDER, "batch", 1) != order_id
+    assert client_order_id(ORDER, "other batch", 0) != order_id
+    assert client_order_id(ORDER.copy(update={"quantity": 0.6}), "batch", 0) != order_id
+
+
+def test_batch_sent_again_keeps_its_client_order_ids(mocker):
+    processor = BinanceExchangeProcessor(BinanceClient("key", rate_limiter=None), account_ttl=None)
+    sent = []
+
+    async def send_order_async(order, payload):
+        sent.append(order.client_order_id)
+        return processor.parse_order(FILLED)
+
+    mocker.patch.object(processor, "send_order_async", side_effect=send_order_async)
+    orders = [ORDER, ORDER.copy(update={"side": "SELL"}), ORDER.copy(update={"client_order_id": "mine"})]
+    asyncio.run(processor.place_orders_async(orders, batch_id="batch"))
+    asyncio.run(processor.place_orders_async(orders, batch_id="batch"))
+
+    assert sent[:3] == sent[3:]
+    assert sent[:2] == [client_order_id(ORDER, "batch", 0), client_order_id(orders[1], "batch", 1)]
+    assert sent[2] == "mine"
+
+
+@pytest.fixture
+def clock(mocker):
+    """Wall clock of the processor, a second later on every reading"""
+    seconds = itertools.count(1_700_000_000)
+    time = mocker.patch("src.exchange_processors.binance.binance_exchange_processor.time")
+    time.time.side_effect = lambda: float(next(seconds))
+    return time
+
+
+def assert_signed_per_attempt(client, sent):
+    timestamps = [params["timestamp"] for params in sent]
+    assert timestamps == sorted(set(timestamps))
+    for params in sent:
+        signature = params.pop("signature")
+        assert signature == client.get_signature(params)
+        assert params["newClientOrderId"] == "order-1"
+
+
+def test_retried_order_is_signed_again(clock, fake_response, fake_session):
+    client = BinanceClient("key", rate_limiter=None, retry_policy=RetryPolicy(backoff_base=0))
+    client._session = session = fake_session(fake_response({}, 503), fake_response({}, 503), fake_response(FILLED))
+    processor = BinanceExchangeProcessor(client, account_ttl=None)
+
+    order = processor.place_order("BTCUSDT", "BUY", "LIMIT", 0.5, 30000.0, client_order_id="order-1")
+
+    assert order.status == "FILLED"
+    assert_signed_per_attempt(client, [dict(kwargs["params"]) for _, _, kwargs in session.requests])
+    assert len(session.requests) == 3
+
+
+def test_retried_async_order_is_signed_again(clock, mocker):
+    responses = iter([503, 503, 200])
+    sent = []
+
+    def handler(request):
+        sent.append(dict(parse_qsl(request.url.query.decode())))
+        return httpx.Response(next(responses), json=FILLED)
+
+    mocker.patch.object(
+        AsyncHTTPClient, "create_session", lambda self: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    client = BinanceClient("key", rate_limiter=None, retry_policy=RetryPolicy(backoff_base=0))
+    processor = BinanceExchangeProcessor(client, account_ttl=None)
+
+    order = processor.async_client.run(
+        processor.place_order_async("BTCUSDT", "BUY", "LIMIT", 0.5, 30000.0, client_order_id="order-1")
+    )
+
+    assert order.status == "FILLED"
+    for params in sent:
+        params["timestamp"] = int(params["timestamp"])
+    assert_signed_per_attempt(client, sent)
+    assert len(sent) == 3
+
+
+def test_secret_key_never_leaves_the_client(clock, fake_response, fake_session):
+    client = BinanceClient("secret", rate_limiter=None, api_key="api-key")
+    client._session = session = fake_session(fake_response(FILLED))
+    BinanceExchangeProcessor(client, account_ttl=None).place_order("BTCUSDT", "BUY", "LIMIT", 0.5, 30000.0)
+
+    _, _, kwargs = session.requests[0]
+    assert kwargs["headers"]["X-MBX-APIKEY"] == "api-key"
+    assert "secret" not in repr(kwargs)
+    params = dict(kwargs["params"])
+    assert params.pop("signature") == client.get_signature(params)
+
+
+def test_sync_batch_keeps_the_order_of_its_results(clock, fake_response, fake_session):
+    client = BinanceClient("key", rate_limiter=None, retry_policy=RetryPolicy(max_attempts=1))
+    client._session = fake_session(fake_response(FILLED))
+    processor = BinanceExchangeProcessor(client, account_ttl=None)
+    orders = [ORDER, ORDER.copy(update={"quantity": -1.0}), ORDER.copy(update={"side": "SELL"})]
+
+    results = processor.place_orders(orders, batch_id="batch", max_concurrency=2)
+
+    assert [result.order.client_order_id for result in results] == [
+        client_order_id(order, "batch", index) for index, order in enumerate(orders)
+    ]
+    assert [type(result.result).__name__ for result in results] == ["OrderDetails", "ResponseDetails", "OrderDetails"]
+    assert results[1].result.status_code == 400
+    assert len(client._session.requests) == 2
+
+
+def test_sync_batch_reports_failed_requests(clock, mocker):
+    import requests
+
+    client = BinanceClient("key", rate_limiter=None, retry_policy=RetryPolicy(max_attempts=1))
+    mocker.patch.object(client, "send", side_effect=requests.ConnectionError("refused"))
+    (result,) = BinanceExchangeProcessor(client, account_ttl=None).place_orders([ORDER])
+    assert (result.result.status_code, result.result.details) == (0, "refused")
+
+
+def test_bitfinex_rejects_orders_and_account_reads():
+    processor = BitfinexExchangeProcessor(BitfinexClient("key", rate_limiter=None))
+    (result,) = processor.place_orders([OrderRequest(symbol="btcusd", side="BUY", type="MARKET", quantity=1.0)])
+    assert result.result.status_code == 400
+    (result,) = asyncio.run(processor.place_orders_async([ORDER]))
+    assert result.result.status_code == 400
+    assert asyncio.run(processor.get_account_async(None)).status_code == 400
+    assert asyncio.run(processor.ping_client_async()) == 200
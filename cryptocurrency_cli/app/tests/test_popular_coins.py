@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+from src.exchange_processors.models import TickerDetails
+from src.popular_coins.popular_coins import PopularCoins, format_age
+from src.storage.ticker_snapshots import TickerSnapshot, TickerSnapshotStore
+
+COINS = ("BTC", "ETH", "BNB", "NOPE", "SOL", "XRP")
+
+
+def ticker(symbol, price=1.0):
+    return TickerDetails(symbol=symbol, last_price=price, change_percent=0.5, volume=10.0)
+
+
+@pytest.fixture
+def processor():
+    processor = BinanceExchangeProcessor(BinanceClient("key", rate_limiter=None), account_ttl=None)
+    processor.ticker_batch_size = 4
+    processor.batches = []
+
+    def fetch_tickers(symbols):
+        processor.batches.append(symbols)
+        # Answered in another order, the unlisted symbol is left out
+        return [ticker(symbol) for symbol in reversed(symbols) if symbol != "NOPEUSDT"]
+
+    processor.fetch_tickers = fetch_tickers
+    return processor
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TickerSnapshotStore(str(tmp_path))
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_refresh_fetches_in_batches_and_keeps_the_order_of_the_coins(processor, store, tmp_path):
+    coins = PopularCoins(processor, store, COINS)
+    snapshot = coins.refresh()
+    assert processor.batches == [["BTCUSDT", "ETHUSDT", "BNBUSDT", "NOPEUSDT"], ["SOLUSDT", "XRPUSDT"]]
+    assert [ticker.symbol for ticker in snapshot.tickers] == ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "XRPUSDT"]
+    assert coins.snapshot() is snapshot
+    # Another process reads the snapshot from disk
+    assert TickerSnapshotStore(str(tmp_path)).load("binance") == snapshot
+
+
+def test_current_snapshot_is_served_without_a_refresh(processor, store):
+    store.save(TickerSnapshot(exchange="binance", fetched_at=time.time(), tickers=[ticker("BTCUSDT")]))
+    coins = PopularCoins(processor, store, COINS, refresh_interval=60).start()
+    time.sleep(0.05)
+    coins.stop()
+    assert processor.batches == []
+    assert not coins.is_stale(coins.snapshot())
+
+
+def test_stale_snapshot_is_refreshed_in_the_background(processor, store):
+    store.save(TickerSnapshot(exchange="binance", fetched_at=time.time() - 120, tickers=[ticker("BTCUSDT")]))
+    coins = PopularCoins(processor, store, COINS, refresh_interval=60)
+    assert coins.is_stale(coins.snapshot())
+    coins.start()
+    wait_for(lambda: not coins.is_stale(coins.snapshot()))
+    coins.stop()
+    assert len(coins.snapshot().tickers) == 5
+
+
+def test_failed_refresh_keeps_the_previous_snapshot(processor, store):
+    previous = TickerSnapshot(exchange="binance", fetched_at=time.time() - 120, tickers=[ticker("BTCUSDT")])
+    store.save(previous)
+    failing = threading.Event()
+    failing.set()
+    fetch_tickers = processor.fetch_tickers
+
+    def flaky_fetch_tickers(symbols):
+        if failing.is_set():
+            raise ConnectionError("exchange down")
+        return fetch_tickers(symbols)
+
+    processor.fetch_tickers = flaky_fetch_tickers
+    coins = PopularCoins(processor, store, COINS, refresh_interval=60, retry_interval=0.01).start()
+    wait_for(lambda: coins.error is not None)
+    assert coins.snapshot() == previous
+    failing.clear()
+    wait_for(lambda: not coins.is_stale(coins.snapshot()))
+    coins.stop()
+    wait_for(lambda: coins.error is None)
+
+
+def test_unreadable_snapshot_is_ignored(store, tmp_path):
+    (tmp_path / "binance.json").write_text("{")
+    assert store.load("binance") is None
+    assert store.load("bitfinex") is None
+
+
+@pytest.mark.parametrize(
+    "seconds, age",
+    [(0, "0s"), (45.9, "45s"), (192, "3m 12s"), (3600, "1h 0m"), (2 * 86400 + 5 * 3600 + 59, "2d 5h")],
+)
+def test_format_age(seconds, age):
+    assert format_age(seconds) == age
@@ -0,0 +1,57 @@
+import pytest
+
+from src.clients.rate_limiter import CombinedRateLimiter, RateLimiter, TokenBucket
+
+
+@pytest.fixture
+def clock(mocker):
+    return mocker.patch("src.clients.rate_limiter.time.monotonic", return_value=100.0)
+
+
+def test_bucket_delays_reservations_past_its_capacity(clock):
+    bucket = TokenBucket(10, 1.0)
+    assert bucket.reserve(10) == 0.0
+    assert bucket.available() == 0.0
+    # Each reservation waits behind the ones made before it
+    assert bucket.reserve(5) == pytest.approx(0.5)
+    assert bucket.reserve(5) == pytest.approx(1.0)
+
+
+def test_bucket_refills_up_to_its_capacity(clock):
+    bucket = TokenBucket(10, 1.0)
+    bucket.reserve(10)
+    clock.return_value = 100.3
+    assert bucket.available() == pytest.approx(3.0)
+    assert bucket.reserve(3) == pytest.approx(0.0)
+    clock.return_value = 200.0
+    assert bucket.available() == 10.0
+
+
+def test_weight_of_longest_registered_prefix():
+    limiter = RateLimiter("binance", 1200, 60, {"/api/v3/ticker": 2, "/api/v3/ticker/24hr": 40})
+    assert limiter.weight_of("/api/v3/ticker/24hr") == 40
+    assert limiter.weight_of("/api/v3/ticker/price") == 2
+    assert limiter.weight_of("/api/v3/klines") == 1
+    limiter.register_weights({"/api/v3/klines": 5})
+    assert limiter.weight_of("/api/v3/klines") == 5
+
+
+def test_limiter_charges_path_weights(clock):
+    limiter = RateLimiter("binance", 10, 1.0, {"/heavy": 8})
+    assert limiter.reserve("/heavy") == 0.0
+    assert limiter.reserve("/light") == 0.0
+    assert limiter.reserve("/heavy") == pytest.approx(0.7)
+    usage = limiter.usage()
+    assert usage.total_weight == 17
+    assert usage.total_delay == pytest.approx(0.7)
+    assert usage.used_ratio == 1.0
+
+
+def test_combined_limiter_waits_for_the_fullest_budget(clock):
+    account = RateLimiter("account", 100, 1.0)
+    exchange = RateLimiter("exchange", 10, 1.0, {"/heavy": 10})
+    combined = CombinedRateLimiter(account, exchange)
+    assert combined.weight_of("/heavy") == 10
+    combined.reserve("/heavy")
+    assert combined.reserve("/heavy") == pytest.approx(1.0)
+    assert combined.usage().name == "exchange"
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from src.clients.retry import RetryPolicy, parse_retry_after
+
+
+def test_backoff_grows_within_its_window(mocker):
+    uniform = mocker.patch("src.clients.retry.random.uniform", side_effect=lambda low, high: high)
+    policy = RetryPolicy(backoff_base=0.2, backoff_max=1.0, max_attempts=10)
+    assert [policy.next_delay("GET", attempt, 0.0, 503) for attempt in range(4)] == [0.2, 0.4, 0.8, 1.0]
+    assert uniform.call_args.args == (0, 1.0)
+
+
+def test_only_retryable_requests_are_retried():
+    policy = RetryPolicy(max_attempts=3, backoff_base=0)
+    assert policy.next_delay("GET", 0, 0.0, 429) == 0.0
+    assert policy.next_delay("GET", 0, 0.0) == 0.0
+    assert policy.next_delay("GET", 0, 0.0, 400) is None
+    assert policy.next_delay("POST", 0, 0.0, 503) is None
+    assert policy.next_delay("POST", 0, 0.0, 503, idempotent=True) == 0.0
+    assert policy.next_delay("GET", 2, 0.0, 503) is None
+    assert RetryPolicy(retry_connection_errors=False).next_delay("GET", 0, 0.0) is None
+
+
+def test_retry_after_seconds_sets_the_minimum_delay():
+    policy = RetryPolicy(backoff_base=0.1, backoff_max=0.1)
+    assert policy.next_delay("GET", 0, 0.0, 429, retry_after="3") == 3.0
+    assert RetryPolicy(respect_retry_after=False, backoff_base=0).next_delay("GET", 0, 0.0, 429, "3") == 0.0
+
+
+def test_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=20)
+    assert parse_retry_after(format_datetime(retry_at, usegmt=True)) == pytest.approx(20, abs=1.5)
+    assert parse_retry_after(format_datetime(retry_at - timedelta(minutes=5), usegmt=True)) == 0.0
+    assert parse_retry_after("-4") == 0.0
+    assert parse_retry_after("soon") == 0.0
+
+
+def test_gives_up_past_the_elapsed_cap():
+    policy = RetryPolicy(backoff_base=0, max_elapsed=30.0)
+    assert policy.next_delay("GET", 0, 29.0, 503) == 0.0
+    assert policy.next_delay("GET", 0, 25.0, 429, retry_after="10") is None
+    assert policy.next_delay("GET", 0, 31.0, 503) is None
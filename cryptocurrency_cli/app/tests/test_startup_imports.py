@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+BENCHMARKS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "benchmarks")
+if BENCHMARKS_PATH not in sys.path:
+    sys.path.insert(0, BENCHMARKS_PATH)
+
+from startup_benchmark import SCENARIOS, import_report, unexpected_imports  # noqa: E402
+
+
+@pytest.mark.parametrize("name", SCENARIOS)
+def test_startup_loads_only_what_the_scenario_needs(name):
+    report = import_report(SCENARIOS[name])
+    assert report
+    assert unexpected_imports(name, report) == []
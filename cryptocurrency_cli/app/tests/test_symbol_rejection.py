@@ -0,0 +1,66 @@
+import asyncio
+import threading
+from http import HTTPStatus
+
+import pytest
+from click.testing import CliRunner
+
+import app
+from batch import execute_action
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+from src.exchange_processors.models import OrderRequest, SymbolRules
+from src.storage.symbol_index import SymbolIndex
+
+
+@pytest.fixture
+def processor(tmp_path, mocker):
+    mocker.patch.object(
+        BinanceExchangeProcessor, "fetch_symbol_rules", return_value=[SymbolRules(symbol="BTCUSDT")]
+    )
+    mocker.patch.object(BinanceClient, "request")
+    return BinanceExchangeProcessor(
+        BinanceClient("key", rate_limiter=None), symbol_index=SymbolIndex(str(tmp_path)), account_ttl=None
+    )
+
+
+def test_batch_reports_an_unknown_symbol_as_failed(processor):
+    ok, result = asyncio.run(execute_action(processor, {"action": "get_candle", "symbol": "NOPEUSDT", "id": 1}, "b"))
+    assert not ok
+    assert result["status_code"] == 400
+    assert result["details"] == "Unknown symbol NOPEUSDT"
+    BinanceClient.request.assert_not_called()
+
+
+def test_prompt_echoes_the_rejection(processor, mocker):
+    mocker.patch.object(processor, "ping_client", return_value=HTTPStatus.OK)
+    mocker.patch.object(app, "create_processor", return_value=processor)
+    mocker.patch("src.popular_coins.popular_coins.PopularCoins.start", lambda self: self)
+    mocker.patch.object(app, "show_popular_coins")
+
+    result = CliRunner().invoke(
+        app.request_client, ["--exchange", "binance", "--secret_key", "key"], input="get_candle\nNOPEUSDT 1h 5\n"
+    )
+    assert "Unknown symbol NOPEUSDT" in result.output
+    assert "('request_url'" not in result.output
+
+
+def test_cold_index_is_fetched_off_the_event_loop(processor):
+    threads = []
+
+    def fetch_symbol_rules():
+        threads.append(threading.get_ident())
+        return [SymbolRules(symbol="BTCUSDT")]
+
+    BinanceExchangeProcessor.fetch_symbol_rules.side_effect = fetch_symbol_rules
+    order = OrderRequest(symbol="NOPEUSDT", side="BUY", type="MARKET", quantity=1.0)
+
+    async def main():
+        loop_thread = threading.get_ident()
+        (result,) = await processor.place_orders_async([order])
+        rejected = await processor.show_candles_async("NOPEUSDT", "1h", 5)
+        return loop_thread, result, rejected
+
+    loop_thread, result, rejected = asyncio.run(main())
+    assert result.result.details == rejected.details == "Unknown symbol NOPEUSDT"
+    assert len(threads) == 1 and threads[0] != loop_thread
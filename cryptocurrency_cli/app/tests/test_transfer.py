@@ -0,0 +1,59 @@
+import json
+
+import httpx
+import pytest
+
+from src.clients.http_client import HTTPClient, RequestType
+from src.clients.instrumentation import RequestInstrumentation
+from src.clients.transfer import iter_json_rows
+
+BODY = '[[1, "0.5", "é"], {"a": [1, 2]}, -5, 1e-5, "x,]", null, []]'.encode()
+
+
+def split(body, *cuts):
+    bounds = [0, *cuts, len(body)]
+    return [body[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+@pytest.mark.parametrize("cut", range(1, len(BODY)))
+def test_rows_split_at_any_byte(cut):
+    assert list(iter_json_rows(split(BODY, cut))) == json.loads(BODY)
+
+
+def test_rows_in_one_byte_chunks():
+    assert list(iter_json_rows(split(BODY, *range(1, len(BODY))))) == json.loads(BODY)
+
+
+def test_number_is_not_cut_at_a_chunk_boundary():
+    assert list(iter_json_rows([b"[1", b"e", b"-5, -", b"5]"])) == [1e-5, -5]
+    assert list(iter_json_rows([b" [ ", b"12", b"3 ", b"]  "])) == [123]
+    assert list(iter_json_rows([b"[]"])) == []
+    assert list(iter_json_rows([b"[1]", b" \n"])) == [1]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [b"", b"[1, 2", b"[1, 2,", b"[[1, 2]", b'{"a": 1}', b"[1 2]", b"[1,,2]", b"[1,2,]", b"[,1]", b"[1,2] garbage"],
+)
+def test_incomplete_or_invalid_array_raises(body):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_rows(split(body, len(body) // 2)))
+
+
+def test_instrumented_http2_stream(mocker):
+    def handler(request):
+        return httpx.Response(200, content=b"[[1, 2], [3, 4]]")
+
+    mocker.patch.object(
+        HTTPClient, "create_http2_session", lambda self: httpx.Client(transport=httpx.MockTransport(handler))
+    )
+    timings = []
+    instrumentation = RequestInstrumentation()
+    instrumentation.add_hook(timings.append)
+    client = HTTPClient(
+        headers={}, supported_codes=[200], base_path="http://exchange", http2=True, instrumentation=instrumentation
+    )
+
+    assert list(client.stream_rows(RequestType.GET, "/klines")) == [[1, 2], [3, 4]]
+    assert set(timings[0].phases) == {"queue", "server"}
+    assert client.transfer_stats.body_bytes == len(b"[[1, 2], [3, 4]]")
@@ -0,0 +1,99 @@
+"""
+Account reads of a dashboard with and without the account cache
+
+    python benchmarks/account_cache_benchmark.py [--readers 16] [--seconds 3] [--latency 0.05] [--ttl 1]
+
+Readers poll `get_account` in threads, then the same number of them read it
+concurrently on an event loop, and an order placed between two reads checks
+the snapshot is fetched again.
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from timeit import default_timer as timer
+
+from stand_in_server import StandInHandler, start_server
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+
+ACCOUNT = {"uid": 42, "balances": [{"asset": "BTC", "free": "1.5", "locked": "0.5"}, {"asset": "ETH", "free": "0", "locked": "0"}]}
+ORDER = {"status": "NEW", "price": "20000.00", "clientOrderId": "dashboard"}
+
+
+class AccountHandler(StandInHandler):
+    """Serve the account and accept orders, counting the account requests"""
+
+    account_requests = 0
+    lock = threading.Lock()
+
+    def do_GET(self) -> None:
+        with self.lock:
+            type(self).account_requests += 1
+        time.sleep(self.latency)
+        self.send_payload(200, json.dumps(ACCOUNT).encode())
+
+    def do_POST(self) -> None:
+        time.sleep(self.latency)
+        self.send_payload(200, json.dumps(ORDER).encode())
+
+
+def poll(processor: BinanceExchangeProcessor, readers: int, seconds: float) -> int:
+    """Read the account from `readers` threads for `seconds`, return the number of reads"""
+    reads = [0] * readers
+    deadline = timer() + seconds
+
+    def read(index: int) -> None:
+        while timer() < deadline:
+            processor.get_account(None)
+            reads[index] += 1
+
+    threads = [threading.Thread(target=read, args=(index,)) for index in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(reads)
+
+
+async def read_concurrently(processor: BinanceExchangeProcessor, readers: int) -> None:
+    async with processor.async_client:
+        await asyncio.gather(*(processor.get_account_async(None) for _ in range(readers)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated exchange latency in seconds")
+    parser.add_argument("--ttl", type=float, default=1.0)
+    args = parser.parse_args()
+
+    AccountHandler.latency = args.latency
+    server, base_url = start_server(AccountHandler)
+
+    print(f"{'account ttl':>12} {'reads/s':>10} {'requests':>9}  counters")
+    for ttl in (None, args.ttl):
+        processor = BinanceExchangeProcessor(BinanceClient("key", base_path=base_url, rate_limiter=None), account_ttl=ttl)
+        AccountHandler.account_requests = 0
+        with processor.client:
+            reads = poll(processor, args.readers, args.seconds)
+        stats = processor.account_cache_stats()
+        print(f"{str(ttl):>12} {reads / args.seconds:10.0f} {AccountHandler.account_requests:9d}  {stats}")
+
+    processor = BinanceExchangeProcessor(BinanceClient("key", base_path=base_url, rate_limiter=None), account_ttl=args.ttl)
+    AccountHandler.account_requests = 0
+    asyncio.run(read_concurrently(processor, args.readers))
+    print(f"\n{args.readers} concurrent async reads sent {AccountHandler.account_requests} request(s)")
+
+    with processor.client:
+        processor.get_account(None)
+        processor.place_order("BTCUSDT", "BUY", "LIMIT", 0.01, 20000.0)
+        processor.get_account(None)
+    print(f"an order between two reads: {processor.account_cache_stats()}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
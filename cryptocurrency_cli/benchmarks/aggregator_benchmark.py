@@ -0,0 +1,59 @@
+"""
+Consolidated balances of many accounts, one key after another versus a bounded pool
+
+    python benchmarks/aggregator_benchmark.py [--accounts 200] [--concurrency 1 8 32] [--latency 0.02]
+        [--budget 100000] [--key_budget 0]
+
+Every account is a key of its own against the mock exchange. All of them
+share one exchange budget of `--budget` weight per minute, the real
+Binance one is 1200, and with `--key_budget` each key also gets a budget of
+its own. The first concurrency level is the baseline the speedup of the
+others is reported against.
+"""
+import argparse
+
+from mock_exchange import start_mock_exchange
+from src.accounts.aggregator import AccountAggregator, AccountKey
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.clients.rate_limiter import RateLimiter
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated exchange latency in seconds")
+    parser.add_argument("--rows", type=int, default=20, help="balances per account")
+    parser.add_argument("--budget", type=int, default=100000, help="weight per minute shared by every key")
+    parser.add_argument("--key_budget", type=int, default=0, help="weight per minute of each key, 0 for none")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_exchange(args.latency, args.rows)
+    keys = [AccountKey(name=f"account{i}", secret_key=f"key{i}") for i in range(args.accounts)]
+
+    baseline = None
+    for concurrency in args.concurrency:
+        shared = RateLimiter("binance", args.budget, 60)
+
+        def create_processor(exchange: str, secret_key: str, api_key=None) -> BinanceExchangeProcessor:
+            client = BinanceClient(secret_key, base_path=base_url, rate_limiter=shared, api_key=api_key)
+            return BinanceExchangeProcessor(client, account_ttl=None)
+
+        with AccountAggregator(
+            create_processor, "binance", keys, concurrency, key_weight_budget=args.key_budget or None
+        ) as aggregator:
+            consolidated = aggregator.get_accounts()
+        assert not consolidated.failed, [result.error for result in consolidated.results if result.error]
+        baseline = baseline or consolidated.wall
+        print(
+            f"concurrency {concurrency:4d}: {consolidated.wall:7.2f}s wall, {baseline / consolidated.wall:6.1f}x "
+            f"the first level, {len(consolidated.balances)} assets, "
+            f"waited {shared.total_delay:.2f}s for the shared budget"
+        )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Serial `show_candles` calls vs concurrent `show_many_candles` for many symbols
+
+    python benchmarks/async_candles_benchmark.py [--symbols 200] [--latency 0.02]
+"""
+import argparse
+import json
+from timeit import default_timer as timer
+
+from stand_in_server import StandInHandler, start_server
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+
+
+class KlinesHandler(StandInHandler):
+    payload = json.dumps(
+        [[1667260800000 + i * 3600000, "20000.0", "20100.0", "19900.0", "20050.0", "12.5"] for i in range(100)]
+    ).encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    KlinesHandler.latency = args.latency
+    server, base_path = start_server(KlinesHandler)
+    symbols = [f"COIN{i}USDT" for i in range(args.symbols)]
+    client = BinanceClient("secret", base_path=base_path, pool_maxsize=args.concurrency, rate_limiter=None)
+    processor = BinanceExchangeProcessor(client, client.to_async(args.concurrency))
+    try:
+        start = timer()
+        for symbol in symbols:
+            processor.show_candles(symbol, None)
+        serial = timer() - start
+
+        start = timer()
+        processor.show_many_candles(symbols)
+        concurrent = timer() - start
+    finally:
+        client.close()
+        server.shutdown()
+
+    print(f"serial show_candles          : {serial:8.3f} s")
+    print(f"concurrent show_many_candles: {concurrent:8.3f} s")
+    print(f"speedup                      : {serial / concurrent:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Serial paginated klines download versus the parallel backfill engine, and a resume after a failure
+
+    python benchmarks/backfill_benchmark.py [--days 90] [--latency 0.05] [--concurrency 1 4 8 16]
+"""
+import argparse
+import json
+import tempfile
+import time
+from timeit import default_timer as timer
+from urllib.parse import parse_qs, urlparse
+
+from stand_in_server import StandInHandler, start_server
+from src.backfill.backfill import BackfillEngine
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.clients.retry import RetryPolicy
+from src.exchange_processors.binance.binance_exchange_processor import KLINES_PAGE_LIMIT, BinanceExchangeProcessor
+from src.storage.candle_store import CandleStore
+
+MINUTE = 60000
+DAY = 24 * 60 * MINUTE
+# Fixed start, so the history never reaches the open candle
+START_TIME = 1_600_000_000_000 - 1_600_000_000_000 % DAY
+
+
+class PagedKlinesHandler(StandInHandler):
+    """Serve 1m klines pages, fail with 400 once `fail_after` pages were served"""
+
+    served = 0
+    fail_after = None
+
+    def do_GET(self) -> None:
+        time.sleep(self.latency)
+        params = {key: int(values[0]) for key, values in parse_qs(urlparse(self.path).query).items() if key.endswith("Time")}
+        cls = type(self)
+        if cls.fail_after is not None and cls.served >= cls.fail_after:
+            return self.send_payload(400, b'{"code": -1, "msg": "stand-in failure"}')
+        cls.served += 1
+        start, end = params["startTime"], params.get("endTime", params["startTime"] + KLINES_PAGE_LIMIT * MINUTE)
+        klines = [
+            [t, "20000.1", "20010.2", "19990.3", "20005.4", "1.2345", t + MINUTE - 1, "24690.0", 42, "0.6", "12345.0", "0"]
+            for t in range(start, min(end + 1, start + KLINES_PAGE_LIMIT * MINUTE), MINUTE)
+        ]
+        self.send_payload(200, json.dumps(klines).encode())
+
+
+def processor_for(base_url: str) -> BinanceExchangeProcessor:
+    client = BinanceClient("key", base_path=base_url, rate_limiter=None, retry_policy=RetryPolicy(max_attempts=1))
+    return BinanceExchangeProcessor(client, client.to_async(max_concurrency=64), fast_decode=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated exchange latency in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    PagedKlinesHandler.latency = args.latency
+    server, base_url = start_server(PagedKlinesHandler)
+    end_time = START_TIME + args.days * DAY
+    candles = args.days * DAY // MINUTE
+    print(f"{candles} candles, {-(-candles // KLINES_PAGE_LIMIT)} pages\n")
+
+    processor = processor_for(base_url)
+    start = timer()
+    rows = sum(len(page) for page in processor.iter_candle_pages("BTCUSDT", "1m", START_TIME, end_time - 1))
+    print(f"{'serial':>12}: {timer() - start:7.2f}s  {rows} rows")
+
+    for concurrency in args.concurrency:
+        store = CandleStore(tempfile.mkdtemp())
+        engine = BackfillEngine(processor_for(base_url), store, concurrency)
+        start = timer()
+        (checkpoint,) = engine.backfill(["BTCUSDT"], ["1m"], START_TIME, end_time).values()
+        print(f"{f'backfill x{concurrency}':>12}: {timer() - start:7.2f}s  {checkpoint.rows} rows")
+
+    # Fail half way, then resume from the checkpoint
+    store = CandleStore(tempfile.mkdtemp())
+    PagedKlinesHandler.served, PagedKlinesHandler.fail_after = 0, candles // KLINES_PAGE_LIMIT // 2
+    try:
+        BackfillEngine(processor_for(base_url), store, 8).backfill(["BTCUSDT"], ["1m"], START_TIME, end_time)
+    except Exception as error:
+        checkpoint = BackfillEngine(processor_for(base_url), store).load_checkpoint("BTCUSDT", "1m")
+        print(f"\ninterrupted by {type(error).__name__} after {checkpoint.rows} rows")
+    PagedKlinesHandler.served, PagedKlinesHandler.fail_after = 0, None
+    (checkpoint,) = BackfillEngine(processor_for(base_url), store, 8).backfill(["BTCUSDT"], ["1m"], START_TIME, end_time).values()
+    open_time = store.read("binance", "BTCUSDT", "1m")["open_time"]
+    contiguous = bool(((open_time[1:] - open_time[:-1]) == MINUTE).all())
+    print(f"resumed with {PagedKlinesHandler.served} more pages: {checkpoint.rows} rows, contiguous {contiguous}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Throughput and latency of every layer of the client stack against the mock exchange
+
+    python benchmarks/client_stack_benchmark.py [--concurrency 1 4 16 64] [--seconds 2]
+        [--latency 0.0] [--rows 100] [--scenarios http_client ...] [--output results.json]
+
+Each scenario is one operation of a layer, from a bare `HTTPClient` request
+to a processor call that signs, decodes and validates. It runs for
+`--seconds` at each concurrency level, in threads, or in tasks of one event
+loop for the async scenarios. The results are written as JSON, one entry per
+scenario and level with throughput and p50/p95/p99 latency, so runs can be
+diffed for regressions; a table is printed to stderr. The mock shares the
+interpreter with the clients, pass a `--latency` to keep its own CPU time
+from capping the throughput at high concurrency.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import threading
+from timeit import default_timer as timer
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from mock_exchange import start_mock_exchange
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.clients.bitfinex_main_client.bitfinex_client import BitfinexClient
+from src.clients.http_client import HTTPClient, RequestType
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+from src.exchange_processors.bitfinex.bitfinex_exchange_processor import BitfinexExchangeProcessor
+
+Operation = Callable[[], Any]
+AsyncOperation = Callable[[], Awaitable[Any]]
+
+
+def binance_processor(base_url: str, pool_maxsize: int) -> BinanceExchangeProcessor:
+    client = BinanceClient("key", base_path=base_url, pool_maxsize=pool_maxsize, rate_limiter=None, coalesce=False)
+    return BinanceExchangeProcessor(client, client.to_async(pool_maxsize), account_ttl=None)
+
+
+def bitfinex_processor(base_url: str, pool_maxsize: int) -> BitfinexExchangeProcessor:
+    return BitfinexExchangeProcessor(
+        BitfinexClient("key", base_path=base_url, pool_maxsize=pool_maxsize, rate_limiter=None, coalesce=False)
+    )
+
+
+def http_client(base_url: str, pool_maxsize: int) -> HTTPClient:
+    return HTTPClient(headers={}, supported_codes=[200], base_path=base_url, pool_maxsize=pool_maxsize, coalesce=False)
+
+
+# Scenario name -> builder of the client under test and the operation timed on it
+SCENARIOS: Dict[str, Callable[[str, int], Tuple[Any, Operation]]] = {
+    "http_client.klines": lambda url, size: (
+        client := http_client(url, size),
+        lambda: client.request(RequestType.GET, "/klines", params={"symbol": "BTCUSDT"}),
+    ),
+    "binance_client.klines": lambda url, size: (
+        client := BinanceClient("key", base_path=url, pool_maxsize=size, rate_limiter=None, coalesce=False),
+        lambda: client.request(RequestType.GET, "/klines", params={"symbol": "BTCUSDT"}),
+    ),
+    "bitfinex_client.balances": lambda url, size: (
+        client := BitfinexClient("key", base_path=url, pool_maxsize=size, rate_limiter=None, coalesce=False),
+        lambda: client.request(RequestType.GET, "/v1/balances"),
+    ),
+    "binance_processor.show_candles": lambda url, size: (
+        processor := binance_processor(url, size),
+        lambda: processor.show_candles("BTCUSDT", "1h"),
+    ),
+    "binance_processor.get_account": lambda url, size: (
+        processor := binance_processor(url, size),
+        lambda: processor.get_account(None),
+    ),
+    "binance_processor.place_order": lambda url, size: (
+        processor := binance_processor(url, size),
+        lambda: processor.place_order("BTCUSDT", "BUY", "LIMIT", 0.01, 20000.0),
+    ),
+    "bitfinex_processor.show_candles": lambda url, size: (
+        processor := bitfinex_processor(url, size),
+        lambda: processor.show_candles("tBTCUSD", None),
+    ),
+}
+
+ASYNC_SCENARIOS: Dict[str, Callable[[str, int], Tuple[Any, AsyncOperation]]] = {
+    "binance_processor.show_candles_async": lambda url, size: (
+        processor := binance_processor(url, size),
+        lambda: processor.show_candles_async("BTCUSDT", "1h"),
+    ),
+    "binance_processor.get_account_async": lambda url, size: (
+        processor := binance_processor(url, size),
+        lambda: processor.get_account_async(None),
+    ),
+}
+
+
+def run_threads(operation: Operation, concurrency: int, seconds: float) -> Tuple[List[float], float]:
+    """Latencies of `operation` called in a loop by `concurrency` threads for `seconds`, with the wall time"""
+    latencies: List[List[float]] = [[] for _ in range(concurrency)]
+    deadline = timer() + seconds
+
+    def work(own: List[float]) -> None:
+        while (start := timer()) < deadline:
+            operation()
+            own.append(timer() - start)
+
+    threads = [threading.Thread(target=work, args=(own,)) for own in latencies]
+    start = timer()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [latency for own in latencies for latency in own], timer() - start
+
+
+async def run_tasks(operation: AsyncOperation, concurrency: int, seconds: float) -> Tuple[List[float], float]:
+    """Asynchronous `run_threads`, `concurrency` tasks share one event loop"""
+    latencies: List[float] = []
+    deadline = timer() + seconds
+
+    async def work() -> None:
+        while (start := timer()) < deadline:
+            await operation()
+            latencies.append(timer() - start)
+
+    start = timer()
+    await asyncio.gather(*(work() for _ in range(concurrency)))
+    return latencies, timer() - start
+
+
+def summarize(scenario: str, concurrency: int, latencies: List[float], wall: float) -> Dict[str, Any]:
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "operations": len(latencies),
+        "throughput": len(latencies) / wall,
+        "p50_ms": quantiles[49] * 1000,
+        "p95_ms": quantiles[94] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--seconds", type=float, default=2.0, help="duration of every scenario and level")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated exchange latency in seconds")
+    parser.add_argument("--rows", type=int, default=100, help="klines, candles or balances per payload")
+    parser.add_argument("--scenarios", nargs="+", choices=[*SCENARIOS, *ASYNC_SCENARIOS], help="all by default")
+    parser.add_argument("--output", type=argparse.FileType("w"), default=sys.stdout, help="JSON results, stdout by default")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_exchange(args.latency, args.rows)
+    pool_maxsize = max(args.concurrency)
+    selected = args.scenarios or [*SCENARIOS, *ASYNC_SCENARIOS]
+    results = []
+
+    print(f"{'scenario':>38} {'workers':>7} {'ops/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}", file=sys.stderr)
+    for scenario in selected:
+        for concurrency in args.concurrency:
+            if scenario in SCENARIOS:
+                client, operation = SCENARIOS[scenario](base_url, pool_maxsize)
+                operation()
+                latencies, wall = run_threads(operation, concurrency, args.seconds)
+                getattr(client, "client", client).close()
+            else:
+                processor, operation = ASYNC_SCENARIOS[scenario](base_url, pool_maxsize)
+
+                async def measure() -> Tuple[List[float], float]:
+                    await operation()
+                    return await run_tasks(operation, concurrency, args.seconds)
+
+                latencies, wall = processor.async_client.run(measure())
+            result = summarize(scenario, concurrency, latencies, wall)
+            results.append(result)
+            print(
+                f"{scenario:>38} {concurrency:7d} {result['throughput']:10.0f} "
+                f"{result['p50_ms']:8.2f} {result['p95_ms']:8.2f} {result['p99_ms']:8.2f}",
+                file=sys.stderr,
+            )
+
+    json.dump(
+        {
+            "config": {
+                "seconds": args.seconds,
+                "latency": args.latency,
+                "rows": args.rows,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+            },
+            "results": results,
+        },
+        args.output,
+        indent=2,
+    )
+    args.output.write("\n")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
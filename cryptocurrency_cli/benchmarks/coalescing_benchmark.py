@@ -0,0 +1,86 @@
+"""
+Identical concurrent requests with and without coalescing
+
+    python benchmarks/coalescing_benchmark.py [--callers 64] [--rounds 20] [--latency 0.05] [--symbols 4]
+
+In every round `--callers` threads, then as many tasks, ask for the klines
+of one of `--symbols` symbols at the same moment, the way dashboards and
+batch runs of many users hit the same ticker. The requests reaching the mock
+exchange, the rate limit weight they spent and the wall time are compared
+with coalescing enabled and disabled.
+"""
+import argparse
+import asyncio
+import threading
+from timeit import default_timer as timer
+
+from mock_exchange import start_mock_exchange
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.clients.rate_limiter import RateLimiter
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+
+
+def build(base_url: str, callers: int, coalesce: bool) -> BinanceExchangeProcessor:
+    limiter = RateLimiter("binance", 10 ** 9, 60)
+    client = BinanceClient("key", base_path=base_url, pool_maxsize=callers, rate_limiter=limiter, coalesce=coalesce)
+    return BinanceExchangeProcessor(client, client.to_async(callers))
+
+
+def run_threads(processor: BinanceExchangeProcessor, callers: int, rounds: int, symbols: int) -> float:
+    start = timer()
+    for round in range(rounds):
+        barrier = threading.Barrier(callers)
+
+        def call(caller: int) -> None:
+            barrier.wait()
+            processor.show_candles(f"SYM{(round + caller) % symbols}USDT", "1h")
+
+        threads = [threading.Thread(target=call, args=(caller,)) for caller in range(callers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return timer() - start
+
+
+async def run_tasks(processor: BinanceExchangeProcessor, callers: int, rounds: int, symbols: int) -> float:
+    start = timer()
+    for round in range(rounds):
+        await asyncio.gather(*(
+            processor.show_candles_async(f"SYM{(round + caller) % symbols}USDT", "1h") for caller in range(callers)
+        ))
+    return timer() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--callers", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated exchange latency in seconds")
+    parser.add_argument("--symbols", type=int, default=4, help="distinct requests per round")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_exchange(args.latency)
+    for coalesce in (False, True):
+        processor = build(base_url, args.callers, coalesce)
+        limiter = processor.client.rate_limiter
+        klines_weight = processor.request_weights[processor.url_path_to_get_candle]
+        for mode in ("threads", "tasks"):
+            weight_before = limiter.total_weight
+            if mode == "threads":
+                wall = run_threads(processor, args.callers, args.rounds, args.symbols)
+            else:
+                wall = processor.async_client.run(run_tasks(processor, args.callers, args.rounds, args.symbols))
+            weight = limiter.total_weight - weight_before
+            print(
+                f"coalescing {'on ' if coalesce else 'off'} {mode:>7}: {args.callers * args.rounds} calls, "
+                f"{weight // klines_weight:5d} requests sent, weight {weight:6d}, {wall:6.2f}s wall"
+            )
+        stats = processor.client.coalescing_stats
+        print(f"{'counters':>26}: {stats.sent} sent, {stats.coalesced} coalesced, {stats.saved_weight} weight saved")
+        processor.client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+End-to-end `get_account` latency through a warm daemon versus a fresh CLI process
+
+    python benchmarks/daemon_benchmark.py [--calls 1000] [--cold 10] [--latency 0.02]
+
+The daemon serves processors built against the local stand-in exchange.
+Calls go over one persistent connection, then over a new connection each,
+and the cold path starts an interpreter that builds, pings and uses its own
+processor per call, the way a shell loop of `cryptocli` runs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from timeit import default_timer as timer
+from typing import Callable, List
+
+from stand_in_server import APP_PATH, StandInHandler, start_server
+from daemon import CryptoDaemon
+from daemon_client import DaemonClient
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+
+ACCOUNT = {"uid": 42, "balances": [{"asset": "BTC", "free": "1.5", "locked": "0.5"}]}
+
+COLD_CALL = """
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+processor = BinanceExchangeProcessor(BinanceClient("key", base_path={base_url!r}, rate_limiter=None))
+processor.ping_client()
+with processor.client:
+    processor.get_account(None)
+"""
+
+
+class AccountHandler(StandInHandler):
+    payload = json.dumps(ACCOUNT).encode()
+
+
+def start_daemon(daemon: CryptoDaemon) -> Callable[[], None]:
+    """Serve the daemon on a background event loop, return the function stopping it"""
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(daemon.serve())
+
+    def serve() -> None:
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+        loop.close()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    while not os.path.exists(daemon.path):
+        time.sleep(0.01)
+
+    def stop() -> None:
+        loop.call_soon_threadsafe(task.cancel)
+        thread.join()
+
+    return stop
+
+
+def report(name: str, latencies: List[float]) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:>22}: p50 {quantiles[49] * 1000:8.2f}ms  p95 {quantiles[94] * 1000:8.2f}ms  "
+        f"p99 {quantiles[98] * 1000:8.2f}ms  ({len(latencies)} calls)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--cold", type=int, default=10, help="number of fresh interpreter runs, at least 2")
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated exchange latency in seconds")
+    args = parser.parse_args()
+
+    AccountHandler.latency = args.latency
+    server, base_url = start_server(AccountHandler)
+    path = os.path.join(tempfile.mkdtemp(), "daemon.sock")
+    daemon = CryptoDaemon(
+        lambda exchange, secret_key, api_key=None: BinanceExchangeProcessor(
+            BinanceClient(secret_key, base_path=base_url, rate_limiter=None)
+        ),
+        path,
+    )
+    stop = start_daemon(daemon)
+
+    with DaemonClient(path) as client:
+        client.call("binance", "key", "get_account")
+        warm = []
+        for _ in range(args.calls):
+            start = timer()
+            record = client.call("binance", "key", "get_account")
+            warm.append(timer() - start)
+            assert record["ok"], record
+    report("persistent connection", warm)
+
+    connected = []
+    for _ in range(args.calls):
+        start = timer()
+        with DaemonClient(path) as client:
+            client.call("binance", "key", "get_account")
+        connected.append(timer() - start)
+    report("connection per call", connected)
+
+    cold = []
+    for _ in range(args.cold):
+        start = timer()
+        subprocess.run([sys.executable, "-c", COLD_CALL.format(base_url=base_url)], cwd=APP_PATH, check=True)
+        cold.append(timer() - start)
+    report("fresh interpreter", cold)
+
+    stop()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Validated versus fast decoding of klines responses of about 1 MB and 50 MB
+
+    python benchmarks/decode_benchmark.py [--sizes 1 50] [--validation-rate 0.01]
+
+Every path starts from the raw response body: `json` plus one validated
+`CandleDetails` per kline, the fast decoder plus trusted construction with
+sampled validation, and the fast decoder straight into a `CandleSeries`.
+"""
+import argparse
+import json
+import random
+from timeit import default_timer as timer
+
+from requests.models import Response
+
+import stand_in_server  # noqa: F401 - puts the app on sys.path
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+from src.exchange_processors.fast_decode import orjson
+
+KLINE_BYTES = 170
+
+
+def klines_body(megabytes: int) -> bytes:
+    """Klines payload as the exchange sends it, values are strings"""
+    rng = random.Random(7)
+    klines, price = [], 20000.0
+    for index in range(megabytes * 2 ** 20 // KLINE_BYTES):
+        price += rng.gauss(0, 25)
+        open_time = 1_600_000_000_000 + index * 60_000
+        klines.append([
+            open_time,
+            f"{price:.8f}",
+            f"{price + 10:.8f}",
+            f"{price - 10:.8f}",
+            f"{price + 1:.8f}",
+            f"{rng.random() * 10:.8f}",
+            open_time + 59_999,
+            f"{rng.random() * 1e5:.8f}",
+            rng.randint(1, 1000),
+            f"{rng.random() * 5:.8f}",
+            f"{rng.random() * 5e4:.8f}",
+            "0",
+        ])
+    return json.dumps(klines).encode()
+
+
+def response_of(body: bytes) -> Response:
+    response = Response()
+    response.status_code = 200
+    response._content = body
+    return response
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 50], help="response sizes in MB")
+    parser.add_argument("--validation-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    client = BinanceClient("key", rate_limiter=None)
+    validated = BinanceExchangeProcessor(client)
+    fast = BinanceExchangeProcessor(client, fast_decode=True, validation_rate=args.validation_rate)
+    print(f"decoder: {'orjson' if orjson is not None else 'json (orjson is not installed)'}")
+
+    for size in args.sizes:
+        body = klines_body(size)
+        print(f"\n{len(body) / 2 ** 20:.1f} MB, {body.count(b'], [') + 1} klines")
+        baseline = None
+        for name, processor, as_series in (
+            ("json + validated models", validated, False),
+            ("fast + trusted models", fast, False),
+            ("json + series", validated, True),
+            ("fast + series", fast, True),
+        ):
+            start = timer()
+            processor.parse_candles("BTCUSDT", processor.decode(response_of(body)), as_series)
+            elapsed = timer() - start
+            baseline = baseline or elapsed
+            print(f"{name:>24}: {elapsed:8.3f}s  {baseline / elapsed:5.1f}x")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Streaming export of paginated 1m candles: rows/sec and peak RSS per format
+
+    python benchmarks/export_benchmark.py [--days 365] [--formats csv csv.gz json parquet]
+
+Every format is exported in its own process so the peak RSS of one export
+is not hidden by an earlier one.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from urllib.parse import parse_qs, urlparse
+
+from stand_in_server import StandInHandler, start_server
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.exchange_processors.binance.binance_exchange_processor import KLINES_PAGE_LIMIT, BinanceExchangeProcessor
+from src.export.exporters import create_exporter
+
+MINUTE = 60000
+DAY = 24 * 60 * MINUTE
+
+
+class PagedKlinesHandler(StandInHandler):
+    """Serve 1m klines pages from `startTime` up to `endTime`"""
+
+    def do_GET(self) -> None:
+        params = {key: int(values[0]) for key, values in parse_qs(urlparse(self.path).query).items() if key.endswith("Time")}
+        start, end = params["startTime"], params["endTime"]
+        klines = [
+            [t, "20000.1", "20010.2", "19990.3", "20005.4", "1.2345", t + MINUTE - 1, "24690.0", 42, "0.6", "12345.0", "0"]
+            for t in range(start, min(end, start + KLINES_PAGE_LIMIT * MINUTE), MINUTE)
+        ]
+        self.send_payload(200, json.dumps(klines).encode())
+
+
+def export(days: int, suffix: str) -> None:
+    """Export `days` of candles into a temporary file and print the stats as JSON"""
+    server, base_url = start_server(PagedKlinesHandler)
+    path = os.path.join(tempfile.mkdtemp(), f"candles.{suffix}")
+    with BinanceClient("key", base_path=base_url, rate_limiter=None) as client:
+        processor = BinanceExchangeProcessor(client, fast_decode=True)
+        pages = processor.iter_candle_pages("BTCUSDT", "1m", 0, days * DAY)
+        stats = create_exporter(path).write_all(pages)
+    server.shutdown()
+    print(json.dumps({**stats.dict(), "file_size": os.path.getsize(path)}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--formats", nargs="+", default=["csv", "csv.gz", "json", "json.gz", "parquet"])
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return export(args.days, args.child)
+
+    print(f"{args.days * DAY // MINUTE} candles\n")
+    print(f"{'format':>10} {'rows/s':>10} {'seconds':>8} {'peak RSS':>10} {'file':>10}")
+    for suffix in args.formats:
+        output = subprocess.run(
+            [sys.executable, __file__, "--days", str(args.days), "--child", suffix],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        stats = json.loads(output)
+        peak_rss = f"{stats['peak_rss'] / 2 ** 20:8.1f}MB" if stats["peak_rss"] is not None else f"{'n/a':>10}"
+        print(
+            f"{suffix:>10} {stats['rows_per_second']:10.0f} {stats['seconds']:8.2f} "
+            f"{peak_rss} {stats['file_size'] / 2 ** 20:8.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
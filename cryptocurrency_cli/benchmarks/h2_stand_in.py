@@ -0,0 +1,127 @@
+"""
+Local HTTP/2 mock of the exchange APIs
+
+Speaks cleartext HTTP/2 with prior knowledge, the way `HTTPClient(http2=True)`
+talks to an `http://` base url, and answers the paths `MockExchangeHandler`
+routes with the same payloads after `latency` seconds. Every stream is
+served concurrently on the event loop of the server thread, response bodies
+respect the flow control windows of the client. `connections` counts the
+sockets clients opened.
+"""
+import asyncio
+import threading
+from typing import Dict, Tuple
+
+from h2.config import H2Configuration
+from h2.connection import H2Connection
+from h2.events import ConnectionTerminated, RequestReceived, StreamEnded, StreamReset, WindowUpdated
+
+from mock_exchange import build_payload, route_request
+
+
+class H2StandInProtocol(asyncio.Protocol):
+    """One HTTP/2 connection of the stand-in"""
+
+    def __init__(self, server: "H2StandInServer"):
+        self.server = server
+        self.connection = H2Connection(H2Configuration(client_side=False, header_encoding="utf-8"))
+        self.transport = None
+        self.targets: Dict[int, str] = {}
+        # Body bytes of the streams still waiting for flow control window
+        self.pending: Dict[int, bytes] = {}
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self.server.connections += 1
+        self.transport = transport
+        self.connection.initiate_connection()
+        self.flush()
+
+    def data_received(self, data: bytes) -> None:
+        for event in self.connection.receive_data(data):
+            if isinstance(event, RequestReceived):
+                self.targets[event.stream_id] = dict(event.headers)[":path"]
+            elif isinstance(event, StreamEnded):
+                target = self.targets.pop(event.stream_id, "/")
+                asyncio.get_running_loop().call_later(self.server.latency, self.respond, event.stream_id, target)
+            elif isinstance(event, StreamReset):
+                self.targets.pop(event.stream_id, None)
+                self.pending.pop(event.stream_id, None)
+            elif isinstance(event, WindowUpdated):
+                for stream_id in list(self.pending):
+                    self.send_body(stream_id)
+            elif isinstance(event, ConnectionTerminated):
+                self.transport.close()
+        self.flush()
+
+    def respond(self, stream_id: int, target: str) -> None:
+        route, rows = route_request(target, self.server.rows)
+        body = build_payload(route, rows)
+        self.connection.send_headers(stream_id, [
+            (":status", "200" if route != "unknown" else "404"),
+            ("content-type", "application/json"),
+            ("content-length", str(len(body))),
+        ])
+        self.pending[stream_id] = body
+        self.send_body(stream_id)
+        self.flush()
+
+    def send_body(self, stream_id: int) -> None:
+        """Send as much of the body as the windows allow, the rest on the next window update"""
+        body = self.pending[stream_id]
+        size = min(self.connection.local_flow_control_window(stream_id), len(body))
+        frame_size = self.connection.max_outbound_frame_size
+        for start in range(0, size, frame_size):
+            self.connection.send_data(stream_id, body[start:min(start + frame_size, size)])
+        body = body[size:]
+        if body:
+            self.pending[stream_id] = body
+        else:
+            del self.pending[stream_id]
+            self.connection.end_stream(stream_id)
+
+    def flush(self) -> None:
+        data = self.connection.data_to_send()
+        if data:
+            self.transport.write(data)
+
+
+class H2StandInServer:
+    """Stand-in served from a daemon thread, `shutdown()` stops it"""
+
+    def __init__(self, latency: float = 0.0, rows: int = 100):
+        self.latency = latency
+        self.rows = rows
+        self.connections = 0
+        self.loop = asyncio.new_event_loop()
+        self.started = threading.Event()
+        self.task = self.loop.create_task(self.serve())
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.port = 0
+
+    async def serve(self) -> None:
+        server = await self.loop.create_server(lambda: H2StandInProtocol(self), "127.0.0.1", 0)
+        self.port = server.sockets[0].getsockname()[1]
+        self.started.set()
+        async with server:
+            await server.serve_forever()
+
+    def run(self) -> None:
+        try:
+            self.loop.run_until_complete(self.task)
+        except asyncio.CancelledError:
+            pass
+
+    def start(self) -> Tuple["H2StandInServer", str]:
+        """Start serving and return the server with its base url"""
+        self.thread.start()
+        self.started.wait()
+        return self, f"http://127.0.0.1:{self.port}"
+
+    def shutdown(self) -> None:
+        self.loop.call_soon_threadsafe(self.task.cancel)
+        self.thread.join()
+
+
+def start_h2_stand_in(latency: float = 0.0, rows: int = 100) -> Tuple[H2StandInServer, str]:
+    """Start the HTTP/2 stand-in in a daemon thread and return it with its base url"""
+    return H2StandInServer(latency, rows).start()
@@ -0,0 +1,87 @@
+"""
+HTTP/2 multiplexing versus the HTTP/1.1 connection pool
+
+    python benchmarks/http2_benchmark.py [--concurrency 16 64] [--seconds 2] [--latency 0.02] [--rows 100]
+
+`show_candles` runs in threads, then in tasks of one event loop, against the
+mock exchange over HTTP/1.1 with a pool as large as the concurrency, and
+against the HTTP/2 stand-in with `http2=True`. Coalescing is disabled so
+every call is a request. Throughput, latency and the sockets the clients
+opened are reported per transport, mode and level.
+"""
+import argparse
+from typing import Tuple
+
+from client_stack_benchmark import run_tasks, run_threads, summarize
+from h2_stand_in import start_h2_stand_in
+from mock_exchange import MockExchangeHandler
+from stand_in_server import start_server
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+
+
+class CountingHandler(MockExchangeHandler):
+    """Mock exchange counting the connections it accepted"""
+
+    connections = 0
+
+    def setup(self) -> None:
+        CountingHandler.connections += 1
+        super().setup()
+
+
+def processor(base_url: str, concurrency: int, http2: bool) -> BinanceExchangeProcessor:
+    client = BinanceClient(
+        "key", base_path=base_url, pool_maxsize=concurrency, rate_limiter=None, coalesce=False, http2=http2
+    )
+    return BinanceExchangeProcessor(client, client.to_async(concurrency), account_ttl=None)
+
+
+def measure(base_url: str, concurrency: int, seconds: float, http2: bool, mode: str) -> Tuple[list, float]:
+    tested = processor(base_url, concurrency, http2)
+    if mode == "threads":
+        operation = lambda: tested.show_candles("BTCUSDT", "1h")
+        operation()
+        result = run_threads(operation, concurrency, seconds)
+        tested.client.close()
+        return result
+
+    async def run() -> Tuple[list, float]:
+        await tested.show_candles_async("BTCUSDT", "1h")
+        return await run_tasks(lambda: tested.show_candles_async("BTCUSDT", "1h"), concurrency, seconds)
+
+    return tested.async_client.run(run())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[16, 64])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated exchange latency in seconds")
+    parser.add_argument("--rows", type=int, default=100, help="klines per payload")
+    args = parser.parse_args()
+
+    CountingHandler.latency, CountingHandler.rows = args.latency, args.rows
+    http1_server, http1_url = start_server(CountingHandler)
+    http2_server, http2_url = start_h2_stand_in(args.latency, args.rows)
+
+    print(f"{'transport':>9} {'mode':>7} {'workers':>7} {'ops/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'sockets':>7}")
+    for mode in ("threads", "tasks"):
+        for concurrency in args.concurrency:
+            for transport, base_url in (("HTTP/1.1", http1_url), ("HTTP/2", http2_url)):
+                http2 = transport == "HTTP/2"
+                before = http2_server.connections if http2 else CountingHandler.connections
+                latencies, wall = measure(base_url, concurrency, args.seconds, http2, mode)
+                sockets = (http2_server.connections if http2 else CountingHandler.connections) - before
+                result = summarize(transport, concurrency, latencies, wall)
+                print(
+                    f"{transport:>9} {mode:>7} {concurrency:7d} {result['throughput']:8.0f} "
+                    f"{result['p50_ms']:8.2f} {result['p99_ms']:8.2f} {sockets:7d}"
+                )
+
+    http1_server.shutdown()
+    http2_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Requests/sec of one-shot `requests.get` calls vs the pooled `HTTPClient` session
+
+    python benchmarks/http_pool_benchmark.py [--requests 2000]
+"""
+import argparse
+from timeit import default_timer as timer
+
+import requests
+
+from stand_in_server import start_server
+from src.clients.http_client import HTTPClient, RequestType
+
+
+def run_unpooled(base_path: str, count: int) -> float:
+    """Fresh connection per call, the way `HTTPClient` used to work"""
+    start = timer()
+    for _ in range(count):
+        requests.get(base_path + "/klines", params={"symbol": "BTCUSDT"})
+    return count / (timer() - start)
+
+
+def run_pooled(base_path: str, count: int) -> float:
+    """Every call goes through the keep-alive session of the client"""
+    with HTTPClient(headers={}, supported_codes=[200], base_path=base_path) as client:
+        start = timer()
+        for _ in range(count):
+            client.request(RequestType.GET, "/klines", params={"symbol": "BTCUSDT"})
+        return count / (timer() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    server, base_path = start_server()
+    try:
+        unpooled = run_unpooled(base_path, args.requests)
+        pooled = run_pooled(base_path, args.requests)
+    finally:
+        server.shutdown()
+
+    print(f"unpooled requests.get : {unpooled:10.1f} req/s")
+    print(f"pooled HTTPClient     : {pooled:10.1f} req/s")
+    print(f"speedup               : {pooled / unpooled:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Vectorized indicators over 1e3 - 1e7 candles and the cost of one incremental update
+
+    python benchmarks/indicators_benchmark.py [--max-exponent 7]
+"""
+import argparse
+from timeit import default_timer as timer
+
+import numpy as np
+
+import stand_in_server  # noqa: F401 - puts the app on sys.path
+from src.exchange_processors.candle_series import CandleSeries
+from src.indicators.indicators import (
+    IncrementalBollingerBands,
+    IncrementalEMA,
+    IncrementalRSI,
+    IncrementalSMA,
+    IncrementalVWAP,
+    bollinger_bands,
+    ema,
+    rsi,
+    sma,
+    vwap,
+)
+
+UPDATES = 10_000
+
+
+def random_series(size: int) -> CandleSeries:
+    """Random walk candles"""
+    rng = np.random.default_rng(7)
+    close = 20000 + np.cumsum(rng.normal(0, 25, size))
+    spread = rng.random(size) * 20
+    return CandleSeries(
+        "BTCUSDT",
+        np.arange(size, dtype=np.int64) * 60000,
+        close - rng.normal(0, 5, size),
+        close + spread,
+        close - spread,
+        close,
+        rng.random(size) * 10,
+    )
+
+
+def python_sma(values: list, window: int) -> list:
+    """Plain Python loop, the way it is done over a list of `CandleDetails`"""
+    return [sum(values[i - window + 1:i + 1]) / window for i in range(window - 1, len(values))]
+
+
+def measure(function, *args) -> float:
+    start = timer()
+    function(*args)
+    return timer() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-exponent", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'candles':>10} {'sma':>9} {'ema':>9} {'rsi':>9} {'vwap':>9} {'bollinger':>9} {'py sma':>9}  (seconds)")
+    for exponent in range(3, args.max_exponent + 1):
+        series = random_series(10 ** exponent)
+        timings = [
+            measure(sma, series.close, 20),
+            measure(ema, series.close, 20),
+            measure(rsi, series.close, 14),
+            measure(vwap, series.high, series.low, series.close, series.volume, 20),
+            measure(bollinger_bands, series.close, 20),
+        ]
+        loop = measure(python_sma, series.close.tolist(), 20) if exponent <= 5 else float("nan")
+        print(f"{10 ** exponent:>10} " + " ".join(f"{timing:9.4f}" for timing in timings) + f" {loop:9.4f}")
+
+    series = random_series(10 ** 5 + UPDATES)
+    history, appended = series[:10 ** 5], series[10 ** 5:]
+    print(f"\nincremental update after {len(history)} candles, mean of {UPDATES} updates:")
+    for name, indicator, seed, update in (
+        ("sma", IncrementalSMA(20), lambda i: i.extend(history.close), lambda i, k: i.update(appended.close[k])),
+        ("ema", IncrementalEMA(20), lambda i: i.extend(history.close), lambda i, k: i.update(appended.close[k])),
+        ("rsi", IncrementalRSI(14), lambda i: i.extend(history.close), lambda i, k: i.update(appended.close[k])),
+        (
+            "vwap",
+            IncrementalVWAP(20),
+            lambda i: i.extend(history.high, history.low, history.close, history.volume),
+            lambda i, k: i.update(appended.high[k], appended.low[k], appended.close[k], appended.volume[k]),
+        ),
+        (
+            "bollinger",
+            IncrementalBollingerBands(20),
+            lambda i: i.extend(history.close),
+            lambda i, k: i.update(appended.close[k]),
+        ),
+    ):
+        seed(indicator)
+        start = timer()
+        for k in range(UPDATES):
+            update(indicator, k)
+        print(f"{name:>10}: {(timer() - start) / UPDATES * 1e6:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
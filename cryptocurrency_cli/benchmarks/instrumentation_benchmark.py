@@ -0,0 +1,74 @@
+"""
+Cost of the request instrumentation, disabled and enabled, and a sample of its metrics
+
+    python benchmarks/instrumentation_benchmark.py [--requests 2000] [--rounds 3] [--metrics metrics.prom] [--port 0]
+
+`show_candles` runs against the mock exchange with no instrumentation and
+with one recording every phase and calling a hook, alternately for
+`--rounds` rounds, the best round of each is reported. The metrics are written
+to a file and scraped once from the local endpoint.
+"""
+import argparse
+import tempfile
+import urllib.request
+from timeit import default_timer as timer
+
+from mock_exchange import start_mock_exchange
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.clients.instrumentation import RequestInstrumentation, RequestTiming
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+
+
+def run(processor: BinanceExchangeProcessor, count: int) -> float:
+    """Seconds per `show_candles` call"""
+    start = timer()
+    for _ in range(count):
+        processor.show_candles("BTCUSDT", "1h")
+    return (timer() - start) / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--metrics", default=tempfile.mktemp(suffix=".prom"), help="file the metrics are written to")
+    parser.add_argument("--port", type=int, default=0, help="port of the metrics endpoint, any free one by default")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_exchange(rows=args.rows)
+    instrumentation = RequestInstrumentation()
+    events = []
+
+    def hook(timing: RequestTiming) -> None:
+        events.append(timing)
+
+    instrumentation.add_hook(hook)
+
+    plain = BinanceExchangeProcessor(BinanceClient("key", base_path=base_url, rate_limiter=None))
+    instrumented = BinanceExchangeProcessor(
+        BinanceClient("key", base_path=base_url, rate_limiter=None, instrumentation=instrumentation)
+    )
+    disabled = enabled = float("inf")
+    for _ in range(args.rounds):
+        disabled = min(disabled, run(plain, args.requests))
+        enabled = min(enabled, run(instrumented, args.requests))
+    print(f"instrumentation disabled: {disabled * 1e6:8.1f}us per call")
+    print(f"instrumentation enabled : {enabled * 1e6:8.1f}us per call ({(enabled - disabled) * 1e6:+.1f}us)")
+    print(f"hook calls              : {len(events)}, last phases {events[-1].phases}")
+
+    instrumentation.write_prometheus(args.metrics)
+    metrics = instrumentation.serve_prometheus(args.port)
+    host, port = metrics.server_address
+    with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+        scraped = response.read().decode()
+    print(f"\nmetrics written to {args.metrics}, scraped {len(scraped)} bytes from http://{host}:{port}/metrics:")
+    print("\n".join(line for line in scraped.splitlines() if not line.startswith("#") and "_bucket" not in line))
+    metrics.shutdown()
+    plain.client.close()
+    instrumented.client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
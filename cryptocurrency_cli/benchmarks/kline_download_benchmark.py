@@ -0,0 +1,85 @@
+"""
+Large klines downloads, buffered versus streamed, compressed versus not
+
+    python benchmarks/kline_download_benchmark.py [--rows 1000 50000] [--bandwidth 5000000] [--latency 0.02]
+
+The mock exchange sends the klines at `--bandwidth` bytes per second, gzip
+compressed when the client accepts it. `show_candles` buffers the whole body
+before parsing it, `iter_candles` parses each candle as its bytes arrive and
+the candles are only counted. Reported per mode are the bytes on the wire,
+the time to the first candle, the time to the last one and the peak memory
+traced while downloading.
+"""
+import argparse
+import tracemalloc
+from timeit import default_timer as timer
+from typing import Callable, Iterable, Tuple
+
+from mock_exchange import start_mock_exchange
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.clients.transfer import TransferStats
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+
+
+def buffered(processor: BinanceExchangeProcessor, rows: int) -> Iterable:
+    return processor.show_candles("BTCUSDT", "1h", rows)
+
+
+def streamed(processor: BinanceExchangeProcessor, rows: int) -> Iterable:
+    return processor.iter_candles("BTCUSDT", "1h", rows)
+
+
+def download(fetch: Callable, processor: BinanceExchangeProcessor, rows: int) -> Tuple[float, float]:
+    """Seconds to the first and to the last candle"""
+    start = timer()
+    first, count = None, 0
+    for _ in fetch(processor, rows):
+        if first is None:
+            first = timer() - start
+        count += 1
+    assert count == rows, count
+    return first, timer() - start
+
+
+def peak_memory(fetch: Callable, processor: BinanceExchangeProcessor, rows: int) -> int:
+    tracemalloc.start()
+    try:
+        for _ in fetch(processor, rows):
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 50000], help="klines per response")
+    parser.add_argument("--bandwidth", type=float, default=5e6, help="bytes per second of the mock exchange")
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated exchange latency in seconds")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_exchange(args.latency, max(args.rows), args.bandwidth)
+    print(f"{'rows':>6} {'mode':>8} {'encoding':>8} {'wire KB':>8} {'saved':>6} {'first ms':>9} {'last ms':>8} {'peak MB':>8}")
+    for rows in args.rows:
+        for compress in (False, True):
+            for mode, fetch in (("buffered", buffered), ("streamed", streamed)):
+                client = BinanceClient("key", base_path=base_url, rate_limiter=None, compress=compress)
+                processor = BinanceExchangeProcessor(client, account_ttl=None)
+                # Connect and import the session stack before measuring
+                processor.show_candles("BTCUSDT", "1h", 1)
+                client.transfer_stats = TransferStats()
+                first, last = download(fetch, processor, rows)
+                stats = client.transfer_stats.copy()
+                peak = peak_memory(fetch, processor, rows)
+                client.close()
+                print(
+                    f"{rows:6d} {mode:>8} {'gzip' if compress else 'identity':>8} {stats.wire_bytes / 1024:8.0f} "
+                    f"{stats.saved_bytes / stats.body_bytes:6.0%} {first * 1000:9.1f} {last * 1000:8.1f} "
+                    f"{peak / 2 ** 20:8.2f}"
+                )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
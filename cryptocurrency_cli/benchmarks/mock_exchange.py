@@ -0,0 +1,205 @@
+"""
+Local mock of the Binance and Bitfinex HTTP APIs used by the benchmark suite
+
+Unlike `StandInHandler`, which answers every path with one payload, the mock
+routes the paths the processors use to payloads of their real shape:
+
+    Binance   GET /klines   POST /order   GET /account   GET /exchangeInfo   GET /ticker/24hr
+    Bitfinex  GET /v1/pubticker/<symbol>  POST /v1/order/new  GET /v1/balances
+              GET /v2/candles/<key>/hist  GET /v1/symbols_details  GET /v2/tickers
+
+`latency` delays every response and `rows` sets the number of klines,
+candles, balances and symbols in a payload, tickers answer as many
+symbols as they ask for. Symbols are `BTCUSDT` and
+`SYM<i>USDT` on Binance, `btcusd` and `sym<i>usd` on Bitfinex. Payloads are built once per path and size.
+
+Bodies are gzip or deflate compressed when the request accepts it, and with
+`bandwidth` they are written in chunks at that many bytes per second, the
+way a large body trickles in from a remote exchange.
+"""
+import gzip
+import json
+import time
+import zlib
+from functools import lru_cache
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from stand_in_server import StandInHandler, StandInServer, start_server
+
+OPEN_TIME = 1667260800000
+HOUR = 3600000
+# Bytes written at a time when the bandwidth is limited
+WRITE_CHUNK_SIZE = 16 * 1024
+
+
+@lru_cache(maxsize=None)
+def build_payload(route: str, rows: int) -> bytes:
+    """Body of the route with `rows` klines, candles or balances"""
+    match route:
+        case "binance.klines":
+            payload = [
+                [OPEN_TIME + i * HOUR, "20000.00", "20100.00", "19900.00", "20050.00", "12.50", OPEN_TIME + (i + 1) * HOUR - 1]
+                for i in range(rows)
+            ]
+        case "binance.account":
+            payload = {
+                "uid": 42,
+                "balances": [{"asset": f"COIN{i}", "free": "1.50000000", "locked": "0.50000000"} for i in range(rows)],
+            }
+        case "binance.order":
+            payload = {"status": "NEW", "price": "20000.00", "clientOrderId": "mock"}
+        case "binance.exchangeInfo":
+            payload = {
+                "timezone": "UTC",
+                "symbols": [
+                    {
+                        "symbol": "BTCUSDT" if i == 0 else f"SYM{i}USDT",
+                        "status": "TRADING",
+                        "filters": [
+                            {"filterType": "PRICE_FILTER", "minPrice": "0.01", "maxPrice": "1000000.00", "tickSize": "0.01"},
+                            {"filterType": "LOT_SIZE", "minQty": "0.00001", "maxQty": "9000.00", "stepSize": "0.00001"},
+                            {"filterType": "NOTIONAL", "minNotional": "5.00", "maxNotional": "9000000.00"},
+                        ],
+                    }
+                    for i in range(rows)
+                ],
+            }
+        case "binance.tickers":
+            payload = [
+                {
+                    "symbol": "BTCUSDT" if i == 0 else f"SYM{i}USDT",
+                    "lastPrice": "20050.00",
+                    "priceChangePercent": "-1.25",
+                    "volume": "1250.50",
+                }
+                for i in range(rows)
+            ]
+        case "bitfinex.tickers":
+            payload = [
+                ["tBTCUSD" if i == 0 else f"tSYM{i}USD", 20040.0, 1.5, 20050.0, 2.5, 250.0, 0.0125, 20050.0, 1250.5, 20100.0, 19900.0]
+                for i in range(rows)
+            ]
+        case "bitfinex.pubticker":
+            payload = {"last_price": "20050.0", "timestamp": "1667260800.0", "volume": "1250.5"}
+        case "bitfinex.candles":
+            payload = [[OPEN_TIME + i * HOUR, 20000.0, 20050.0, 20100.0, 19900.0, 12.5] for i in range(rows)]
+        case "bitfinex.balances":
+            payload = [{"type": "exchange", "currency": f"coin{i}", "amount": "2.0", "available": "1.5"} for i in range(rows)]
+        case "bitfinex.symbols_details":
+            payload = [
+                {
+                    "pair": "btcusd" if i == 0 else f"sym{i}usd",
+                    "price_precision": 5,
+                    "minimum_order_size": "0.0006",
+                    "maximum_order_size": "2000.0",
+                }
+                for i in range(rows)
+            ]
+        case "bitfinex.order":
+            payload = {"id": 1, "symbol": "btcusd", "price": "20000.0", "is_live": True}
+        case _:
+            payload = {"status": "ok"}
+    return json.dumps(payload).encode()
+
+
+@lru_cache(maxsize=None)
+def encode_payload(route: str, rows: int, encoding: Optional[str]) -> bytes:
+    """Body of the route compressed with `encoding`, `None` leaves it as is"""
+    payload = build_payload(route, rows)
+    match encoding:
+        case "gzip":
+            return gzip.compress(payload, compresslevel=6, mtime=0)
+        case "deflate":
+            return zlib.compress(payload, 6)
+        case _:
+            return payload
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Encoding of the response, the first of gzip and deflate the request accepts"""
+    accepted = {encoding.split(";")[0].strip() for encoding in accept_encoding.split(",")}
+    for encoding in ("gzip", "deflate"):
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def route_request(target: str, max_rows: int) -> Tuple[str, int]:
+    """Route of a request target, path and query, and the number of rows it asks for, at most `max_rows`"""
+    url = urlparse(target)
+    path = url.path
+    query = parse_qs(url.query)
+    limit = query.get("limit")
+    rows = min(int(limit[0]), max_rows) if limit else max_rows
+    if path == "/v2/tickers":
+        return "bitfinex.tickers", len(query["symbols"][0].split(","))
+    if path.endswith("/ticker/24hr"):
+        return "binance.tickers", len(json.loads(query["symbols"][0]))
+    if path.startswith("/v1/pubticker/"):
+        return "bitfinex.pubticker", rows
+    if path.startswith("/v2/candles/"):
+        return "bitfinex.candles", rows
+    if path == "/v1/balances":
+        return "bitfinex.balances", rows
+    if path.startswith("/v1/order/"):
+        return "bitfinex.order", rows
+    if path == "/v1/symbols_details":
+        return "bitfinex.symbols_details", rows
+    for route in ("klines", "account", "order", "exchangeInfo"):
+        if path.endswith("/" + route):
+            return f"binance.{route}", rows
+    return "unknown", rows
+
+
+class MockExchangeHandler(StandInHandler):
+    """Answer the exchange paths with payloads of their real shape after `latency` seconds"""
+
+    rows: int = 100
+    bandwidth: Optional[float] = None
+
+    def route(self) -> Tuple[str, int]:
+        """Route of the request path and the number of rows it asks for"""
+        return route_request(self.path, self.rows)
+
+    def do_GET(self) -> None:
+        self.respond()
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.respond()
+
+    def respond(self) -> None:
+        route, rows = self.route()
+        encoding = negotiate_encoding(self.headers.get("Accept-Encoding", ""))
+        time.sleep(self.latency)
+        self.send_payload(200 if route != "unknown" else 404, encode_payload(route, rows, encoding), encoding)
+
+    def send_payload(self, status: int, payload: bytes, encoding: Optional[str] = None) -> None:
+        """Write the status, headers and body of the response, at `bandwidth` when it is set"""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if self.bandwidth is None:
+            self.wfile.write(payload)
+            return
+        for start in range(0, len(payload), WRITE_CHUNK_SIZE):
+            chunk = payload[start:start + WRITE_CHUNK_SIZE]
+            self.wfile.write(chunk)
+            self.wfile.flush()
+            time.sleep(len(chunk) / self.bandwidth)
+
+
+def start_mock_exchange(
+    latency: float = 0.0, rows: int = 100, bandwidth: Optional[float] = None
+) -> Tuple[StandInServer, str]:
+    """Start the mock in a daemon thread and return it with its base url"""
+    handler = type(
+        "ConfiguredMockExchangeHandler",
+        (MockExchangeHandler,),
+        {"latency": latency, "rows": rows, "bandwidth": bandwidth},
+    )
+    return start_server(handler)
@@ -0,0 +1,65 @@
+"""
+Placing a batch of orders one by one versus through `place_orders`
+
+    python benchmarks/order_batch_benchmark.py [--orders 50] [--latency 0.05] [--concurrency 1 5 10]
+"""
+import argparse
+import json
+import statistics
+import time
+from timeit import default_timer as timer
+from urllib.parse import parse_qs, urlparse
+
+from stand_in_server import StandInHandler, start_server
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+from src.exchange_processors.models import OrderRequest
+
+
+class OrderHandler(StandInHandler):
+    """Accept every order and echo its client order id"""
+
+    def do_POST(self) -> None:
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.latency)
+        payload = {"status": "NEW", "price": params.get("price", "0"), "clientOrderId": params.get("newClientOrderId")}
+        self.send_payload(200, json.dumps(payload).encode())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated exchange latency in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 10])
+    args = parser.parse_args()
+
+    OrderHandler.latency = args.latency
+    server, base_url = start_server(OrderHandler)
+    orders = [
+        OrderRequest(symbol="BTCUSDT", side="BUY" if i % 2 else "SELL", type="LIMIT", quantity=0.001, price=20000 + i)
+        for i in range(args.orders)
+    ]
+
+    with BinanceClient("key", base_path=base_url, rate_limiter=None) as client:
+        processor = BinanceExchangeProcessor(client)
+
+        start = timer()
+        for order in orders:
+            processor.place_order(order.symbol, order.side, order.type, order.quantity, order.price)
+        print(f"{'sequential':>14}: {timer() - start:7.3f}s")
+
+        for concurrency in args.concurrency:
+            start = timer()
+            results = processor.place_orders(orders, max_concurrency=concurrency)
+            elapsed = timer() - start
+            latencies = sorted(result.latency * 1000 for result in results)
+            print(
+                f"{f'batch x{concurrency}':>14}: {elapsed:7.3f}s"
+                f"  p50 {statistics.median(latencies):6.1f}ms  max {latencies[-1]:6.1f}ms"
+            )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
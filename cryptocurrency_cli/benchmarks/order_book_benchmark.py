@@ -0,0 +1,81 @@
+"""
+Replay of synthetic depth diffs into a local order book replica
+
+    python benchmarks/order_book_benchmark.py [--diffs 100000] [--levels 5000] [--gap-every 0]
+
+Reports applied diffs/sec, level updates/sec and the cost of reading the
+best bid/ask and pricing a market order from the replica.
+"""
+import argparse
+import random
+from timeit import default_timer as timer
+
+import stand_in_server  # noqa: F401 - puts the app on sys.path
+from src.exchange_processors.models import OrderBookSnapshot
+from src.order_book.order_book import OrderBookReplica
+
+TICK = 0.01
+MID = 20000.0
+READS = 100_000
+
+
+def snapshot(levels: int, last_update_id: int) -> OrderBookSnapshot:
+    """Book with `levels` levels on each side around `MID`"""
+    return OrderBookSnapshot(
+        last_update_id=last_update_id,
+        bids=[(round(MID - (i + 1) * TICK, 2), 1.0) for i in range(levels)],
+        asks=[(round(MID + (i + 1) * TICK, 2), 1.0) for i in range(levels)],
+    )
+
+
+def synthetic_diffs(count: int, levels: int, changes: int):
+    """Depth diffs as streamed, prices and quantities are strings and a quantity of 0 removes the level"""
+    rng = random.Random(7)
+    for update_id in range(1, count + 1):
+        bids, asks = [], []
+        for _ in range(changes):
+            offset = int(rng.expovariate(1 / (levels / 20))) + 1
+            quantity = "0" if rng.random() < 0.3 else f"{rng.random() * 5:.4f}"
+            side, sign = (bids, -1) if rng.random() < 0.5 else (asks, 1)
+            side.append([f"{MID + sign * offset * TICK:.2f}", quantity])
+        yield update_id, update_id, bids, asks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--diffs", type=int, default=100_000)
+    parser.add_argument("--levels", type=int, default=5000)
+    parser.add_argument("--changes", type=int, default=10, help="level changes per diff")
+    parser.add_argument("--gap-every", type=int, default=0, help="drop every n-th diff to force resyncs")
+    args = parser.parse_args()
+
+    diffs = list(synthetic_diffs(args.diffs, args.levels, args.changes))
+    replica = OrderBookReplica("BTCUSDT", lambda: snapshot(args.levels, replica.book.last_update_id + 1))
+    replica.resync()
+    replica.resyncs = 0
+
+    start = timer()
+    for first_update_id, final_update_id, bids, asks in diffs:
+        if args.gap_every and first_update_id % args.gap_every == 0:
+            continue
+        replica.apply_diff(first_update_id, final_update_id, bids, asks)
+    elapsed = timer() - start
+
+    print(f"applied {replica.updates} diffs in {elapsed:.3f}s")
+    print(f"{replica.updates / elapsed:12.0f} diffs/s")
+    print(f"{replica.updates * args.changes / elapsed:12.0f} level updates/s")
+    print(f"gaps {replica.gaps}, resyncs {replica.resyncs}")
+    print(f"book: {len(replica.book.bids)} bids, {len(replica.book.asks)} asks, heaps {len(replica.book.bids.heap)}/{len(replica.book.asks.heap)}")
+
+    for name, read in (
+        ("best bid/ask", lambda: (replica.best_bid(), replica.best_ask())),
+        ("price 10 BTC", lambda: replica.price_for("BUY", 10)),
+    ):
+        start = timer()
+        for _ in range(READS):
+            read()
+        print(f"{name:>14}: {(timer() - start) / READS * 1e6:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
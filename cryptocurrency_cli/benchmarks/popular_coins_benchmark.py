@@ -0,0 +1,82 @@
+"""
+Popular coins view rendered from a snapshot versus fetched at startup
+
+    python benchmarks/popular_coins_benchmark.py [--coins 20] [--latency 0.05] [--repeat 20]
+
+Against the mock exchange the tickers of `--coins` coins are fetched one
+request per coin, then in one batched request, the way a main page waiting
+for the network would start. The snapshot path reads what the background
+refresher stored, cold from disk in a new store and warm from memory. Last,
+a refresher is started on a stale snapshot: the view is still served at
+once while the refresh lands in the background.
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from timeit import default_timer as timer
+from typing import Callable
+
+from mock_exchange import start_mock_exchange
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+from src.popular_coins.popular_coins import PopularCoins
+from src.storage.ticker_snapshots import TickerSnapshotStore
+
+
+def median_ms(operation: Callable, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = timer()
+        operation()
+        timings.append(timer() - start)
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--coins", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated exchange latency in seconds")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    server, base_url = start_mock_exchange(args.latency)
+    # The mock names its symbols BTCUSDT, SYM1USDT, ...
+    coins = ["BTC"] + [f"SYM{i}" for i in range(1, args.coins)]
+    client = BinanceClient("key", base_path=base_url, rate_limiter=None)
+    processor = BinanceExchangeProcessor(client, account_ttl=None)
+    processor.fetch_tickers(["BTCUSDT"])
+
+    with tempfile.TemporaryDirectory() as root:
+        popular_coins = PopularCoins(processor, TickerSnapshotStore(root), coins)
+        repeat = max(1, args.repeat // 4)
+        per_coin = median_ms(lambda: [processor.fetch_tickers([symbol]) for symbol in popular_coins.symbols], repeat)
+        batched = median_ms(popular_coins.refresh, repeat)
+        cold = median_ms(lambda: PopularCoins(processor, TickerSnapshotStore(root), coins).snapshot(), args.repeat)
+        warm = median_ms(popular_coins.snapshot, args.repeat)
+        print(f"{len(coins)} coins, {args.latency * 1000:.0f}ms exchange latency, median ms to the tickers of the view")
+        print(f"  fetched, one request per coin  {per_coin:9.2f}  ({len(coins)} requests)")
+        print(f"  fetched, one batched request   {batched:9.2f}  (1 request)")
+        print(f"  snapshot read cold from disk   {cold:9.3f}")
+        print(f"  snapshot read warm from memory {warm:9.3f}")
+
+        stale = PopularCoins(processor, TickerSnapshotStore(root), coins, refresh_interval=0.5)
+        time.sleep(0.6)
+        start = timer()
+        snapshot = stale.start().snapshot()
+        served = timer() - start
+        while stale.snapshot().fetched_at == snapshot.fetched_at:
+            time.sleep(0.001)
+        refreshed = timer() - start
+        stale.stop()
+        print(
+            f"  stale snapshot served in {served * 1000:.3f}ms, {snapshot.age:.1f}s old, "
+            f"refreshed in the background after {refreshed * 1000:.1f}ms"
+        )
+
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Local stand-in for the exchange HTTP API used by the benchmarks
+
+The server speaks HTTP/1.1 with `Content-Length` on every response, so clients
+are able to keep connections alive between requests.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "app")
+if APP_PATH not in sys.path:
+    sys.path.insert(0, APP_PATH)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answer every request with a small JSON payload after `latency` seconds"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    payload: bytes = json.dumps({"status": "ok"}).encode()
+    latency: float = 0.0
+
+    def do_GET(self) -> None:
+        time.sleep(self.latency)
+        self.send_payload(200, self.payload)
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.latency)
+        self.send_payload(200, self.payload)
+
+    def send_payload(self, status: int, payload: bytes) -> None:
+        """Write the status, headers and body of the response"""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args) -> None:
+        """Keep the benchmark output clean"""
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Threaded server with a listen backlog large enough for concurrent clients"""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def start_server(handler=StandInHandler) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the server in a daemon thread and return it with its base url"""
+    server = StandInServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
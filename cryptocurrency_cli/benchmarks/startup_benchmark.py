@@ -0,0 +1,112 @@
+"""
+Startup time of the `cryptocli` command, enforced against a budget
+
+    python benchmarks/startup_benchmark.py [--runs 10] [--budget 200] [--top 10]
+
+Every scenario runs in a fresh interpreter: `--help`, and the CLI up to its
+first prompt for each exchange (processor built and pinged). The median wall
+time over a bare interpreter is compared with `--budget` milliseconds, and a
+`-X importtime` report lists the slowest imports of every scenario together
+with modules it should not have loaded. Exits with 1 when a scenario is over
+budget or loads a module of another exchange.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from timeit import default_timer as timer
+from typing import Dict, List, Tuple
+
+from stand_in_server import APP_PATH
+
+STARTUP = "import app; app.create_processor({exchange!r}, 'key').ping_client()"
+
+SCENARIOS: Dict[str, List[str]] = {
+    "help": ["app.py", "--help"],
+    "binance": ["-c", STARTUP.format(exchange="binance")],
+    "bitfinex": ["-c", STARTUP.format(exchange="bitfinex")],
+}
+
+# Modules a scenario must not import, they belong to another exchange or to an action that was not run
+UNEXPECTED = {
+    "help": ("src", "requests", "pydantic", "numpy", "httpx", "asyncio"),
+    "binance": (
+        "src.clients.bitfinex_main_client", "src.exchange_processors.bitfinex",
+        "requests", "httpx", "websockets", "pyarrow", "numpy",
+    ),
+    "bitfinex": (
+        "src.clients.binance_main_client", "src.exchange_processors.binance",
+        "requests", "httpx", "websockets", "pyarrow", "numpy",
+    ),
+}
+
+
+def wall_time(args: List[str], runs: int) -> float:
+    """Median seconds of `runs` fresh interpreters running `args`"""
+    times = []
+    for _ in range(runs):
+        start = timer()
+        subprocess.run([sys.executable, *args], cwd=APP_PATH, stdout=subprocess.DEVNULL, check=True)
+        times.append(timer() - start)
+    return statistics.median(times)
+
+
+def import_report(args: List[str]) -> List[Tuple[str, int, int]]:
+    """Module, self and cumulative microseconds of every import, as reported by `-X importtime`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=APP_PATH,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    report = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, module = line[len("import time:"):].split("|")
+        report.append((module.strip(), int(own), int(cumulative)))
+    return report
+
+
+def unexpected_imports(name: str, report: List[Tuple[str, int, int]]) -> List[str]:
+    """Modules of the report the scenario must not import"""
+    return sorted(
+        module for module, _, _ in report
+        if any(module == prefix or module.startswith(prefix + ".") for prefix in UNEXPECTED[name])
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget", type=float, default=200.0, help="startup budget in milliseconds")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest imports reported per scenario")
+    args = parser.parse_args()
+
+    baseline = wall_time(["-c", "pass"], args.runs)
+    print(f"bare interpreter {baseline * 1000:.1f}ms, budget {args.budget:.0f}ms on top of it\n")
+
+    failed = False
+    for name, scenario in SCENARIOS.items():
+        startup = (wall_time(scenario, args.runs) - baseline) * 1000
+        report = import_report(scenario)
+        unexpected = unexpected_imports(name, report)
+        over_budget = startup > args.budget
+        failed |= over_budget or bool(unexpected)
+
+        status = "OVER BUDGET" if over_budget else "ok"
+        print(f"{name:>8} {startup:8.1f}ms  {len(report)} modules  {status}")
+        for module, own, cumulative in sorted(report, key=lambda row: row[1], reverse=True)[:args.top]:
+            print(f"{'':>10}{own / 1000:7.1f}ms self {cumulative / 1000:7.1f}ms cumulative  {module}")
+        if unexpected:
+            print(f"{'':>10}unexpected imports: {', '.join(unexpected)}")
+        print()
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+`show_candles` latency served from a replayed kline stream vs a REST round-trip
+
+    python benchmarks/streaming_benchmark.py [--frames 20000] [--reads 5000]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from timeit import default_timer as timer
+
+import numpy as np
+
+from stand_in_server import StandInHandler, start_server
+from ws_replay_server import load_frames, start_replay_server
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT"]
+MINUTE = 60000
+
+
+class KlinesHandler(StandInHandler):
+    payload = json.dumps(
+        [[i * MINUTE, "100.0", "101.0", "99.0", "100.5", "3.0", i * MINUTE + MINUTE - 1] for i in range(500)]
+    ).encode()
+
+
+def record_frames(path: str, count: int) -> None:
+    """Write a synthetic recording of kline and ticker frames"""
+    with open(path, "w") as file:
+        for i in range(count):
+            symbol = SYMBOLS[i % len(SYMBOLS)]
+            open_time = (500 + i // 20) * MINUTE
+            if i % 5 == 4:
+                data = {"e": "24hrTicker", "s": symbol, "c": "100.7", "O": open_time, "o": "100", "h": "102", "l": "98", "v": "42"}
+            else:
+                data = {
+                    "e": "kline",
+                    "s": symbol,
+                    "k": {"t": open_time, "i": "1m", "o": "100.0", "h": "101.0", "l": "99.0", "c": str(100 + i % 7), "v": "1.5"},
+                }
+            stream = f"{symbol.lower()}@{'ticker' if data['e'] == '24hrTicker' else 'kline_1m'}"
+            file.write(json.dumps({"t": i * 0.0001, "frame": json.dumps({"stream": stream, "data": data})}) + "\n")
+
+
+def percentiles(samples: list) -> str:
+    p50, p99 = np.percentile(np.array(samples) * 1e6, [50, 99])
+    return f"p50 {p50:9.1f} us   p99 {p99:9.1f} us"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--reads", type=int, default=5000)
+    args = parser.parse_args()
+
+    recording = os.path.join(tempfile.mkdtemp(), "binance_frames.jsonl")
+    record_frames(recording, args.frames)
+    ws_url = start_replay_server(load_frames(recording))
+    server, base_path = start_server(KlinesHandler)
+
+    processor = BinanceExchangeProcessor(BinanceClient("secret", base_path=base_path, rate_limiter=None))
+    rest = []
+    for _ in range(200):
+        start = timer()
+        processor.show_candles("BTCUSDT", "1m", 100)
+        rest.append(timer() - start)
+
+    stream = processor.stream_market_data(SYMBOLS, ["1m"], url=ws_url)
+    deadline = time.monotonic() + 30
+    while stream.frames < args.frames and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    streamed = []
+    for _ in range(args.reads):
+        start = timer()
+        processor.show_candles("BTCUSDT", "1m", 100, as_series=True)
+        streamed.append(timer() - start)
+
+    stream.stop()
+    server.shutdown()
+    print(f"frames applied        : {stream.frames}")
+    print(f"window length         : {len(stream.window('BTCUSDT', '1m'))}")
+    print(f"last ticker           : {stream.ticker('BTCUSDT').price}")
+    print(f"REST show_candles     : {percentiles(rest)}")
+    print(f"stream show_candles   : {percentiles(streamed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Fetch, load and lookup cost of the symbol index, and the order round trips it saves
+
+    python benchmarks/symbol_index_benchmark.py [--symbols 2000] [--lookups 100000] [--latency 0.02]
+
+The exchange info of `--symbols` symbols is fetched once from the mock
+exchange into a temporary index, then loaded from disk by fresh indexes the
+way every CLI run does. Lookups and full order checks are timed on the
+loaded index. Orders the exchange would reject are then placed with and
+without the index, the index rejects them without a request.
+"""
+import argparse
+import statistics
+import tempfile
+from timeit import default_timer as timer
+
+from mock_exchange import start_mock_exchange
+from src.clients.binance_main_client.binance_client import BinanceClient
+from src.exchange_processors.binance.binance_exchange_processor import BinanceExchangeProcessor
+from src.exchange_processors.models import OrderRequest
+from src.storage.symbol_index import SymbolIndex
+
+LOADS = 50
+REJECTED_ORDERS = 50
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--lookups", type=int, default=100000)
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated exchange latency in seconds")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_exchange(args.latency, args.symbols)
+    root = tempfile.mkdtemp()
+    client = BinanceClient("key", base_path=base_url, rate_limiter=None)
+    processor = BinanceExchangeProcessor(client, account_ttl=None, symbol_index=SymbolIndex(root))
+
+    start = timer()
+    processor.symbol_index.table(client.exchange, processor.fetch_symbol_rules)
+    print(f"fetch and store {args.symbols} symbols: {(timer() - start) * 1000:8.2f}ms")
+
+    loads = []
+    for _ in range(LOADS):
+        index = SymbolIndex(root)
+        start = timer()
+        index.table(client.exchange, processor.fetch_symbol_rules)
+        loads.append(timer() - start)
+    print(f"load from disk            : {statistics.median(loads) * 1000:8.3f}ms median of {LOADS}")
+
+    symbols = [f"SYM{i}USDT" for i in range(1, args.symbols)] or ["BTCUSDT"]
+    start = timer()
+    for i in range(args.lookups):
+        processor.symbol_rules(symbols[i % len(symbols)])
+    print(f"lookup                    : {(timer() - start) / args.lookups * 1e6:8.2f}us")
+
+    order = OrderRequest(symbol="BTCUSDT", side="BUY", type="LIMIT", quantity=0.0123456, price=20000.004)
+    start = timer()
+    for _ in range(args.lookups):
+        checked, error = processor.check_order(order)
+    print(f"check and round an order  : {(timer() - start) / args.lookups * 1e6:8.2f}us "
+          f"({order.quantity} @ {order.price} -> {checked.quantity} @ {checked.price})")
+
+    # Below the minimum notional of the mock symbols, the exchange would answer 400
+    plain = BinanceExchangeProcessor(BinanceClient("key", base_path=base_url, rate_limiter=None), account_ttl=None)
+    for name, placing in (("without index", plain), ("with index", processor)):
+        start = timer()
+        for _ in range(REJECTED_ORDERS):
+            placing.place_order("BTCUSDT", "BUY", "LIMIT", 0.0001, 20000.0)
+        print(f"invalid order {name:<12}: {(timer() - start) / REJECTED_ORDERS * 1000:8.3f}ms per order")
+
+    plain.client.close()
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
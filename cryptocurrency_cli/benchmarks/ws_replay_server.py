@@ -0,0 +1,54 @@
+"""
+Local websocket stand-in replaying frames recorded by `MarketDataStream(record_path=...)`
+
+Every connection receives the recorded frames in order, either as fast as
+possible or spaced as they were recorded when `speed` is set.
+"""
+import asyncio
+import json
+import threading
+import time
+from typing import List, Tuple
+
+import websockets
+
+Frame = Tuple[float, str]
+
+
+def load_frames(path: str) -> List[Frame]:
+    """Read a JSON lines recording of `{"t": seconds since connect, "frame": raw frame}`"""
+    with open(path) as file:
+        return [(record["t"], record["frame"]) for record in map(json.loads, file)]
+
+
+def start_replay_server(frames: List[Frame], speed: float = 0.0) -> str:
+    """
+    Start the server in a daemon thread and return its url
+
+    Parameters
+    ----------
+    `frames`
+        Recorded frames with their offsets in seconds
+    `speed`
+        Replay speed relative to the recording, 0 sends frames without delay
+    """
+    ready = threading.Event()
+    address = {}
+
+    async def replay(connection) -> None:
+        started_at = time.monotonic()
+        for offset, frame in frames:
+            if speed:
+                await asyncio.sleep(max(0.0, offset / speed - (time.monotonic() - started_at)))
+            await connection.send(frame)
+        await connection.wait_closed()
+
+    async def serve() -> None:
+        async with websockets.serve(replay, "127.0.0.1", 0) as server:
+            address["port"] = list(server.sockets)[0].getsockname()[1]
+            ready.set()
+            await asyncio.Future()
+
+    threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+    ready.wait()
+    return f"ws://127.0.0.1:{address['port']}"